@@ -1,5 +1,40 @@
 """ Init file, export relevant names. """
 from .bit import BIT
+from .bit2d import BIT2D
+from .bitnd import BITND
+from .concurrent import ConcurrentBIT
+from .dynamic import DynamicBIT
+from .fast import AddBIT, AndBIT, MaxBIT, OrBIT, XorBIT
+from .mapped import MappedBIT
+from .monoid import Group, Monoid
+from .multiset import FenwickMultiset
+from .ranges import RangeBIT, RangeUpdateBIT
+from .rmq import RangeQueryBIT
+from .segtree import SegmentTree
+from .sparse import CompressedBIT, SparseBIT
+from .table import SparseTable
 
 
-__all__ = ['BIT']
+__all__ = [
+    'AddBIT', 'AndBIT', 'BIT', 'BIT2D', 'BITND', 'CompressedBIT',
+    'ConcurrentBIT', 'DynamicBIT', 'FenwickMultiset', 'Group', 'MappedBIT',
+    'MaxBIT', 'Monoid', 'OrBIT', 'RangeBIT', 'RangeQueryBIT',
+    'RangeUpdateBIT', 'SegmentTree', 'SparseBIT', 'SparseTable', 'XorBIT'
+]
+
+# NumPy is an optional dependency, only export the array backed tree
+# when it is available.
+try:
+    from .npbit import NumpyBIT
+except ImportError:  # pragma: no cover
+    pass
+else:
+    __all__ += ['NumpyBIT']
+
+# multiprocessing.shared_memory is only available from Python 3.8.
+try:
+    from .shared import SharedBIT
+except ImportError:  # pragma: no cover
+    pass
+else:
+    __all__ += ['SharedBIT']
@@ -7,29 +7,51 @@
 [XXX]: Make a BinOp abc class so operations that might require state
        can have a defined interface? (And allow it to be passed somehow
        to BIT class.)
-[XXX]: Implement __iter__? MutableSequence.__iter__ uses old iteration
-       protocol (calling __getitem__ until IndexError) which also suits
-       us here since our __getitem__ returns the prefix sums. Probably
-       leave as is.
+[XXX]: Implement __iter__? (done, yields the prefix sums in O(n) total
+       instead of relying on the old __getitem__ iteration protocol.)
 [XXX]: Handle negative indices. (done, double check and test pending)
 """
+from array import array
 from collections.abc import MutableSequence
 from operator import add
-from typing import (TypeVar, Callable, Generator, Iterable, List, Optional,
-                    Union)
+from typing import (Any, TypeVar, Callable, Dict, Generator, Generic,
+                    Iterable, Iterator, List, Optional, Tuple, Type, Union)
+
+from . import serial
+from .monoid import Monoid
+from .table import SparseTable
 # Can be anything.
 _T = TypeVar('_T')
+_R = TypeVar('_R')
 _Gen = Generator[int, None, None]
 
 
 # todo: big todo, formalize way binary ops are used.
-class BIT:
+class BIT(Generic[_T]):
     """ Binary Indexed Tree, commonly known as a Fenwick Tree. """
 
+    # the nodes: a list, an array.array or a memoryview of a buffer.
+    _st: Any
+    binop: Callable[[_T, _T], _T]
+    inverse: Optional[Callable[[_T, _T], _T]]
+
+    # update_many switches to a full doubling pass once a batch of k
+    # updates would walk more than _dense_ratio * n nodes.
+    _dense_ratio = 2
+    # raw values, kept in sync with the tree when keep_values is set.
+    _values: Optional[List[_T]] = None
+    # typed trees fall back to a list, instead of raising, on overflow.
+    _promote = False
+    # the monoid binop came from, if it was given one.
+    monoid: Optional[Monoid] = None
+
     def __init__(self,
                  iterable: Optional[Iterable[_T]] = None,
                  binop: Callable[[_T, _T], _T] = add,
-                 inverse_binop: Optional[Callable[[_T, _T], _T]] = None):
+                 inverse_binop: Optional[Callable[[_T, _T], _T]] = None,
+                 keep_values: bool = False,
+                 typecode: Optional[str] = None,
+                 promote: bool = False):
         """
         Initialize a new Binary Indexed Tree with an optional iterable.
 
@@ -42,10 +64,61 @@ class BIT:
         is supplied, it can be used to restructure the initial array as well
         as support more methods.
 
+        With ``keep_values`` set, a list of the original values is kept
+        alongside the tree. It doubles the memory used but makes
+        ``value_at`` :math:`O(1)` and lets ``original_layout``, ``index``,
+        ``insert`` and ``pop`` use the values directly instead of
+        recovering them with ``inverse_binop``.
+
+        A ``typecode`` stores the nodes in an ``array.array`` of that type,
+        a few bytes per node instead of a boxed object each:
+
+        >>> b = BIT(range(10), typecode='q')
+        >>> b.typecode, b[9]
+        ('q', 45)
+
+        Writing a node that doesn't fit the type raises ``OverflowError``
+        and leaves the tree unchanged, unless ``promote`` is set in which
+        case the nodes are moved to a list and the operation goes on.
+
+        ``binop`` can also be a :class:`bit.monoid.Monoid`, whose
+        properties enable ``BIT.identity`` and ``BIT.freeze``. The inverse
+        of a :class:`bit.monoid.Group` is used when no ``inverse_binop``
+        is given:
+
+        >>> from bit.monoid import ADD
+        >>> BIT(range(10), ADD).range_sum(3, 6)
+        15
+
         :complexity: :math:`O(n)` where `n` is the number of
                      items in the iterable.
+        :raises OverflowError: If a node doesn't fit ``typecode`` and
+                               ``promote`` isn't set.
+        :raises ValueError: If binop is a monoid that isn't commutative.
         """
-        self._st = self.bit_layout(list(iterable or []), binop)
+        if isinstance(binop, Monoid):
+            if not binop.commutative:
+                msg = "BIT requires a commutative binop, got {0!r}."
+                raise ValueError(msg.format(binop))
+            # keep the monoid around, but call the bare operator.
+            self.monoid, binop = binop, binop.binop
+            if inverse_binop is None:
+                inverse_binop = self.monoid.inverse
+        values: Iterable[_T] = iterable or []
+        if typecode is None or not isinstance(values, (list, range, array)):
+            values = list(values)
+        if keep_values:
+            self._values = list(values)
+        self._promote = promote
+        if typecode is None:
+            self._st = self.bit_layout(values, binop)
+        else:
+            try:
+                self._st = self.bit_layout(values, binop, typecode)
+            except OverflowError:
+                if not promote:
+                    raise
+                self._st = self.bit_layout(values, binop)
         self.binop = binop
         self.inverse = inverse_binop
 
@@ -62,7 +135,21 @@ class BIT:
         """
         # delegate to list, takes care of printing really big lists.
         # don't return original, it requires inverse op.
-        return repr(self._st)
+        storage = self._st
+        if isinstance(storage, (array, memoryview)):
+            return repr(storage.tolist())
+        return repr(storage)
+
+    @property
+    def typecode(self) -> Optional[str]:
+        """ Typecode of the ``array.array`` (or buffer, see
+        ``BIT.from_buffer``) holding the nodes, ``None`` for trees stored
+        in a list.
+        """
+        storage = self._st
+        if isinstance(storage, memoryview):
+            return storage.format
+        return storage.typecode if isinstance(storage, array) else None
 
     def __len__(self) -> int:
         """ Return the number of elements in the
@@ -76,7 +163,7 @@ class BIT:
         """
         return len(self._st)
 
-    def __getitem__(self, index: Union[int, slice]) -> _T:
+    def __getitem__(self, index: Union[int, slice, Iterable[int]]) -> _T:
         """ Return the prefix sum until (including!) the given
         index. ``BIT.__getitem__`` is shorthand for ``BIT.prefix_sum(i)``, both
         behave in exactly the same way:
@@ -87,6 +174,11 @@ class BIT:
         >>> b[9] == b.prefix_sum(9)
         True
 
+        An iterable of indices is shorthand for ``BIT.prefix_sums``:
+
+        >>> b[[9, 0, 4]]
+        [45, 0, 10]
+
         :complexity: :math:`O(\log{}n)` where `n` is the number of items in
                      the Binary Indexed Tree.
         :raises IndexError: If BIT is empty or index is out of bounds.
@@ -106,6 +198,8 @@ class BIT:
             else:
                 end = end + length if end < 0 else end
             return self.range_sum(start, end)
+        if isinstance(index, Iterable):
+            return self.prefix_sums(index)  # type: ignore
         return self.prefix_sum(index)
 
     # todo: use slice-iterable?
@@ -133,17 +227,50 @@ class BIT:
         if not inverse:
             msg = "Inverse Operator is required to set an item. "
             raise TypeError(msg)
-        old = storage[index]
-        if index & 1:
-            # odd indices hold prefix sums, go left
-            # and find original value for old.
-            for step in self._c_zero_lsb(index + 1):
-                old = inverse(old, storage[index - step])
+        old = self._original(index)
 
         # we have old and new. go right and update values.
-        for idx in self._f_zero_lsb(index, length):
-            storage[idx] = inverse(storage[idx], old)
-            storage[idx] = binop(storage[idx], value)
+        path = list(self._f_zero_lsb(index, length))
+        self._assign(path, [binop(inverse(storage[idx], old), value)
+                            for idx in path])
+        if self._values is not None:
+            self._values[index] = value
+
+    def value_at(self, index: int) -> _T:
+        """ Return the value originally placed at index. Requires either
+        ``keep_values`` or an ``inverse_binop``.
+
+        >>> b = BIT(range(10), keep_values=True)
+        >>> b.update(3, 10)
+        >>> b.value_at(3), b.value_at(-1)
+        (13, 9)
+
+        :complexity: :math:`O(1)` with ``keep_values``, otherwise
+                     :math:`O(\log{}n)` where `n` is the number of items
+                     in the Binary Indexed Tree.
+        :raises IndexError: If BIT is empty or index is out of bounds.
+        :raises TypeError: If neither ``keep_values`` nor
+                           ``inverse_binop`` have been supplied.
+        """
+        index = self._nmlz_index(index, len(self))
+        if self._values is None and not self.inverse:
+            msg = "Inverse Operator or keep_values required for value_at. "
+            raise TypeError(msg)
+        return self._original(index)
+
+    def _original(self, index: int) -> _T:
+        """ Original value at (normalized) index, read from the kept
+        values or recovered by removing the children of its node.
+        """
+        if self._values is not None:
+            return self._values[index]
+        storage, inverse = self._st, self.inverse
+        value: _T = storage[index]
+        # odd indices hold prefix sums, go left
+        # and find original value.
+        for step in self._c_zero_lsb(index + 1):
+            value = inverse(value, storage[index - step])  # type: ignore
+        return value
 
     def update(self, index: int, value: _T) -> None:
         """ Updates the value at given index. This does not replace the original
@@ -163,8 +290,155 @@ class BIT:
         index = self._nmlz_index(index, length)
 
         binop = self.binop
-        for idx in self._f_zero_lsb(index, length):
-            storage[idx] = binop(storage[idx], value)
+        if isinstance(storage, (array, memoryview)):
+            path = list(self._f_zero_lsb(index, length))
+            self._assign(path, [binop(storage[idx], value) for idx in path])
+        else:
+            for idx in self._f_zero_lsb(index, length):
+                storage[idx] = binop(storage[idx], value)
+        if self._values is not None:
+            self._values[index] = binop(self._values[index], value)
+
+    def update_many(self,
+                    indices: Iterable[int],
+                    values: Iterable[_T]) -> None:
+        """ Batched ``BIT.update``, apply each value in ``values`` to the
+        item at the matching index in ``indices``. Equivalent to calling
+        ``update`` for every pair.
+
+        >>> b = BIT(range(10), inverse_binop = int.__sub__)
+        >>> b.update_many([5, 0, 5], [10, 1, 2])
+        >>> b.original_layout()
+        [1, 1, 2, 3, 4, 17, 6, 7, 8, 9]
+
+        Values hitting the same index are merged with ``binop`` first. Small
+        batches then push their deltas up the tree in index order, so a node
+        shared by several updates is only touched once. Batches large enough
+        to touch most nodes anyway lay the deltas out as a tree of their own
+        with the doubling pass of ``bit_layout`` and merge it in a single
+        sweep. Neither strategy combines the deltas in index order, so
+        ``binop`` must be commutative as well as associative. That holds
+        for every BIT anyway, the tree itself relies on it, and a
+        :class:`bit.monoid.Monoid` that isn't commutative is rejected by
+        ``BIT.__init__``.
+
+        :complexity: :math:`O(\min(k\log{}n, n + k))` where `k` is the
+                     number of updates and `n` is the number of items in
+                     the Binary Indexed Tree.
+        :raises IndexError: If any index is out of bounds.
+        :raises ValueError: If indices and values differ in length.
+        """
+        length, binop = len(self), self.binop
+        indices, values = list(indices), list(values)
+        if len(indices) != len(values):
+            raise ValueError("indices and values must be of equal length.")
+        deltas: Dict[int, _T] = {}
+        for index, value in zip(indices, values):
+            index = self._nmlz_index(index, length)
+            if index in deltas:
+                value = binop(deltas[index], value)
+            deltas[index] = value
+
+        self._assign(*self._merge_deltas(deltas))
+        if self._values is not None:
+            kept = self._values
+            for idx, value in deltas.items():
+                kept[idx] = binop(kept[idx], value)
+
+    def _merge_deltas(self,
+                      deltas: Dict[int, _T]) -> Tuple[List[int], List[_T]]:
+        """ Return the nodes ``BIT.update_many`` changes along with their
+        new values.
+        """
+        storage, length, binop = self._st, len(self), self.binop
+        nodes: List[int] = []
+        sums: List[_T] = []
+        if len(deltas) * length.bit_length() < self._dense_ratio * length:
+            # sparse: a parent (idx | idx + 1) always has more trailing
+            # ones than its children, go level by level and carry merged
+            # deltas upwards so shared ancestors are touched once.
+            levels: List[Dict[int, _T]] = [
+                {} for _ in range(length.bit_length() + 1)
+            ]
+            for idx, value in deltas.items():
+                levels[(idx ^ (idx + 1)).bit_length() - 1][idx] = value
+            for level in levels:
+                for idx, value in level.items():
+                    nodes.append(idx)
+                    sums.append(binop(storage[idx], value))
+                    parent = idx | (idx + 1)
+                    if parent >= length:
+                        continue
+                    up = levels[(parent ^ (parent + 1)).bit_length() - 1]
+                    if parent in up:
+                        value = binop(up[parent], value)
+                    up[parent] = value
+            return nodes, sums
+
+        # dense: same doubling pass as bit_layout, None marks indices
+        # without a delta.
+        layout: List[Optional[_T]] = [None] * length
+        for idx, value in deltas.items():
+            layout[idx] = value
+        i = 1
+        while i < length:
+            for j in range(2 * i - 1, length, 2 * i):
+                child = layout[j - i]
+                if child is not None:
+                    node = layout[j]
+                    layout[j] = child if node is None else binop(node, child)
+            i *= 2
+        for idx, delta in enumerate(layout):
+            if delta is not None:
+                nodes.append(idx)
+                sums.append(binop(storage[idx], delta))
+        return nodes, sums
+
+    def _assign(self, indices: List[int], values: List[_T]) -> None:
+        """ Write each value to the node at the matching index. Values for
+        a typed tree (array or memoryview nodes) are checked before
+        anything is written, so an overflow either leaves the tree
+        unchanged or promotes it.
+        """
+        storage = self._st
+        if isinstance(storage, (array, memoryview)):
+            try:
+                array(self.typecode, values)  # type: ignore
+            except OverflowError:
+                storage = self._promoted()
+        for idx, value in zip(indices, values):
+            storage[idx] = value
+
+    def _promoted(self) -> List[_T]:
+        """ Move the nodes of a typed tree to a list, if ``promote`` is
+        set, and return it. Raise ``OverflowError`` otherwise.
+        """
+        if not self._promote:
+            msg = "Value doesn't fit typecode '{0}', use promote=True."
+            raise OverflowError(msg.format(self.typecode))
+        nodes: List[_T] = self._st.tolist()
+        self._st = nodes
+        return nodes
+
+    def _rebuild(self, start: int, edit: Callable[[], _R]) -> _R:
+        """ Run edit, which rewrites the nodes from start onwards, and
+        return its result. On an overflow the nodes of a typed tree are
+        restored before promoting it and running edit again.
+        """
+        storage = self._st
+        if not isinstance(storage, array):
+            return edit()
+        saved, kept = storage[start:], self._values
+        saved_kept = None if kept is None else kept[start:]
+        try:
+            return edit()
+        except OverflowError:
+            del storage[start:]
+            storage.extend(saved)
+            if kept is not None:
+                kept[start:] = saved_kept  # type: ignore
+            self._promoted()
+            return edit()
 
     def append(self, value: _T) -> None:
         """ Append a new value to the BIT.
@@ -179,7 +453,7 @@ class BIT:
         :complexity: :math:`O(\log{}n)` where `n` is the number of items
                      in the Binary Indexed Tree.
         """
-        storage, length = self._st, len(self)
+        storage, length, raw = self._growable(), len(self), value
         # Index in which we will place new value is odd, can
         # just append.
         if length & 1:
@@ -189,11 +463,17 @@ class BIT:
                 # careful, haven't added item so length
                 # must be decreased by one.
                 value = self.binop(value, storage[length - step])
-        storage.append(value)
+        try:
+            storage.append(value)
+        except OverflowError:
+            self._promoted().append(value)
+        if self._values is not None:
+            self._values.append(raw)
 
-    # todo: could we somehow not be O(N)? -- think about it
     def insert(self, index: int, value: _T) -> None:
-        """ Insert value before index, requires ``inverse_binop`` be defined.
+        """ Insert value before index, requires ``inverse_binop`` be defined
+        unless ``keep_values`` was set or value is appended. Indices are
+        clamped like ``list.insert`` does.
 
         >>> b = BIT(range(5), inverse_binop = int.__sub__)
         >>> prev_sum = b[4]
@@ -201,14 +481,38 @@ class BIT:
         >>> prev_sum + 50 == b[5]
         True
 
-        :complexity: :math:`O(n)` where `n` is the number of items in the
-                     Binary Indexed Tree.
+        Nodes before index only cover values before index and are left
+        untouched, the nodes from index onwards are turned back into
+        values, shifted and laid out again in place.
+
+        :complexity: :math:`O(n - i + \log{}n)` for index `i` where `n`
+                     is the number of items in the Binary Indexed Tree.
+        :raises TypeError: If ``inverse_binop`` is required but hasn't
+                           been supplied.
         """
-        # grab original layout, insert there, rebuild.
-        # list will take care of index.
-        arr: List[_T] = self.original_layout()
-        arr.insert(index, value)
-        self._st = self.bit_layout(arr, self.binop)
+        length, kept = len(self), self._values
+        index = index + length if index < 0 else index
+        index = min(max(index, 0), length)
+        if index == length:
+            self.append(value)
+            return
+        if kept is None and not self.inverse:
+            msg = "Inverse Binary Operator is required for insert."
+            raise TypeError(msg)
+        self._growable()
+
+        def edit() -> None:
+            storage = self._st
+            if kept is not None:
+                kept.insert(index, value)
+                storage.append(value)
+                storage[index:] = self._pack(kept[index:])
+            else:
+                self._original_from(storage, index,
+                                    self.inverse)  # type: ignore
+                storage.insert(index, value)
+            self._layout_from(storage, index, self.binop)
+        self._rebuild(index, edit)
 
     # todo: use Union[int, slice]?
     def __delitem__(self, index: int) -> None:
@@ -220,16 +524,16 @@ class BIT:
         >>> b.original_layout()
         [1, 2, 3, 4]
 
-        :complexity: :math:`O(n)` where `n` is the number of items in
-                     the Binary Indexed Tree.
+        :complexity: :math:`O(n - i + \log{}n)` for index `i` where `n`
+                     is the number of items in the Binary Indexed Tree.
         :raises IndexError: If BIT is empty or index is out of range.
         """
         _ = self.pop(index)
 
     def pop(self, index: int = -1) -> _T:
         """ Remove and return item at given index (default -1).
-        Requires `inverse_binop` be specified for indexes not
-        equal to `-1`.
+        Requires `inverse_binop` be specified unless `keep_values`
+        was set.
 
         >>> b = BIT(range(5), inverse_binop = int.__sub__)
         >>> b.pop()
@@ -243,39 +547,65 @@ class BIT:
         >>> b.pop()
         0
 
-        :complexity: :math:`O(n)` where `n` is the number of items in
-                     the Binary Indexed Tree.
+        Like ``BIT.insert`` only the nodes from index onwards are rebuilt.
+
+        :complexity: :math:`O(n - i + \log{}n)` for index `i` where `n`
+                     is the number of items in the Binary Indexed Tree.
         :raises IndexError: If BIT is empty or index is out of range.
-        :raises TypeError: If the `inverse_binop` hasn't been defined.
+        :raises TypeError: If the `inverse_binop` hasn't been defined and
+                           `keep_values` wasn't set.
         """
         length = len(self)
         index = self._nmlz_index(index, length)
-        if not self.inverse:
+        kept = self._values
+        if not self.inverse and kept is None:
             msg = "Inverse Binary Operator is required for pop."
             raise TypeError(msg)
+        self._growable()
         if index == length - 1:
             # special case, can do O(logn) worse case
             # and O(1) in half/cases of pop with index == -1.
+            value = self._original(index)
+            self._st.pop()
+            if kept is not None:
+                kept.pop()
+            return value
+
+        # turn the suffix back into values, remove and lay it out again.
+        def edit() -> _T:
             storage = self._st
-            value = storage.pop()
-            if length & 1:
-                return value
-            # need to find original value placed here
-            # todo: duplicate logic (here and setitem) move to function
-            inverse_op = self.inverse
-            for step in self._c_zero_lsb(index + 1):
-                value = inverse_op(value, storage[index - step])
+            value: _T
+            if kept is not None:
+                value = kept.pop(index)
+                storage.pop()
+                storage[index:] = self._pack(kept[index:])
+            else:
+                self._original_from(storage, index,
+                                    self.inverse)  # type: ignore
+                value = storage.pop(index)
+            self._layout_from(storage, index, self.binop)
             return value
+        return self._rebuild(index, edit)
 
-        # todo: O(N) for random index. This *might* be able to
-        # be improved but I'll need to think of it.
-        # Get original layout, remove from there, rebuild array.
-        # underlying list takes care of wrong index.
-        arr: List[_T] = self.original_layout()
-        value = arr[index]
-        del arr[index]
-        self._st = self.bit_layout(arr, self.binop)
-        return value
+    def _growable(self) -> Any:
+        """ Return the nodes in a container that can change length, a
+        tree wrapping a buffer copies its nodes to an ``array.array``
+        first.
+        """
+        storage = self._st
+        if isinstance(storage, memoryview):
+            nodes = array(storage.format)
+            nodes.frombytes(storage.cast('B'))
+            self._st = storage = nodes
+        return storage
+
+    def _pack(self, values: List[_T]) -> Any:
+        """ Values in the storage type of the tree, for slice assignment.
+        """
+        storage = self._st
+        if isinstance(storage, array):
+            return array(storage.typecode, values)
+        return values
 
     def remove(self, value: _T) -> None:
         """ Remove and return a given value.
@@ -302,7 +632,9 @@ class BIT:
               start: int = 0,
               stop: Optional[int] = None) -> int:
         """ Return the index of the first occurence of value.
-        `inverse_binop` is required in order to run `index`.
+        `inverse_binop` is required in order to run `index` unless
+        `keep_values` was set, in which case the kept values are scanned
+        without copying them.
 
         >>> b = BIT(range(5), inverse_binop = int.__sub__)
         >>> b.index(4)
@@ -315,13 +647,15 @@ class BIT:
         :raises ValueError: If value is not present in the collection.
         """
         # delegate to original list.
-        arr: List[_T] = self.original_layout()
+        arr = self._values
+        if arr is None:
+            arr = self.original_layout()
         # to shut mypy up.
         if stop:
             return arr.index(value, start, stop)
         return arr.index(value, start)
 
-    def __iadd__(self, iterable: Iterable[_T]) -> 'BIT':
+    def __iadd__(self, iterable: Iterable[_T]) -> 'BIT[_T]':
         """ Extend Binary Indexed Tree in-place by appending elements from
         the iterable. The `inverse_binop` is only required when the
         iterable is an instance of BIT.
@@ -349,15 +683,71 @@ class BIT:
         >>> print(b)
         [0, 1, 2, 6, 4, 4, 1, 13, 3, 7, 5, 18, 7, 15, 9]
 
-        :complexity: :math:`O(n)`
+        The new values are laid out in a single doubling pass over the
+        tail, seeded with the nodes they are combined with. The nodes of
+        a BIT with the same ``binop`` are reused, only those spanning a
+        multiple of the alignment of ``len(B)`` (its lowest set bit) are
+        recomputed:
+
+        >>> b = BIT(range(8), inverse_binop=int.__sub__)
+        >>> b += BIT(range(8, 12))
+        >>> b[11], b.range_sum(6, 9)
+        (66, 24)
+
+        :complexity: :math:`O(k + \log{}n)` for `k` new elements,
+                     :math:`O(k / a + \log{}n)` ``binop`` calls when
+                     concatenating a BIT and `a` is the alignment of `n`.
         :raises TypeError: If iterable is an instance of BIT and `inverse_op`
                            hasn't been specified.
         """
-        if isinstance(iterable, type(self)):
-            # don't use sums!
-            iterable = iterable.original_layout()
-        for value in iterable:
-            self.append(value)
+        length = len(self)
+        level = 1
+        if isinstance(iterable, BIT):
+            if iterable.binop is self.binop:
+                values, level = self._aligned(iterable, length)
+            else:
+                values = iterable.original_layout()
+        else:
+            values = list(iterable)
+        if not values:
+            return
+        kept = self._values
+        if kept is not None:
+            raw = values
+            if isinstance(iterable, BIT) and iterable.binop is self.binop:
+                raw = iterable.original_layout()
+
+        def edit() -> None:
+            storage = self._st
+            storage.extend(values)
+            self._layout_from(storage, length, self.binop, level)
+            if kept is not None:
+                kept.extend(raw)
+        self._growable()
+        self._rebuild(length, edit)
+
+    def _aligned(self,
+                 other: 'BIT[_T]',
+                 length: int) -> Tuple[List[_T], int]:
+        """ Return the nodes of other ready to be laid out after length
+        values, and the level they are laid out from. Below the lowest
+        set bit of length (the alignment) the nodes of other are nodes of
+        the concatenated tree, the levels from the alignment up are
+        turned back into values.
+        """
+        nodes, level = list(other._st), length & -length
+        if not length:
+            # the nodes of other are the tree, nothing to lay out.
+            return nodes, len(nodes)
+        if len(nodes) <= level:
+            return nodes, level
+        if other._values is not None:
+            return other._values[:], 1
+        if not other.inverse:
+            msg = "Inverse Binary Operator is required to extend with a BIT."
+            raise TypeError(msg)
+        self._original_from(nodes, 0, other.inverse, level)
+        return nodes, level
 
     # Additional methods commonly defined on fenwick trees
     # todo: can be done more efficiently.
@@ -408,12 +798,444 @@ class BIT:
         # require it to be initialized to value that is
         # dependant on op.
         binop = self.binop
-        acc = self._st[index - 1]
+        acc: _T = self._st[index - 1]
         index = index & (index - 1)
         for idx in self._c_one_lsb(index):
             acc = binop(acc, self._st[idx - 1])
         return acc
 
+    def prefix_sums(self, indices: Iterable[int]) -> List[_T]:
+        """ Return the prefix sums until (including!) each of the given
+        indices, in the order the indices were supplied.
+
+        >>> b = BIT(range(10))
+        >>> b.prefix_sums([9, 3, -1, 4])
+        [45, 6, 45, 10]
+
+        Queries are answered in sorted order so that nodes shared
+        between consecutive queries are only combined once.
+
+        :complexity: :math:`O(k\log{}n)` where `k` is the number of
+                     indices and `n` is the number of items in the Binary
+                     Indexed Tree. Sorted, clustered indices only pay for
+                     the nodes they don't share with their predecessor.
+        :raises IndexError: If BIT is empty or any index is out of bounds.
+        """
+        length, storage, binop = len(self), self._st, self.binop
+        queries = [self._nmlz_index(i, length) + 1 for i in indices]
+        sums: List[Optional[_T]] = [None] * len(queries)
+        # nodes of the previous query, top-down, along with the sum of
+        # all nodes up to (and including) them.
+        path: List[Tuple[int, _T]] = []
+        for pos in sorted(range(len(queries)), key=queries.__getitem__):
+            rest, node, depth = queries[pos], 0, 0
+            while rest:
+                high = 1 << (rest.bit_length() - 1)
+                node, rest = node + high, rest - high
+                if depth < len(path) and path[depth][0] == node:
+                    depth += 1
+                    continue
+                del path[depth:]
+                acc = storage[node - 1]
+                if depth:
+                    acc = binop(acc, path[depth - 1][1])
+                path.append((node, acc))
+                depth += 1
+            del path[depth:]
+            sums[pos] = path[-1][1]
+        return sums  # type: ignore
+
+    def range_sums(self,
+                   starts: Iterable[int],
+                   stops: Iterable[int]) -> List[_T]:
+        """ Batched ``BIT.range_sum``, return the range sum for each pair
+        of indices in ``zip(starts, stops)``.
+
+        >>> b = BIT(range(10), inverse_binop=int.__sub__)
+        >>> b.range_sums([3, 0], [6, 9])
+        [15, 45]
+
+        :complexity: :math:`O(k\log{}n)` where `k` is the number of
+                     pairs and `n` is the number of items in the Binary
+                     Indexed Tree.
+        :raises IndexError: If BIT is empty, any `i > j`, or any index is
+                            out of bounds.
+        :raises TypeError: If `inverse_binop` hasn't been provided.
+        :raises ValueError: If starts and stops differ in length.
+        """
+        starts, stops = list(starts), list(stops)
+        if len(starts) != len(stops):
+            raise ValueError("starts and stops must be of equal length.")
+        if any(j < i for i, j in zip(starts, stops)):
+            raise IndexError("j must be > than i.")
+        if not self.inverse:
+            msg = "Inverse operator required for range_sums. "
+            raise TypeError(msg)
+        # one batch, so starts and stops share paths too.
+        inverse, count = self.inverse, len(stops)
+        sums = self.prefix_sums(stops + starts)
+        return [inverse(sums[k], sums[count + k]) for k in range(count)]
+
+    def __iter__(self) -> Iterator[_T]:
+        """ Iterate over the prefix sums, ``list(b)`` equals
+        ``[b[i] for i in range(len(b))]``.
+
+        >>> list(BIT(range(5)))
+        [0, 1, 3, 6, 10]
+
+        :complexity: :math:`O(n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        """
+        return self.iter_prefix_sums()
+
+    def __reversed__(self) -> Iterator[_T]:
+        """ Iterate over the prefix sums, last to first.
+
+        >>> list(reversed(BIT(range(5), inverse_binop=int.__sub__)))
+        [10, 6, 3, 1, 0]
+
+        With an ``inverse_binop`` each original value is recovered and
+        removed from the running sum, otherwise the prefix sums are
+        gathered in a list first.
+
+        :complexity: :math:`O(n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        """
+        if not self.inverse:
+            return reversed(list(self.iter_prefix_sums()))
+        return self._iter_reversed()
+
+    def _iter_reversed(self) -> Iterator[_T]:
+        """ ``BIT.__reversed__`` for trees with an ``inverse_binop``. """
+        storage, inverse = self._st, self.inverse
+        length = len(storage)
+        if not length:
+            return
+        acc = self.prefix_sum(-1)
+        for i in range(length, 1, -1):
+            yield acc
+            # original value at i - 1, peeling off every child node.
+            value = storage[i - 1]
+            for step in self._c_zero_lsb(i):
+                value = inverse(value, storage[i - 1 - step])  # type: ignore
+            acc = inverse(acc, value)  # type: ignore
+        yield acc
+
+    def iter_prefix_sums(self,
+                         start: Optional[int] = None,
+                         stop: Optional[int] = None) -> Iterator[_T]:
+        """ Yield the prefix sums for every index in
+        ``range(len(b))[start:stop]``, in order.
+
+        >>> b = BIT(range(10))
+        >>> list(b.iter_prefix_sums(3, 7))
+        [6, 10, 15, 21]
+        >>> list(b.iter_prefix_sums(-2))
+        [36, 45]
+
+        The prefix sum at (one based) ``q`` is node ``q`` combined with
+        the prefix sum at ``q & (q - 1)``, which is always on the stack of
+        prefix sums kept for ``q - 1``. Each step pushes one sum and pops
+        the ones no longer needed so no ``inverse_binop`` is required.
+
+        :complexity: :math:`O(k + \log{}n)` for `k` yielded sums, using
+                     :math:`O(\log{}n)` extra space.
+        """
+        storage, binop = self._st, self.binop
+        start, stop, _ = slice(start, stop).indices(len(storage))
+        # (one based index, prefix sum) for the ancestors of start + 1.
+        stack: List[Tuple[int, _T]] = []
+        node, rest = 0, start
+        while rest:
+            high = 1 << (rest.bit_length() - 1)
+            node, rest = node + high, rest - high
+            acc = storage[node - 1]
+            if stack:
+                acc = binop(acc, stack[-1][1])
+            stack.append((node, acc))
+        for q in range(start + 1, stop + 1):
+            parent = q & (q - 1)
+            while stack and stack[-1][0] != parent:
+                stack.pop()
+            acc = storage[q - 1]
+            if stack:
+                acc = binop(acc, stack[-1][1])
+            stack.append((q, acc))
+            yield acc
+
+    def lower_bound(self,
+                    target: Any,
+                    key: Optional[Callable[[_T], Any]] = None) -> int:
+        """ Return the first index whose prefix sum is not less than
+        ``target``, ``len(B)`` if there is no such index. Prefix sums must
+        be non-decreasing (for example ``add`` over non-negative values or
+        ``max``), ``key`` is applied to them before comparing, like the
+        key of ``bisect``.
+
+        >>> b = BIT([1, 2, 3, 4])
+        >>> b.lower_bound(6), b.lower_bound(7), b.lower_bound(11)
+        (2, 3, 4)
+        >>> BIT([{1}, {2}, {3}], set.union).lower_bound(2, key=len)
+        1
+
+        :complexity: :math:`O(\log{}n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        """
+        return self._descend(target, key, False)
+
+    def upper_bound(self,
+                    target: Any,
+                    key: Optional[Callable[[_T], Any]] = None) -> int:
+        """ Return the first index whose prefix sum is greater than
+        ``target``, ``len(B)`` if there is no such index. Same requirements
+        as ``BIT.lower_bound``.
+
+        >>> b = BIT([1, 2, 3, 4])
+        >>> b.upper_bound(6), b.upper_bound(0), b.upper_bound(10)
+        (3, 0, 4)
+
+        :complexity: :math:`O(\log{}n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        """
+        return self._descend(target, key, True)
+
+    def _descend(self,
+                 target: Any,
+                 key: Optional[Callable[[_T], Any]],
+                 upper: bool) -> int:
+        """ Walk down the implicit tree by decreasing powers of two,
+        extending the prefix while its sum stays below (or, for
+        ``upper``, at) target.
+        """
+        storage, length, binop = self._st, len(self), self.binop
+        pos, acc = 0, None
+        step = 1 << length.bit_length() >> 1
+        while step:
+            node = pos + step
+            if node <= length:
+                # node holds items [pos, node), acc the first pos items.
+                cand = storage[node - 1]
+                if pos:
+                    cand = binop(cand, acc)  # type: ignore
+                value = key(cand) if key else cand
+                if value <= target if upper else value < target:
+                    pos, acc = node, cand
+            step >>= 1
+        return pos
+
+    @classmethod
+    def build_parallel(cls,
+                       iterable: Iterable[_T],
+                       binop: Callable[[_T, _T], _T] = add,
+                       inverse_binop: Optional[Callable[[_T, _T], _T]] = None,
+                       typecode: str = 'q',
+                       workers: Optional[int] = None) -> 'BIT[_T]':
+        """ Build a typed tree from a large iterable using several
+        processes, the nodes equal those of
+        ``BIT(iterable, binop, typecode=typecode)``.
+
+        >>> b = BIT.build_parallel(range(10), workers=2)
+        >>> b.typecode, b[9]
+        ('q', 45)
+
+        Power of two aligned blocks of the values are laid out in a pool
+        of ``workers`` processes, over shared memory, and the few nodes
+        spanning several blocks are combined afterwards, see
+        :mod:`bit.parallel`. ``binop`` must be picklable. Inputs too small
+        to split are laid out in this process, as is every input before
+        Python 3.8, which lacks ``multiprocessing.shared_memory``.
+
+        :complexity: :math:`O(n)` where `n` is the number of items in the
+                     iterable, the calls to ``binop`` are shared among
+                     the workers.
+        :raises OverflowError: If a node doesn't fit ``typecode``.
+        """
+        tree = cls.__new__(cls)
+        try:
+            from .parallel import parallel_layout
+        except ImportError:
+            tree._st = cls.bit_layout(iterable, binop, typecode)
+        else:
+            tree._st = parallel_layout(iterable, binop, typecode, workers)
+        tree.binop = binop
+        tree.inverse = inverse_binop
+        return tree
+
+    @classmethod
+    def identity(cls,
+                 length: int,
+                 monoid: Monoid,
+                 typecode: Optional[str] = None) -> 'BIT[Any]':
+        """ Return a tree of length values, all the identity of monoid.
+        A tree of identities is its own layout, the nodes are filled in
+        directly and nothing is combined.
+
+        >>> from bit.monoid import MIN
+        >>> b = BIT.identity(4, MIN)
+        >>> b.update(2, 7)
+        >>> b[1], b[3]
+        (inf, 7)
+
+        :complexity: :math:`O(n)` for `n` values, without calling
+                     ``binop``.
+        :raises OverflowError: If the identity doesn't fit ``typecode``,
+                               like the infinite identities of ``MIN``
+                               and ``MAX`` in an integer typecode.
+        """
+        tree = cls([], monoid, typecode=typecode)
+        if typecode is None:
+            tree._st = [monoid.identity] * length
+            return tree
+        try:
+            nodes = array(typecode, [monoid.identity])
+        except TypeError:
+            # array rejects floats for integer typecodes with TypeError.
+            msg = "Identity {0!r} doesn't fit typecode '{1}'."
+            raise OverflowError(msg.format(monoid.identity,
+                                           typecode)) from None
+        tree._st = nodes * length
+        return tree
+
+    def freeze(self) -> SparseTable[_T]:
+        """ Return a :class:`bit.table.SparseTable` of the current
+        values, answering ``range_sum`` in :math:`O(1)` and without an
+        inverse, for trees over an idempotent monoid. Later changes to the
+        tree don't show up in the table.
+
+        >>> from bit.monoid import MAX
+        >>> b = BIT([5, 1, 4, 2, 3], MAX, keep_values=True)
+        >>> b.freeze().range_sum(1, 3)
+        4
+
+        :complexity: :math:`O(n\log{}n)` where `n` is the number of items
+                     in the Binary Indexed Tree.
+        :raises TypeError: If the tree wasn't built with an idempotent
+                           monoid or its values can't be recovered (see
+                           ``BIT.original_layout``).
+        """
+        if self.monoid is None or not self.monoid.idempotent:
+            msg = "freeze requires an idempotent monoid, got {0!r}."
+            raise TypeError(msg.format(self.monoid or self.binop))
+        return SparseTable(self.original_layout(), self.monoid)
+
+    # Serialization.
+    def to_bytes(self, typecode: Optional[str] = None) -> bytes:
+        """ Return the tree in the compact format of :mod:`bit.serial`, a
+        small header followed by the packed nodes. Only numeric trees
+        whose ``binop`` is one of ``bit.serial.BINOPS`` can be packed.
+
+        >>> data = BIT(range(10)).to_bytes()
+        >>> len(data)
+        96
+
+        The typecode of a typed tree is kept, otherwise ``'d'`` is used if
+        any node is a float and ``'q'`` if not.
+
+        :complexity: :math:`O(n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        :raises ValueError: If ``binop`` can't be recorded.
+        :raises TypeError: If the nodes aren't numbers.
+        :raises OverflowError: If a node doesn't fit typecode.
+        """
+        storage, current = self._st, self.typecode
+        if typecode is None:
+            typecode = current
+        if typecode is None:
+            floats = any(isinstance(v, float) for v in storage)
+            typecode = 'd' if floats else 'q'
+        header = serial.pack_header(typecode, self.binop, len(storage))
+        if typecode != current:
+            storage = array(typecode, storage)
+        nodes: bytes = storage.tobytes()
+        return header + nodes
+
+    @classmethod
+    def from_buffer(cls,
+                    buffer: Any,
+                    inverse_binop: Optional[Callable[[_T, _T], _T]] = None,
+                    copy: bool = False) -> 'BIT[Any]':
+        """ Load a tree from a buffer (``bytes``, ``bytearray``,
+        ``mmap``, ``memoryview``, ...) holding the output of
+        ``BIT.to_bytes``. ``binop``, and the inverse of operators that
+        have a well-known one, are restored from the header.
+
+        >>> b = BIT.from_buffer(bytearray(BIT(range(10)).to_bytes()))
+        >>> b[9], b.range_sum(3, 6)
+        (45, 15)
+
+        Without ``copy`` the tree wraps the buffer without copying it,
+        its nodes are updated in place so the buffer must be writable.
+        The nodes are copied to an ``array.array`` once the tree changes
+        length. With ``copy`` they are copied right away, as are nodes
+        written on a host of the other byte order, which are swapped.
+
+        :complexity: :math:`O(1)`, :math:`O(n)` with ``copy``.
+        :raises ValueError: If buffer doesn't hold a tree.
+        :raises TypeError: If buffer is read-only and ``copy`` isn't set.
+        """
+        view = memoryview(buffer)
+        if view.ndim != 1 or view.format != 'B':
+            view = view.cast('B')
+        typecode, binop, inverse, length = serial.unpack_header(view)
+        start = serial.HEADER.size
+        stop = start + length * array(typecode).itemsize
+        if len(view) < stop:
+            msg = "Buffer too small to hold {0} nodes."
+            raise ValueError(msg.format(length))
+        tree = cls.__new__(cls)
+        if serial.swapped(view):
+            nodes = array(typecode)
+            nodes.frombytes(view[start:stop])
+            nodes.byteswap()
+            tree._st = nodes
+        elif view.readonly and not copy:
+            raise TypeError("Buffer is read-only, use copy=True.")
+        else:
+            tree._st = view[start:stop].cast(typecode)  # type: ignore
+            if copy:
+                tree._growable()
+        tree.binop = binop
+        tree.inverse = inverse_binop or inverse
+        return tree
+
+    def __reduce__(self) -> Any:
+        """ Pickle numeric trees with their nodes in the compact format
+        of ``BIT.to_bytes``, the rest of the attributes as usual. Trees
+        whose nodes wouldn't come back unchanged (say, ints mixed with
+        floats) are pickled attribute by attribute.
+
+        >>> import pickle
+        >>> b = pickle.loads(pickle.dumps(BIT(range(10), typecode='q')))
+        >>> b.typecode, b[9]
+        ('q', 45)
+        """
+        storage = self._st
+        typed = isinstance(storage, (array, memoryview))
+        if self._values is None and (typed or isinstance(storage, list)
+                                     and self._packs_exactly(storage)):
+            try:
+                data = self.to_bytes()
+            except (ValueError, TypeError, OverflowError):
+                pass
+            else:
+                # binop, and its default inverse, come back from the
+                # header of data.
+                state = dict(self.__dict__)
+                del state['_st'], state['binop']
+                if state.get('inverse') is serial.unpack_header(data)[2]:
+                    del state['inverse']
+                return _restore, (type(self), data, typed), state
+        return object.__reduce__(self)
+
+    @staticmethod
+    def _packs_exactly(nodes: List[Any]) -> bool:
+        """ Whether ``BIT.to_bytes`` packs nodes without changing them:
+        all ints (packed as ``'q'``) or all floats (packed as ``'d'``).
+        Ints mixed with floats would all come back as floats.
+        """
+        kinds = set(map(type, nodes))
+        return kinds <= {int} or kinds == {float}
+
     # Helpers.
     def original_layout(self) -> List[_T]:
         """ Returns a list whose values, when transformed to a fenwick
@@ -428,8 +1250,11 @@ class BIT:
 
         :complexity: :math:`O(n)` where `n` is the number of items in
                      the Binary Indexed Tree.
-        :raises TypeError: If `inverse_binop` isn't provided.
+        :raises TypeError: If `inverse_binop` isn't provided and
+                           `keep_values` wasn't set.
         """
+        if self._values is not None:
+            return self._values[:]
         if not self.inverse:
             msg = "Inverse Binary Operator is required for original_layout"
             raise TypeError(msg)
@@ -447,29 +1272,93 @@ class BIT:
 
     @staticmethod
     def bit_layout(iterable: Iterable[_T],
-                   binary_op: Callable[[_T, _T], _T] = add) -> List[_T]:
-        """ Transform iterable to fenwick (BIT) representation.
+                   binary_op: Callable[[_T, _T], _T] = add,
+                   typecode: Optional[str] = None) -> Any:
+        """ Transform iterable to fenwick (BIT) representation, a list or
+        an ``array.array`` if a ``typecode`` is given.
 
         >>> BIT.bit_layout([1, 20, 4, 32])
         [1, 21, 4, 57]
         >>> BIT.bit_layout(i for i in range(13))
         [0, 1, 2, 6, 4, 9, 6, 28, 8, 17, 10, 38, 12]
+        >>> BIT.bit_layout([1, 20, 4, 32], typecode='i')
+        array('i', [1, 21, 4, 57])
 
         :complexity: :math:`O(n)` where `n` is the number of items
                      in the iterable.
+        :raises OverflowError: If a node doesn't fit ``typecode``.
         """
         # This loop makes serious sense when the intermediate
         # representation in [tweakblogs] is understood.
-        arr = list(iterable)
+        arr: Any
+        if typecode is None:
+            arr = list(iterable)
+        else:
+            arr = array(typecode, iterable)
         i, length = 1, len(arr)
         while i < length:
-            j = 2 * i - 1
-            while j < length:
-                arr[j] = binary_op(arr[j], arr[j - i])
-                j += 2 * i
+            # every node 2i - 1 (mod 2i) with the one i before it, a level
+            # at a time: map runs the loop in C and none of the nodes read
+            # are written in the same level.
+            step = 2 * i
+            level: Any = map(binary_op, arr[step - 1::step], arr[i - 1::step])
+            if typecode is not None:
+                level = array(typecode, level)
+            arr[step - 1::step] = level
             i *= 2
         return arr
 
+    @staticmethod
+    def _layout_from(arr: List[_T],
+                     start: int,
+                     binary_op: Callable[[_T, _T], _T],
+                     level: int = 1) -> None:
+        """ In place, lay out the values in ``arr[start:]`` given that
+        ``arr[:start]`` already holds tree nodes. This is the doubling
+        pass of ``BIT.bit_layout`` skipping the nodes before start: a
+        node before start combined at level ``i`` covers exactly ``i``
+        values, so its final value is the one the pass expects. Levels
+        below level are taken to be laid out already.
+        """
+        i, length = level, len(arr)
+        while i < length:
+            step = 2 * i
+            j = start + (step - 1 - start) % step
+            if j < length:
+                nodes = map(binary_op, arr[j::step], arr[j - i::step])
+                arr[j::step] = BIT._level(arr, nodes)
+            i *= 2
+
+    @staticmethod
+    def _original_from(arr: List[_T],
+                       start: int,
+                       inverse_op: Callable[[_T, _T], _T],
+                       level: int = 1) -> None:
+        """ In place, turn the nodes in ``arr[start:]`` back into values,
+        the reverse of ``BIT._layout_from``, down to level.
+        """
+        length = len(arr)
+        i = 1 << max(length - 1, 0).bit_length() >> 1
+        while i >= level:
+            step = 2 * i
+            j = start + (step - 1 - start) % step
+            if j < length:
+                nodes = map(inverse_op, arr[j::step], arr[j - i::step])
+                arr[j::step] = BIT._level(arr, nodes)
+            i //= 2
+
+    @staticmethod
+    def _level(arr: Any, nodes: Iterable[_T]) -> Any:
+        """ Nodes of a level, packed like arr for a typed tree. Packing
+        checks that every node fits before any of them is written, a node
+        that doesn't raises OverflowError.
+        """
+        if isinstance(arr, array):
+            return array(arr.typecode, nodes)
+        if isinstance(arr, memoryview):
+            return array(arr.format, nodes)
+        return list(nodes)
+
     # todo: these all are related. haven't been able to unify
     # nicely yet. A single function centered around powers of
     # two seems (mentally for me at least) like the way to go.
@@ -508,5 +1397,18 @@ class BIT:
         return index
 
 
+def _restore(cls: Type[BIT[Any]], data: bytes, typed: bool) -> BIT[Any]:
+    """ Unpickle the nodes, ``binop`` and default inverse of a tree
+    pickled by ``BIT.__reduce__``, the rest of its attributes are restored
+    by pickle.
+    """
+    loaded = BIT.from_buffer(data, copy=True)
+    tree = cls.__new__(cls)
+    nodes = loaded._st
+    tree._st = nodes if typed else nodes.tolist()
+    tree.binop, tree.inverse = loaded.binop, loaded.inverse
+    return tree
+
+
 # Register as virtual subclass.
 MutableSequence.register(BIT)
@@ -0,0 +1,274 @@
+"""Two dimensional Binary Indexed Tree.
+
+Node ``(r, c)`` holds the ``binop`` of every value in rows
+``(r - lsb(r), r]`` and columns ``(c - lsb(c), c]`` (one based), the nodes
+live row after row in a single flat list. Point updates and prefix
+queries walk the same bit patterns as :class:`bit.BIT`, once per axis.
+"""
+from operator import add
+from typing import (Callable, Dict, Generic, Iterable, List, Optional,
+                    Sequence, Tuple, TypeVar)
+
+from .bit import BIT
+
+_T = TypeVar('_T')
+_Point = Tuple[int, int]
+_Rect = Tuple[int, int, int, int]
+
+
+class BIT2D(Generic[_T]):
+    """ Two dimensional Binary Indexed Tree over a grid of values. """
+
+    _st: List[_T]
+    _shape: Tuple[int, int]
+    binop: Callable[[_T, _T], _T]
+    inverse: Optional[Callable[[_T, _T], _T]]
+
+    def __init__(self,
+                 rows: Optional[Iterable[Iterable[_T]]] = None,
+                 binop: Callable[[_T, _T], _T] = add,
+                 inverse_binop: Optional[Callable[[_T, _T], _T]] = None):
+        """
+        Initialize a new two dimensional tree from an iterable of rows.
+
+        >>> BIT2D([[1, 2], [3, 4]])
+        BIT2D([[1, 3], [4, 10]])
+
+        The same requirements as for :class:`bit.BIT` hold for ``binop``
+        and ``inverse_binop``, the latter is needed for rectangle sums and
+        for replacing values.
+
+        :complexity: :math:`O(rc)` for `r` rows of `c` columns.
+        :raises ValueError: If rows differ in length.
+        """
+        grid = [list(row) for row in rows or []]
+        cols = len(grid[0]) if grid else 0
+        if any(len(row) != cols for row in grid):
+            raise ValueError("All rows must have the same length.")
+        flat = [value for row in grid for value in row]
+        self._st = self.bit_layout(flat, len(grid), cols, binop)
+        self._shape = (len(grid), cols)
+        self.binop = binop
+        self.inverse = inverse_binop
+
+    def __repr__(self) -> str:
+        """ Return a sensible representation of the tree, row by row.
+
+        :complexity: :math:`O(rc)`
+        """
+        storage, cols = self._st, self._shape[1]
+        nested = [storage[base:base + cols]
+                  for base in range(0, len(storage), cols or 1)]
+        return "{0}({1!r})".format(type(self).__name__, nested)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """ Number of rows and columns. """
+        return self._shape
+
+    def __getitem__(self, index: _Point) -> _T:
+        """ Shorthand for ``BIT2D.prefix_sum(r, c)``.
+
+        >>> BIT2D([[1, 2], [3, 4]])[1, 0]
+        4
+        """
+        return self.prefix_sum(*index)
+
+    def __setitem__(self, index: _Point, value: _T) -> None:
+        """ Replace the value at ``(r, c)``, requires ``inverse_binop``.
+
+        >>> b = BIT2D([[1, 2], [3, 4]], inverse_binop=int.__sub__)
+        >>> b[0, 1] = 10
+        >>> b.original_layout()
+        [[1, 10], [3, 4]]
+
+        :complexity: :math:`O(\\log{}r\\log{}c)`
+        :raises IndexError: If ``(r, c)`` is out of bounds.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        r, c = index
+        old = self.rect_sum(r, c, r, c)
+        self.update(r, c, self.inverse(value, old))  # type: ignore
+
+    def update(self, r: int, c: int, value: _T) -> None:
+        """ Apply value, with ``binop``, to the value at ``(r, c)``.
+
+        >>> b = BIT2D([[1, 2], [3, 4]])
+        >>> b.update(0, 0, 10)
+        >>> b[1, 1]
+        20
+
+        :complexity: :math:`O(\\log{}r\\log{}c)`
+        :raises IndexError: If ``(r, c)`` is out of bounds.
+        """
+        storage, binop = self._st, self.binop
+        (rows, cols), (r, c) = self._shape, self._nmlz_point(r, c)
+        for i in BIT._f_zero_lsb(r, rows):
+            base = i * cols
+            for j in BIT._f_zero_lsb(c, cols):
+                storage[base + j] = binop(storage[base + j], value)
+
+    def prefix_sum(self, r: int, c: int) -> _T:
+        """ Return the ``binop`` of every value in rows ``[0, r]`` and
+        columns ``[0, c]``.
+
+        >>> BIT2D([[1, 2, 3], [4, 5, 6]]).prefix_sum(1, 1)
+        12
+
+        :complexity: :math:`O(\\log{}r\\log{}c)`
+        :raises IndexError: If ``(r, c)`` is out of bounds.
+        """
+        storage, binop, cols = self._st, self.binop, self._shape[1]
+        r, c = self._nmlz_point(r, c)
+        acc: Optional[_T] = None
+        for i in BIT._c_one_lsb(r + 1):
+            base = (i - 1) * cols - 1
+            for j in BIT._c_one_lsb(c + 1):
+                value = storage[base + j]
+                acc = value if acc is None else binop(acc, value)
+        return acc  # type: ignore
+
+    def rect_sum(self, r0: int, c0: int, r1: int, c1: int) -> _T:
+        """ Return the ``binop`` of every value in rows ``[r0, r1]`` and
+        columns ``[c0, c1]``, requires ``inverse_binop``.
+
+        >>> b = BIT2D([[1, 2, 3], [4, 5, 6]], inverse_binop=int.__sub__)
+        >>> b.rect_sum(0, 1, 1, 2)
+        16
+
+        :complexity: :math:`O(\\log{}r\\log{}c)`
+        :raises IndexError: If a corner is out of bounds or
+                            ``r0 > r1``/``c0 > c1``.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        return self.rect_sums([(r0, c0, r1, c1)])[0]
+
+    def prefix_sums(self, points: Iterable[_Point]) -> List[_T]:
+        """ Batched ``BIT2D.prefix_sum``, returns a list aligned with
+        points. Repeated points are only queried once.
+
+        >>> BIT2D([[1, 2], [3, 4]]).prefix_sums([(1, 1), (0, 1), (1, 1)])
+        [10, 3, 10]
+
+        :complexity: :math:`O(k\\log{}r\\log{}c)` for `k` distinct points.
+        :raises IndexError: If any point is out of bounds.
+        """
+        points = [self._nmlz_point(r, c) for r, c in points]
+        sums: Dict[_Point, _T] = {}
+        for point in set(points):
+            sums[point] = self.prefix_sum(*point)
+        return [sums[point] for point in points]
+
+    def rect_sums(self, rects: Iterable[_Rect]) -> List[_T]:
+        """ Batched ``BIT2D.rect_sum``. The corners of every rectangle
+        are gathered in one ``prefix_sums`` call, so corners shared by
+        neighbouring rectangles are only queried once.
+
+        >>> b = BIT2D([[1, 2, 3], [4, 5, 6]], inverse_binop=int.__sub__)
+        >>> b.rect_sums([(0, 0, 0, 2), (1, 0, 1, 2)])
+        [6, 15]
+
+        :complexity: :math:`O(k\\log{}r\\log{}c)` for `k` rectangles.
+        :raises IndexError: If a corner is out of bounds or
+                            ``r0 > r1``/``c0 > c1``.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        inverse, binop = self.inverse, self.binop
+        if not inverse:
+            msg = "Inverse operator required for rect_sum. "
+            raise TypeError(msg)
+        bounds: List[_Rect] = []
+        corners: List[_Point] = []
+        for r0, c0, r1, c1 in rects:
+            r0, c0 = self._nmlz_point(r0, c0)
+            r1, c1 = self._nmlz_point(r1, c1)
+            if r1 < r0 or c1 < c0:
+                raise IndexError("r1, c1 must be >= than r0, c0.")
+            bounds.append((r0, c0, r1, c1))
+            corners.append((r1, c1))
+            if r0:
+                corners.append((r0 - 1, c1))
+            if c0:
+                corners.append((r1, c0 - 1))
+            if r0 and c0:
+                corners.append((r0 - 1, c0 - 1))
+
+        sums = iter(self.prefix_sums(corners))
+        result: List[_T] = []
+        for r0, c0, r1, c1 in bounds:
+            total = next(sums)
+            if r0:
+                total = inverse(total, next(sums))
+            if c0:
+                total = inverse(total, next(sums))
+            if r0 and c0:
+                total = binop(total, next(sums))
+            result.append(total)
+        return result
+
+    def original_layout(self) -> List[List[_T]]:
+        """ Return the grid of values, row by row, requires
+        ``inverse_binop``.
+
+        >>> b = BIT2D([[1, 2], [3, 4]], inverse_binop=int.__sub__)
+        >>> b.original_layout()
+        [[1, 2], [3, 4]]
+
+        :complexity: :math:`O(rc)`
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        inverse = self.inverse
+        if not inverse:
+            msg = "Inverse Binary Operator is required for original_layout"
+            raise TypeError(msg)
+        (rows, cols), arr = self._shape, list(self._st)
+        # undo rows, then columns, in the reverse order of bit_layout.
+        i = 1 << max(rows - 1, 0).bit_length() >> 1
+        while i:
+            for r in range(2 * i - 1, rows, 2 * i):
+                dst, src = r * cols, (r - i) * cols
+                for c in range(cols):
+                    arr[dst + c] = inverse(arr[dst + c], arr[src + c])
+            i //= 2
+        i = 1 << max(cols - 1, 0).bit_length() >> 1
+        while i:
+            for base in range(0, rows * cols, cols):
+                for j in range(base + 2 * i - 1, base + cols, 2 * i):
+                    arr[j] = inverse(arr[j], arr[j - i])
+            i //= 2
+        return [arr[base:base + cols] for base in range(0, rows * cols, cols)]
+
+    @staticmethod
+    def bit_layout(flat: Sequence[_T],
+                   rows: int,
+                   cols: int,
+                   binary_op: Callable[[_T, _T], _T] = add) -> List[_T]:
+        """ Transform a flat, row major, grid to its two dimensional
+        fenwick representation. Applies the doubling pass of
+        ``BIT.bit_layout`` along every row and then along every column.
+
+        >>> BIT2D.bit_layout([1, 2, 3, 4], 2, 2)
+        [1, 3, 4, 10]
+
+        :complexity: :math:`O(rc)`
+        """
+        arr = list(flat)
+        i = 1
+        while i < cols:
+            for base in range(0, rows * cols, cols):
+                for j in range(base + 2 * i - 1, base + cols, 2 * i):
+                    arr[j] = binary_op(arr[j], arr[j - i])
+            i *= 2
+        i = 1
+        while i < rows:
+            for r in range(2 * i - 1, rows, 2 * i):
+                dst, src = r * cols, (r - i) * cols
+                for c in range(cols):
+                    arr[dst + c] = binary_op(arr[dst + c], arr[src + c])
+            i *= 2
+        return arr
+
+    def _nmlz_point(self, r: int, c: int) -> _Point:
+        """ Normalize both coordinates, see ``BIT._nmlz_index``. """
+        rows, cols = self._shape
+        return BIT._nmlz_index(r, rows), BIT._nmlz_index(c, cols)
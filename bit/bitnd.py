@@ -0,0 +1,295 @@
+"""N dimensional Binary Indexed Tree.
+
+The natural generalization of :class:`bit.BIT2D`, node ``(x0, ..., xd)``
+holds the ``binop`` of every value whose coordinate along each axis ``k``
+lies in ``(xk - lsb(xk), xk]`` (one based). Nodes live in a single flat,
+row major, buffer that can optionally be an ``array.array`` for numeric
+values.
+"""
+from array import array
+from operator import add
+from typing import (Any, Callable, Generic, Iterable, List, MutableSequence,
+                    Optional, Sequence, Tuple, TypeVar)
+
+from .bit import BIT
+
+_T = TypeVar('_T')
+_Point = Sequence[int]
+
+
+class BITND(Generic[_T]):
+    """ N dimensional Binary Indexed Tree over a hyper-rectangle of
+    values.
+    """
+
+    _st: MutableSequence[_T]
+    _shape: Tuple[int, ...]
+    _strides: Tuple[int, ...]
+    binop: Callable[[_T, _T], _T]
+    inverse: Optional[Callable[[_T, _T], _T]]
+
+    def __init__(self,
+                 shape: Sequence[int],
+                 binop: Callable[[_T, _T], _T] = add,
+                 inverse_binop: Optional[Callable[[_T, _T], _T]] = None,
+                 iterable: Optional[Iterable[Any]] = None,
+                 typecode: Optional[str] = None,
+                 fill: Any = 0):
+        """
+        Initialize a new N dimensional tree of the given shape, from a
+        nested or a flat (row major) iterable.
+
+        >>> BITND((2, 2), iterable=[[1, 2], [3, 4]])
+        BITND((2, 2), [1, 3, 4, 10])
+        >>> BITND((2, 3))
+        BITND((2, 3), [0, 0, 0, 0, 0, 0])
+
+        Without an iterable every value starts out as ``fill`` which
+        should be the identity of ``binop``. A ``typecode`` stores the
+        nodes in an ``array.array`` of that type instead of a list.
+
+        :complexity: :math:`O(dN)` for `N` values in `d` dimensions.
+        :raises ValueError: If the iterable doesn't match the shape.
+        """
+        shape = tuple(shape)
+        size = 1
+        for n in shape:
+            size *= n
+        if iterable is None:
+            # a tree of identities is its own layout.
+            flat = [fill] * size
+        else:
+            flat = self._flatten(list(iterable), shape, size)
+        storage: MutableSequence[Any] = flat
+        if typecode is not None:
+            storage = array(typecode, flat)
+        self._shape = shape
+        self._strides = self._row_major(shape)
+        self._st = storage
+        if iterable is not None:
+            self._layout(storage, binop)
+        self.binop = binop
+        self.inverse = inverse_binop
+
+    def __repr__(self) -> str:
+        """ Return a sensible representation of the tree.
+
+        :complexity: :math:`O(N)`
+        """
+        return "{0}({1!r}, {2!r})".format(type(self).__name__,
+                                          self._shape, list(self._st))
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """ Number of values along each axis. """
+        return self._shape
+
+    @property
+    def ndim(self) -> int:
+        """ Number of axes. """
+        return len(self._shape)
+
+    def __len__(self) -> int:
+        """ Return the total number of values.
+
+        >>> len(BITND((2, 3, 4)))
+        24
+
+        :complexity: :math:`O(1)`
+        """
+        return len(self._st)
+
+    def __getitem__(self, point: _Point) -> _T:
+        """ Shorthand for ``BITND.prefix_sum(point)``.
+
+        >>> BITND((2, 2), iterable=[1, 2, 3, 4])[1, 0]
+        4
+        """
+        return self.prefix_sum(point)
+
+    def __setitem__(self, point: _Point, value: _T) -> None:
+        """ Replace the value at point, requires ``inverse_binop``.
+
+        >>> b = BITND((2, 2), int.__add__, int.__sub__, [1, 2, 3, 4])
+        >>> b[1, 0] = 10
+        >>> b.original_layout()
+        [[1, 2], [10, 4]]
+
+        :complexity: :math:`O(2^d\\prod{}\\log{}n_k)`
+        :raises IndexError: If point is out of bounds.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        old = self.rect_sum(point, point)
+        self.update(point, self.inverse(value, old))  # type: ignore
+
+    def update(self, point: _Point, value: _T) -> None:
+        """ Apply value, with ``binop``, to the value at point.
+
+        >>> b = BITND((2, 2, 2))
+        >>> b.update((0, 1, 0), 5)
+        >>> b[1, 1, 1], b[1, 0, 1]
+        (5, 0)
+
+        :complexity: :math:`O(\\prod{}\\log{}n_k)`
+        :raises IndexError: If point is out of bounds.
+        """
+        storage, binop = self._st, self.binop
+        offsets = [0]
+        for x, n, stride in zip(self._nmlz_point(point), self._shape,
+                                self._strides):
+            offsets = [o + i * stride for o in offsets
+                       for i in BIT._f_zero_lsb(x, n)]
+        for o in offsets:
+            storage[o] = binop(storage[o], value)
+
+    def prefix_sum(self, point: _Point) -> _T:
+        """ Return the ``binop`` of every value whose coordinates are all
+        lower than or equal to those of point.
+
+        >>> b = BITND((2, 3), iterable=[[1, 2, 3], [4, 5, 6]])
+        >>> b.prefix_sum((1, 1))
+        12
+
+        :complexity: :math:`O(\\prod{}\\log{}n_k)`
+        :raises IndexError: If point is out of bounds.
+        """
+        storage, binop = self._st, self.binop
+        offsets = [0]
+        for x, stride in zip(self._nmlz_point(point), self._strides):
+            offsets = [o + (i - 1) * stride for o in offsets
+                       for i in BIT._c_one_lsb(x + 1)]
+        acc = storage[offsets[0]]
+        for o in offsets[1:]:
+            acc = binop(acc, storage[o])
+        return acc
+
+    def rect_sum(self, lo: _Point, hi: _Point) -> _T:
+        """ Return the ``binop`` of every value inside the hyper-rectangle
+        with corners lo and hi (both included), requires
+        ``inverse_binop``. Uses inclusion-exclusion over the corners.
+
+        >>> b = BITND((2, 2, 2), int.__add__, int.__sub__, range(8))
+        >>> b.rect_sum((1, 0, 1), (1, 1, 1))
+        12
+
+        :complexity: :math:`O(2^d\\prod{}\\log{}n_k)`
+        :raises IndexError: If a corner is out of bounds or ``lo > hi``
+                            along an axis.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        inverse, binop = self.inverse, self.binop
+        if not inverse:
+            msg = "Inverse operator required for rect_sum. "
+            raise TypeError(msg)
+        lo, hi = self._nmlz_point(lo), self._nmlz_point(hi)
+        if any(h < low for low, h in zip(lo, hi)):
+            raise IndexError("hi must be >= than lo along every axis.")
+        # corners as (point, number of axes taken from lo).
+        corners: List[Tuple[List[int], int]] = [([], 0)]
+        for low, h in zip(lo, hi):
+            step = [(c + [h], odd) for c, odd in corners]
+            if low:
+                step += [(c + [low - 1], odd + 1) for c, odd in corners]
+            corners = step
+        total = self.prefix_sum(corners[0][0])
+        for corner, odd in corners[1:]:
+            op = inverse if odd & 1 else binop
+            total = op(total, self.prefix_sum(corner))
+        return total
+
+    def original_layout(self) -> List[Any]:
+        """ Return the values as nested lists, requires ``inverse_binop``.
+
+        >>> b = BITND((2, 2), int.__add__, int.__sub__, range(4))
+        >>> b.original_layout()
+        [[0, 1], [2, 3]]
+
+        :complexity: :math:`O(dN)`
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        inverse = self.inverse
+        if not inverse:
+            msg = "Inverse Binary Operator is required for original_layout"
+            raise TypeError(msg)
+        arr = list(self._st)
+        axes = list(zip(self._shape, self._strides))
+        for n, stride in reversed(axes):
+            levels = []
+            i = 1
+            while i < n:
+                levels.append(i)
+                i *= 2
+            for i in reversed(levels):
+                self._level(arr, inverse, n, stride, i)
+        nested: List[Any] = arr
+        for n in reversed(self._shape[1:]):
+            nested = [nested[k:k + n] for k in range(0, len(nested), n)]
+        return nested
+
+    def _layout(self,
+                arr: MutableSequence[Any],
+                binary_op: Callable[[Any, Any], Any]) -> None:
+        """ In place doubling pass of ``BIT.bit_layout`` along every
+        axis.
+        """
+        for n, stride in zip(self._shape, self._strides):
+            i = 1
+            while i < n:
+                self._level(arr, binary_op, n, stride, i)
+                i *= 2
+
+    def _level(self,
+               arr: MutableSequence[Any],
+               binary_op: Callable[[Any, Any], Any],
+               n: int,
+               stride: int,
+               i: int) -> None:
+        """ Combine every position at coordinate ``2i - 1 (mod 2i)``
+        along an axis of length n with the position i steps before it.
+        """
+        step = i * stride
+        for base in range(0, len(arr), n * stride):
+            for x in range(2 * i - 1, n, 2 * i):
+                start = base + x * stride
+                for p in range(start, start + stride):
+                    arr[p] = binary_op(arr[p], arr[p - step])
+
+    def _nmlz_point(self, point: _Point) -> List[int]:
+        """ Normalize every coordinate, see ``BIT._nmlz_index``. """
+        if len(point) != len(self._shape):
+            msg = "Expected {0} coordinates, got {1}."
+            raise IndexError(msg.format(len(self._shape), len(point)))
+        return [BIT._nmlz_index(x, n) for x, n in zip(point, self._shape)]
+
+    @staticmethod
+    def _row_major(shape: Tuple[int, ...]) -> Tuple[int, ...]:
+        """ Strides of a row major layout of shape. """
+        strides = [1] * len(shape)
+        for k in range(len(shape) - 2, -1, -1):
+            strides[k] = strides[k + 1] * shape[k + 1]
+        return tuple(strides)
+
+    @staticmethod
+    def _flatten(values: List[Any],
+                 shape: Tuple[int, ...],
+                 size: int) -> List[Any]:
+        """ Return values as a flat row major list, values can either be
+        flat already or nested following shape.
+        """
+        nested = len(shape) > 1 and bool(values) and all(
+            isinstance(v, (list, tuple)) for v in values
+        )
+        if not nested:
+            if len(values) != size:
+                msg = "Expected {0} values, got {1}."
+                raise ValueError(msg.format(size, len(values)))
+            return values
+        count = 1
+        for k in range(len(shape) - 1):
+            count *= shape[k]
+            if len(values) != count or any(
+                    not isinstance(v, (list, tuple)) or len(v) != shape[k + 1]
+                    for v in values):
+                raise ValueError("Nested values don't match shape.")
+            values = [x for v in values for x in v]
+        return values
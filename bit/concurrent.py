@@ -0,0 +1,224 @@
+"""Thread safe Binary Indexed Tree.
+
+Writes (``update``, ``__setitem__``, ``insert``, ...) walk and modify
+several nodes, a reader running in between could combine nodes from
+before and after the write and return a sum that never existed. Free
+threaded builds of CPython make this a lot more likely, but the GIL can
+switch threads mid-walk too.
+
+:class:`ConcurrentBIT` serializes writers on a lock and lets readers go
+without it, seqlock style: every write bumps a sequence number once
+before it touches a node and once after, so the number is odd while a
+write is in flight. A reader notes the number, runs the query and checks
+the number again, retrying if a write started or finished in between.
+Readers only fall back to taking the lock when a write is in flight or
+after a few failed attempts, so they never block each other and never
+return a torn result.
+"""
+import threading
+from array import array
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional, Type, TypeVar
+
+from .bit import BIT
+
+_T = TypeVar('_T')
+_R = TypeVar('_R')
+_F = TypeVar('_F', bound=Callable[..., Any])
+
+
+def _reader(method: _F) -> _F:
+    """ Run method with the optimistic read protocol of
+    ``ConcurrentBIT._read``.
+    """
+    @wraps(method)
+    def read(self: 'ConcurrentBIT[Any]', *args: Any, **kwargs: Any) -> Any:
+        return self._read(method, self, *args, **kwargs)
+    return read  # type: ignore
+
+
+def _writer(method: _F) -> _F:
+    """ Run method holding the lock, see ``ConcurrentBIT._write``. """
+    @wraps(method)
+    def write(self: 'ConcurrentBIT[Any]', *args: Any,
+              **kwargs: Any) -> Any:
+        return self._write(method, self, *args, **kwargs)
+    return write  # type: ignore
+
+
+class ConcurrentBIT(BIT[_T]):
+    """ Binary Indexed Tree safe to share between threads. """
+
+    # optimistic attempts a reader makes before taking the lock.
+    _retries = 3
+    # held by writers, and by readers that gave up retrying.
+    _lock: threading.RLock
+    # odd while a write is in flight, bumped before and after it.
+    _seq: int
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> 'ConcurrentBIT[Any]':
+        # set up here, rather than in __init__, so trees made by
+        # from_buffer or unpickled are guarded too.
+        self = super().__new__(cls)
+        self._lock = threading.RLock()
+        self._seq = 0
+        return self
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """
+        Initialize a new thread safe tree, takes the same arguments as
+        :class:`bit.BIT`.
+
+        >>> from operator import add, sub
+        >>> b = ConcurrentBIT(range(10), add, sub)
+        >>> b.update(3, 10)
+        >>> b[9], b.range_sum(2, 5)
+        (55, 22)
+
+        Every method of ``BIT`` is available, writes hold a lock while
+        queries retry, instead of blocking, when they overlap a write.
+        Iterating goes over a consistent snapshot of the prefix sums.
+
+        :complexity: :math:`O(n)` where `n` is the number of
+                     items in the iterable.
+        """
+        super().__init__(*args, **kwargs)
+
+    def _read(self, method: Callable[..., _R], *args: Any,
+              **kwargs: Any) -> _R:
+        """ Call method, retrying it if a write overlapped it. An
+        exception only escapes if no write overlapped the call that
+        raised it, a torn read can fail in ways a consistent one can't.
+        """
+        for _ in range(self._retries):
+            seq = self._seq
+            if seq & 1:
+                # a write is in flight, wait for it on the lock.
+                break
+            try:
+                result = method(*args, **kwargs)
+            except Exception:
+                if self._seq != seq:
+                    continue
+                raise
+            if self._seq == seq:
+                return result
+        with self._lock:
+            return method(*args, **kwargs)
+
+    def _write(self, method: Callable[..., _R], *args: Any,
+               **kwargs: Any) -> _R:
+        """ Call method holding the lock, with the sequence number odd
+        while it runs. Writes nested in another one (``+=`` extends,
+        ``remove`` pops, ...) leave the number alone.
+        """
+        with self._lock:
+            if self._seq & 1:
+                return method(*args, **kwargs)
+            self._seq += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._seq += 1
+
+    # Queries.
+    __getitem__ = _reader(BIT.__getitem__)
+    __repr__ = _reader(BIT.__repr__)
+    value_at = _reader(BIT.value_at)
+    index = _reader(BIT.index)
+    range_sum = _reader(BIT.range_sum)
+    prefix_sum = _reader(BIT.prefix_sum)
+    prefix_sums = _reader(BIT.prefix_sums)
+    range_sums = _reader(BIT.range_sums)
+    lower_bound = _reader(BIT.lower_bound)
+    upper_bound = _reader(BIT.upper_bound)
+    original_layout = _reader(BIT.original_layout)
+    to_bytes = _reader(BIT.to_bytes)
+
+    # Writes.
+    __setitem__ = _writer(BIT.__setitem__)
+    __delitem__ = _writer(BIT.__delitem__)
+    __iadd__ = _writer(BIT.__iadd__)
+    update = _writer(BIT.update)
+    update_many = _writer(BIT.update_many)
+    append = _writer(BIT.append)
+    insert = _writer(BIT.insert)
+    pop = _writer(BIT.pop)
+    remove = _writer(BIT.remove)
+    extend = _writer(BIT.extend)
+
+    def __reversed__(self) -> Iterator[_T]:
+        """ Iterate over a snapshot of the prefix sums, last to first.
+
+        >>> list(reversed(ConcurrentBIT(range(5))))
+        [10, 6, 3, 1, 0]
+
+        :complexity: :math:`O(n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        """
+        return iter(self._read(lambda: list(BIT.__reversed__(self))))
+
+    def iter_prefix_sums(self,
+                         start: Optional[int] = None,
+                         stop: Optional[int] = None) -> Iterator[_T]:
+        """ Like ``BIT.iter_prefix_sums``, the sums are gathered up front
+        so that writes made while iterating don't show up halfway.
+
+        >>> list(ConcurrentBIT(range(10)).iter_prefix_sums(3, 7))
+        [6, 10, 15, 21]
+
+        :complexity: :math:`O(k + \\log{}n)` for `k` yielded sums, using
+                     :math:`O(k)` extra space.
+        """
+        return iter(self._read(
+            lambda: list(BIT.iter_prefix_sums(self, start, stop))
+        ))
+
+    def snapshot(self) -> BIT[_T]:
+        """ Return a plain ``BIT`` holding a consistent copy of the tree,
+        for long running queries that shouldn't retry.
+
+        >>> b = ConcurrentBIT(range(10))
+        >>> s = b.snapshot()
+        >>> b.update(0, 10)
+        >>> type(s).__name__, s[9], b[9]
+        ('BIT', 45, 55)
+
+        :complexity: :math:`O(n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        """
+        tree = BIT.__new__(BIT)
+        tree.__dict__.update(self._read(self._copy_state))
+        return tree
+
+    def __reduce__(self) -> Any:
+        """ Pickle a snapshot of the tree, locks can't be pickled.
+
+        >>> import pickle
+        >>> b = pickle.loads(pickle.dumps(ConcurrentBIT(range(10))))
+        >>> type(b).__name__, b[9]
+        ('ConcurrentBIT', 45)
+        """
+        return _wrap, (type(self), self.snapshot())
+
+    def _copy_state(self) -> Dict[str, Any]:
+        """ Instance attributes minus the locks, nodes and kept values
+        copied.
+        """
+        state = dict(self.__dict__)
+        del state['_lock'], state['_seq']
+        storage = state['_st']
+        if isinstance(storage, memoryview):
+            state['_st'] = array(storage.format, storage.tobytes())
+        else:
+            state['_st'] = storage[:]
+        if state.get('_values') is not None:
+            state['_values'] = state['_values'][:]
+        return state
+
+
+def _wrap(cls: Type[ConcurrentBIT[Any]], tree: BIT[Any]) -> ConcurrentBIT[Any]:
+    """ Unpickle a tree pickled by ``ConcurrentBIT.__reduce__``. """
+    self = cls.__new__(cls)
+    self.__dict__.update(tree.__dict__)
+    return self
@@ -0,0 +1,391 @@
+"""Prefix aggregates over a sequence with cheap inserts and deletions.
+
+Values live in a list of blocks holding between ``load / 2`` and
+``2 * load`` values each (the last block may hold fewer). A :class:`BIT`
+over the aggregate of each block and another over the block lengths turn
+positions into (block, offset) pairs and prefix queries into a prefix
+query over the blocks followed by a scan inside a single block. Inserting
+or deleting a value only shifts the values of its block, blocks are split
+or merged once they grow too large or run small.
+"""
+from collections.abc import MutableSequence
+from functools import reduce
+from itertools import islice
+from operator import add, sub
+from typing import (Callable, Generic, Iterable, Iterator, List, Optional,
+                    Tuple, TypeVar, Union)
+
+from .bit import BIT
+
+_T = TypeVar('_T')
+
+
+class DynamicBIT(Generic[_T]):
+    """ Sequence of values supporting prefix aggregates along with
+    inserts and deletions at arbitrary positions.
+    """
+
+    binop: Callable[[_T, _T], _T]
+    inverse: Optional[Callable[[_T, _T], _T]]
+    _blocks: List[List[_T]]
+    # the binop of each block and the trees over them, see _reindex.
+    _aggs: List[_T]
+    _index: BIT[_T]
+    _lengths: BIT[int]
+
+    def __init__(self,
+                 iterable: Optional[Iterable[_T]] = None,
+                 binop: Callable[[_T, _T], _T] = add,
+                 inverse_binop: Optional[Callable[[_T, _T], _T]] = None,
+                 load: int = 256):
+        """
+        Initialize a new dynamic sequence with an optional iterable.
+
+        >>> DynamicBIT(range(5))
+        DynamicBIT([0, 1, 2, 3, 4])
+
+        The same requirements as for :class:`bit.BIT` hold for ``binop``
+        and ``inverse_binop``. ``load`` is the number of values per block,
+        larger blocks make inserts and deletions touch fewer blocks but
+        make every query scan more values.
+
+        :complexity: :math:`O(n)` where `n` is the number of
+                     items in the iterable.
+        :raises ValueError: If load is smaller than 2.
+        """
+        if load < 2:
+            raise ValueError("load must be at least 2.")
+        values = list(iterable or [])
+        self.binop = binop
+        self.inverse = inverse_binop
+        self._load = load
+        self._blocks = [values[k:k + load]
+                        for k in range(0, len(values), load)]
+        self._aggs = [reduce(binop, block) for block in self._blocks]
+        self._len = len(values)
+        self._reindex()
+
+    def __repr__(self) -> str:
+        """ Return a sensible representation of the sequence.
+
+        :complexity: :math:`O(n)`
+        """
+        return "{0}({1!r})".format(type(self).__name__,
+                                   self.original_layout())
+
+    def __len__(self) -> int:
+        """ Return the number of elements in the sequence.
+
+        >>> len(DynamicBIT(range(5)))
+        5
+
+        :complexity: :math:`O(1)`
+        """
+        return self._len
+
+    def __iter__(self) -> Iterator[_T]:
+        """ Iterate over the prefix sums, like ``BIT.__iter__``.
+
+        >>> list(DynamicBIT(range(5)))
+        [0, 1, 3, 6, 10]
+
+        :complexity: :math:`O(n)`
+        """
+        binop, acc = self.binop, None
+        for block in self._blocks:
+            for value in block:
+                acc = value if acc is None else binop(acc, value)
+                yield acc
+
+    def __getitem__(self, index: Union[int, slice]) -> _T:
+        """ Return the prefix sum until (including!) index, a slice is
+        shorthand for ``DynamicBIT.range_sum`` like ``BIT.__getitem__``.
+
+        >>> d = DynamicBIT(range(10), inverse_binop=int.__sub__)
+        >>> d[9], d[-2], d[3:6]
+        (45, 36, 15)
+
+        :complexity: :math:`O(\\log{}n + L)` for a ``load`` of `L`.
+        :raises IndexError: If empty or index is out of bounds.
+        """
+        if isinstance(index, slice):
+            length = len(self)
+            start, end = index.start, index.stop
+            if start is None:
+                start = 0
+            else:
+                start = start + length if start < 0 else start
+            if end is None:
+                end = length - 1
+            else:
+                end = end + length if end < 0 else end
+            return self.range_sum(start, end)
+        return self.prefix_sum(index)
+
+    def __setitem__(self, index: int, value: _T) -> None:
+        """ Replace the value at index, requires ``inverse_binop``.
+
+        >>> d = DynamicBIT(range(5), inverse_binop=int.__sub__)
+        >>> d[0] = 10
+        >>> d.original_layout()
+        [10, 1, 2, 3, 4]
+
+        :complexity: :math:`O(\\log{}n + L)`
+        :raises IndexError: If empty or index is out of bounds.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        if not self.inverse:
+            msg = "Inverse Operator is required to set an item. "
+            raise TypeError(msg)
+        k, offset = self._locate(index)
+        block = self._blocks[k]
+        block[offset] = value
+        self._aggs[k] = reduce(self.binop, block)
+        self._index[k] = self._aggs[k]
+
+    def __delitem__(self, index: int) -> None:
+        """ Delete the item at index, see ``DynamicBIT.pop``.
+
+        >>> d = DynamicBIT(range(5), inverse_binop=int.__sub__)
+        >>> del d[0]
+        >>> d.original_layout()
+        [1, 2, 3, 4]
+        """
+        self.pop(index)
+
+    def value_at(self, index: int) -> _T:
+        """ Return the value at index.
+
+        >>> DynamicBIT(range(5)).value_at(-2)
+        3
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If empty or index is out of bounds.
+        """
+        k, offset = self._locate(index)
+        return self._blocks[k][offset]
+
+    def update(self, index: int, value: _T) -> None:
+        """ Apply value, with ``binop``, to the value at index.
+
+        >>> d = DynamicBIT(range(5))
+        >>> d.update(1, 10)
+        >>> d.original_layout()
+        [0, 11, 2, 3, 4]
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If empty or index is out of bounds.
+        """
+        binop = self.binop
+        k, offset = self._locate(index)
+        block = self._blocks[k]
+        block[offset] = binop(block[offset], value)
+        self._aggs[k] = binop(self._aggs[k], value)
+        self._index.update(k, value)
+
+    def prefix_sum(self, index: int) -> _T:
+        """ Return the prefix sum until (including!) index.
+
+        >>> d = DynamicBIT(range(10), load=4)
+        >>> d.insert(0, 100)
+        >>> d.prefix_sum(0), d.prefix_sum(9)
+        (100, 136)
+
+        :complexity: :math:`O(\\log{}n + L)`, a prefix query over the
+                     blocks and a scan of up to ``2 * load`` values.
+        :raises IndexError: If empty or index is out of bounds.
+        """
+        k, offset = self._locate(index)
+        acc = reduce(self.binop, islice(self._blocks[k], offset + 1))
+        if k:
+            acc = self.binop(acc, self._index.prefix_sum(k - 1))
+        return acc
+
+    def range_sum(self, i: int = 0, j: Optional[int] = None) -> _T:
+        """ Return ``inverse_binop(self[j], self[i])``, exactly like
+        ``BIT.range_sum``.
+
+        >>> d = DynamicBIT(range(10), inverse_binop=int.__sub__)
+        >>> d.range_sum(3, 6)
+        15
+
+        :complexity: :math:`O(\\log{}n + L)`
+        :raises IndexError: If empty, `i > j`, or any of them is out of
+                            bounds.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        if j is None:
+            j = len(self) - 1
+        if j < i:
+            raise IndexError("j must be > than i.")
+        if not self.inverse:
+            msg = "Inverse operator required for range_sum. "
+            raise TypeError(msg)
+        return self.inverse(self[j], self[i])
+
+    def append(self, value: _T) -> None:
+        """ Append a new value to the sequence.
+
+        >>> d = DynamicBIT(range(3))
+        >>> d.append(10)
+        >>> d[-1]
+        13
+
+        :complexity: :math:`O(\\log{}n)` amortized.
+        """
+        self.insert(len(self), value)
+
+    def extend(self, iterable: Iterable[_T]) -> None:
+        """ Extend the sequence by appending elements from the iterable.
+
+        :complexity: :math:`O(k\\log{}n)` for `k` new elements.
+        """
+        for value in iterable:
+            self.append(value)
+
+    def insert(self, index: int, value: _T) -> None:
+        """ Insert value before index, indices are clamped like
+        ``list.insert`` does. Unlike ``BIT.insert`` no ``inverse_binop``
+        is needed.
+
+        >>> d = DynamicBIT(range(5))
+        >>> d.insert(2, 10)
+        >>> d.insert(-100, 20)
+        >>> d.original_layout()
+        [20, 0, 1, 10, 2, 3, 4]
+
+        :complexity: :math:`O(\\log{}n + L)`, splitting a block that
+                     grew to ``2 * load`` values costs :math:`O(n / L)`
+                     and happens at most once every ``load`` inserts.
+        """
+        length, blocks = len(self), self._blocks
+        index = index + length if index < 0 else index
+        index = min(max(index, 0), length)
+        if not blocks:
+            blocks.append([value])
+            self._aggs.append(value)
+            self._len += 1
+            self._reindex()
+            return
+        if index == length:
+            k, offset = len(blocks) - 1, len(blocks[-1])
+        else:
+            k, offset = self._locate(index)
+        block = blocks[k]
+        block.insert(offset, value)
+        self._len += 1
+        if len(block) >= 2 * self._load:
+            half = len(block) // 2
+            blocks[k:k + 1] = [block[:half], block[half:]]
+            self._aggs[k:k + 1] = [reduce(self.binop, blocks[k]),
+                                   reduce(self.binop, blocks[k + 1])]
+            self._reindex()
+            return
+        self._aggs[k] = self.binop(self._aggs[k], value)
+        self._index.update(k, value)
+        self._lengths.update(k, 1)
+
+    def pop(self, index: int = -1) -> _T:
+        """ Remove and return the item at index (default -1), requires
+        ``inverse_binop``.
+
+        >>> d = DynamicBIT(range(5), inverse_binop=int.__sub__)
+        >>> d.pop(), d.pop(0), d.pop(1)
+        (4, 0, 2)
+        >>> d.original_layout()
+        [1, 3]
+
+        :complexity: :math:`O(\\log{}n + L)`, dropping a block that ran
+                     empty, or merging one with a neighbour, costs
+                     :math:`O(n / L)`.
+        :raises IndexError: If empty or index is out of bounds.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        if not self.inverse:
+            msg = "Inverse Binary Operator is required for pop."
+            raise TypeError(msg)
+        k, offset = self._locate(index)
+        blocks = self._blocks
+        block = blocks[k]
+        value = block.pop(offset)
+        self._len -= 1
+        if len(block) < self._load // 2 and len(blocks) > 1:
+            # fold into a neighbour, splitting again if needed.
+            k = k - 1 if k else k
+            merged = blocks[k] + blocks[k + 1]
+            parts = [merged]
+            if len(merged) >= 2 * self._load:
+                half = len(merged) // 2
+                parts = [merged[:half], merged[half:]]
+            blocks[k:k + 2] = parts
+            self._aggs[k:k + 2] = [reduce(self.binop, p) for p in parts]
+            self._reindex()
+        elif not block:
+            del blocks[k], self._aggs[k]
+            self._reindex()
+        else:
+            self._aggs[k] = reduce(self.binop, block)
+            self._index[k] = self._aggs[k]
+            self._lengths.update(k, -1)
+        return value
+
+    def remove(self, value: _T) -> None:
+        """ Remove the first occurence of value.
+
+        >>> d = DynamicBIT(range(5), inverse_binop=int.__sub__)
+        >>> d.remove(3)
+        >>> d.original_layout()
+        [0, 1, 2, 4]
+
+        :complexity: :math:`O(n)`
+        :raises ValueError: If the value is not present.
+        """
+        self.pop(self.index(value))
+
+    def index(self,
+              value: _T,
+              start: int = 0,
+              stop: Optional[int] = None) -> int:
+        """ Return the index of the first occurence of value.
+
+        >>> DynamicBIT(range(5)).index(3)
+        3
+
+        :complexity: :math:`O(n)`
+        :raises ValueError: If value is not present in the collection.
+        """
+        arr = self.original_layout()
+        if stop:
+            return arr.index(value, start, stop)
+        return arr.index(value, start)
+
+    def original_layout(self) -> List[_T]:
+        """ Return the values held, in order.
+
+        >>> DynamicBIT([3, 1, 4], load=2).original_layout()
+        [3, 1, 4]
+
+        :complexity: :math:`O(n)`
+        """
+        return [value for block in self._blocks for value in block]
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """ Normalize index and return its block along with the offset
+        inside that block.
+        """
+        index = BIT._nmlz_index(index, len(self))
+        k = self._lengths.upper_bound(index)
+        if k:
+            index -= self._lengths.prefix_sum(k - 1)
+        return k, index
+
+    def _reindex(self) -> None:
+        """ Rebuild the trees over the blocks after blocks were split,
+        merged or dropped.
+        """
+        self._index = BIT(self._aggs, self.binop, self.inverse)
+        self._lengths = BIT([len(b) for b in self._blocks], add, sub)
+
+
+# Register as virtual subclass.
+MutableSequence.register(DynamicBIT)
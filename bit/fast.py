@@ -0,0 +1,237 @@
+"""Binary Indexed Trees specialized for well-known operators.
+
+A :class:`bit.BIT` walks its nodes with generators, normalizes every
+index with a call and calls ``binop`` once per node. For ``int`` trees
+that machinery costs more than the arithmetic itself. The classes here
+fix ``binop``, and generate ``prefix_sum``, ``__getitem__``, ``update``
+and ``__setitem__`` with the bit loops inlined and the operator written
+out (``+=``, ``^=``, ...), the same way ``collections.namedtuple``
+generates its classes.
+
+Each also has an unchecked tier, ``prefix_sum_unchecked`` and
+``update_unchecked``, which skip index normalization: indices must be in
+``[0, len(B))``, negative ones aren't supported.
+
+Writes to typed trees, and to trees that keep their values, go through
+the generic :class:`bit.BIT` methods, which handle overflow and the kept
+values, ``update_unchecked`` included.
+"""
+from operator import add, and_, or_, sub, xor
+from typing import Any, Callable, ClassVar, Dict, Iterable, Optional
+
+from .bit import BIT
+
+_Op = Callable[[Any, Any], Any]
+
+_NORMALIZE = """
+    if index < 0:
+        index += length
+    if not 0 <= index < length:
+        raise IndexError("Index out of range.")"""
+_PREFIX = """
+    acc = st[index]
+    index &= index + 1
+    while index:
+        node = st[index - 1]
+        {combine}
+        index &= index - 1
+    return acc"""
+_UPDATE = """
+    while index < length:
+        {update}
+        index |= index + 1"""
+_GENERIC = """
+    if type(st) is not list or self._values is not None:
+        return BIT.{0}(self, index, value)"""
+# the bodies below are filled in with the snippets above.
+_TEMPLATE = """
+def prefix_sum(self, index):
+    st = self._st
+    length = len(st)""" + _NORMALIZE + _PREFIX + """
+
+def __getitem__(self, index):
+    if type(index) is not int:
+        return BIT.__getitem__(self, index)
+    st = self._st
+    length = len(st)""" + _NORMALIZE + _PREFIX + """
+
+def prefix_sum_unchecked(self, index):
+    st = self._st""" + _PREFIX + """
+
+def update(self, index, value):
+    st = self._st""" + _GENERIC.format('update') + """
+    length = len(st)""" + _NORMALIZE + _UPDATE + """
+
+def update_unchecked(self, index, value):
+    st = self._st""" + _GENERIC.format('update') + """
+    length = len(st)""" + _UPDATE + """
+"""
+_SETITEM = """
+def __setitem__(self, index, value):
+    st = self._st""" + _GENERIC.format('__setitem__') + """
+    length = len(st)""" + _NORMALIZE + """
+    old = st[index]
+    step = 1
+    while not (index + 1) & step:
+        old {inverse}= st[index - step]
+        step <<= 1
+    value {inverse}= old""" + _UPDATE + """
+"""
+_DOCS = {
+    'prefix_sum': """ Same as ``BIT.prefix_sum``, with the loop inlined.
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If BIT is empty or index is out of bounds.
+        """,
+    '__getitem__': """ Same as ``BIT.__getitem__``, with ``int`` indices
+        handled inline.
+        """,
+    'prefix_sum_unchecked': """ ``prefix_sum`` for an index in
+        ``[0, len(B))``, which isn't checked.
+
+        :complexity: :math:`O(\\log{}n)`
+        """,
+    'update': """ Same as ``BIT.update``, with the loop inlined.
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If BIT is empty or index is out of bounds.
+        """,
+    'update_unchecked': """ ``update`` for an index in ``[0, len(B))``,
+        which isn't checked. Typed trees and trees that keep their values
+        go through ``BIT.update`` instead.
+
+        :complexity: :math:`O(\\log{}n)`
+        """,
+    '__setitem__': """ Same as ``BIT.__setitem__``, with the loops
+        inlined.
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If BIT is empty or index is out of bounds.
+        """,
+}
+
+
+class _SpecializedBIT(BIT[Any]):
+    """ Base of the specialized trees, ``_binop`` and ``_inverse`` are
+    set by each of them.
+    """
+
+    # Callable[..., Any] so that overloaded builtins like max fit.
+    _binop: ClassVar[Callable[..., Any]]
+    _inverse: ClassVar[Optional[_Op]] = None
+
+    def __init__(self,
+                 iterable: Optional[Iterable[Any]] = None,
+                 binop: Optional[_Op] = None,
+                 inverse_binop: Optional[_Op] = None,
+                 keep_values: bool = False,
+                 typecode: Optional[str] = None,
+                 promote: bool = False):
+        """
+        Same as ``BIT.__init__``, ``binop`` and ``inverse_binop`` default
+        to the operators of the class (``binop`` can be the matching
+        :class:`bit.monoid.Monoid`).
+
+        :complexity: :math:`O(n)` where `n` is the number of
+                     items in the iterable.
+        :raises ValueError: If binop isn't the operator of the class.
+        """
+        cls = type(self)
+        super().__init__(iterable, binop or cls._binop,
+                         inverse_binop or cls._inverse, keep_values,
+                         typecode, promote)
+        if self.binop is not cls._binop:
+            msg = "{0} requires binop {1}, got {2!r}."
+            raise ValueError(msg.format(cls.__name__, cls._binop.__name__,
+                                        self.binop))
+
+
+def _specialize(cls: type, combine: str, update: str,
+                inverse: Optional[str] = None) -> type:
+    """ Generate the methods of cls: combine adds ``node`` to ``acc``,
+    update applies ``value`` to ``st[index]``, inverse is the operator
+    removing a value, if there is one.
+    """
+    source = _TEMPLATE
+    if inverse is not None:
+        source += _SETITEM
+    source = source.format(combine=combine, update=update, inverse=inverse)
+    namespace: Dict[str, Any] = {'BIT': BIT}
+    filename = "<{0} generated>".format(cls.__name__)
+    exec(compile(source, filename, 'exec'), namespace)
+    for name, doc in _DOCS.items():
+        if name in namespace:
+            method = namespace[name]
+            method.__doc__ = doc
+            method.__qualname__ = "{0}.{1}".format(cls.__name__, name)
+            method.__module__ = cls.__module__
+            setattr(cls, name, method)
+    return cls
+
+
+class AddBIT(_SpecializedBIT):
+    """ Binary Indexed Tree over ``operator.add``, ``operator.sub`` being
+    its inverse.
+
+    >>> b = AddBIT(range(10))
+    >>> b.update(3, 10); b[0] = 5
+    >>> b[9], b.range_sum(2, 5), b.prefix_sum_unchecked(4)
+    (60, 22, 25)
+    """
+
+    _binop, _inverse = add, sub
+
+
+class XorBIT(_SpecializedBIT):
+    """ Binary Indexed Tree over ``operator.xor``, its own inverse.
+
+    >>> b = XorBIT([1, 2, 4, 8])
+    >>> b[2] = 0
+    >>> b[3], b.range_sum(0, 3)
+    (11, 10)
+    """
+
+    _binop, _inverse = xor, xor
+
+
+class OrBIT(_SpecializedBIT):
+    """ Binary Indexed Tree over ``operator.or_``.
+
+    >>> b = OrBIT([1, 2, 4, 8])
+    >>> b.update_unchecked(0, 16)
+    >>> b[1], b[3]
+    (19, 31)
+    """
+
+    _binop = or_
+
+
+class AndBIT(_SpecializedBIT):
+    """ Binary Indexed Tree over ``operator.and_``.
+
+    >>> b = AndBIT([7, 6, 14, 15])
+    >>> b[3], b.prefix_sum(0)
+    (6, 7)
+    """
+
+    _binop = and_
+
+
+class MaxBIT(_SpecializedBIT):
+    """ Binary Indexed Tree over ``max``.
+
+    >>> b = MaxBIT([3, 1, 4, 1, 5])
+    >>> b.update(1, 9)
+    >>> b[0], b[1], b[-1]
+    (3, 9, 9)
+    """
+
+    _binop = max
+
+
+_specialize(AddBIT, "acc += node", "st[index] += value", '-')
+_specialize(XorBIT, "acc ^= node", "st[index] ^= value", '^')
+_specialize(OrBIT, "acc |= node", "st[index] |= value")
+_specialize(AndBIT, "acc &= node", "st[index] &= value")
+_specialize(MaxBIT, "if node > acc: acc = node",
+            "if value > st[index]: st[index] = value")
@@ -0,0 +1,328 @@
+"""File backed Binary Indexed Tree.
+
+The nodes live in a memory mapped file, in the compact format of
+:mod:`bit.serial`: a small header followed by fixed width nodes. Queries
+and updates only touch the ``O(log n)`` nodes (and pages) they need so
+trees larger than the available memory work, the operating system pages
+nodes in and out as needed. The file has spare capacity at its end and
+grows geometrically as values are appended.
+"""
+import mmap
+import os
+import tempfile
+from array import array
+from itertools import islice
+from operator import add
+from typing import Any, Callable, Iterable, List, Optional
+
+from .bit import BIT
+from . import serial
+
+_Op = Callable[[Any, Any], Any]
+
+
+class MappedBIT(BIT[Any]):
+    """ Binary Indexed Tree stored in a memory mapped file. """
+
+    # number of values read from the iterable at a time when building.
+    _chunk = 1 << 16
+    # smallest capacity, in nodes, of a file.
+    _min_capacity = 64
+
+    def __init__(self,
+                 path: str,
+                 iterable: Optional[Iterable[Any]] = None,
+                 binop: _Op = add,
+                 inverse_binop: Optional[_Op] = None,
+                 typecode: str = 'q'):
+        """
+        Create (or truncate) the file at path and build a new tree in it
+        from an optional iterable.
+
+        >>> import os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), 'counts.bit')
+        >>> b = MappedBIT(path, range(10))
+        >>> b
+        [0, 1, 2, 6, 4, 9, 6, 28, 8, 17]
+        >>> b.close()
+
+        The iterable is consumed in chunks which are laid out one after
+        the other, so it never has to fit in memory. ``binop`` must be one
+        of the operators in ``bit.serial.BINOPS`` so that the file can be
+        reopened with ``MappedBIT.open``.
+
+        :complexity: :math:`O(n)` where `n` is the number of
+                     items in the iterable.
+        :raises ValueError: If binop can't be recorded in the file.
+        """
+        serial.binop_id(binop)
+        self.binop = binop
+        self.inverse = inverse_binop
+        self._path = path
+        self._file = open(path, 'w+b')
+        self._typecode = typecode
+        try:
+            self._map_file(0, self._min_capacity)
+        except Exception:
+            self._file.close()
+            raise
+        try:
+            self.extend(iterable or [])
+        except Exception:
+            self.close()
+            raise
+
+    @classmethod
+    def open(cls,
+             path: str,
+             inverse_binop: Optional[_Op] = None) -> 'MappedBIT':
+        """ Reopen a tree previously stored at path, without rebuilding
+        it. ``binop`` is restored from the file, as is the inverse of
+        operators that have a well-known one (``add`` and ``xor``).
+
+        >>> import os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), 'counts.bit')
+        >>> MappedBIT(path, range(10)).close()
+        >>> b = MappedBIT.open(path)
+        >>> b[9], b.range_sum(3, 6)
+        (45, 15)
+        >>> b.close()
+
+        :complexity: :math:`O(1)`
+        :raises ValueError: If the file doesn't hold a tree, or holds one
+                            written in the other byte order.
+        """
+        self = cls.__new__(cls)
+        self._path = path
+        self._file = open(path, 'r+b')
+        try:
+            header = self._file.read(serial.HEADER.size)
+            typecode, binop, inverse, length = serial.unpack_header(header)
+            serial.check_native(header)
+            self.binop = binop
+            self.inverse = inverse_binop or inverse
+            self._typecode = typecode
+            size = os.path.getsize(path) - serial.HEADER.size
+            self._map_file(length, size // array(typecode).itemsize)
+        except Exception:
+            self._file.close()
+            raise
+        return self
+
+    def __repr__(self) -> str:
+        """ Return a sensible representation of the
+        Binary Index Tree.
+
+        :complexity: :math:`O(n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        """
+        return repr(self._st.tolist())
+
+    def __enter__(self) -> 'MappedBIT':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def typecode(self) -> Optional[str]:
+        """ Typecode of the nodes stored in the file. """
+        return self._typecode
+
+    @property
+    def path(self) -> str:
+        """ Path of the backing file. """
+        return self._path
+
+    def flush(self) -> None:
+        """ Write changes to the nodes back to the file.
+
+        :complexity: :math:`O(d)` for `d` dirty pages.
+        """
+        self._mmap.flush()
+
+    def close(self) -> None:
+        """ Flush and close the backing file, the tree can't be used
+        afterwards. Closing it again does nothing.
+        """
+        if self._file.closed:
+            return
+        self.flush()
+        self._release()
+        self._mmap.close()
+        self._file.close()
+
+    def __reduce__(self) -> Any:
+        """ Pickle the tree by its file, which is flushed first: the
+        unpickled tree maps the same file, reopened with
+        ``MappedBIT.open``.
+        """
+        self.flush()
+        return type(self).open, (os.path.abspath(self._path), self.inverse)
+
+    def append(self, value: Any) -> None:
+        """ Append a new value to the BIT, growing the file geometrically
+        when it runs out of capacity.
+
+        :complexity: amortized :math:`O(\\log{}n)` where `n` is the number
+                     of items in the Binary Indexed Tree.
+        :raises OverflowError: If the new node doesn't fit the typecode.
+        """
+        storage, length = self._st, len(self)
+        for step in self._c_zero_lsb(length + 1):
+            value = self.binop(value, storage[length - step])
+        self._check([value])
+        self._resize(length + 1)
+        self._st[length] = value
+
+    def extend(self, iterable: Iterable[Any]) -> None:
+        """ Extend the tree by the values of iterable, consumed in chunks
+        which are laid out in place in the file one after the other. The
+        ``inverse_binop`` is only required when the iterable is an
+        instance of BIT.
+
+        :complexity: :math:`O(k + \\log{}n)` for `k` new elements.
+        :raises TypeError: If iterable is an instance of BIT and
+                           ``inverse_binop`` hasn't been specified.
+        :raises OverflowError: If a node doesn't fit the typecode, the
+                               chunks laid out before it are kept.
+        """
+        if isinstance(iterable, BIT):
+            iterable = iterable.original_layout()
+        values = iter(iterable)
+        chunk = list(islice(values, self._chunk))
+        while chunk:
+            length = len(self)
+            nodes = memoryview(self._check(chunk))
+
+            def edit() -> None:
+                self._resize(length + len(chunk))
+                self._st[length:] = nodes
+                self._layout_from(self._st, length, self.binop)
+            self._guarded(length, edit)
+            chunk = list(islice(values, self._chunk))
+
+    def insert(self, index: int, value: Any) -> None:
+        """ Insert value before index, requires ``inverse_binop``. Like
+        ``BIT.insert`` only the nodes from index onwards are rebuilt, in
+        place in the file.
+
+        :complexity: :math:`O(n - i + \\log{}n)` for index `i` where `n`
+                     is the number of items in the Binary Indexed Tree.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        :raises OverflowError: If a node doesn't fit the typecode, the
+                               tree is left unchanged.
+        """
+        length = len(self)
+        index = index + length if index < 0 else index
+        index = min(max(index, 0), length)
+        if index == length:
+            self.append(value)
+            return
+        if not self.inverse:
+            msg = "Inverse Binary Operator is required for insert."
+            raise TypeError(msg)
+        self._check([value])
+
+        def edit() -> None:
+            self._original_from(self._st, index,
+                                self.inverse)  # type: ignore
+            self._resize(length + 1)
+            storage = self._st
+            storage[index + 1:] = storage[index:length]
+            storage[index] = value
+            self._layout_from(storage, index, self.binop)
+        self._guarded(index, edit)
+
+    def pop(self, index: int = -1) -> Any:
+        """ Remove and return item at given index (default -1), requires
+        ``inverse_binop``.
+
+        :complexity: :math:`O(n - i + \\log{}n)` for index `i` where `n`
+                     is the number of items in the Binary Indexed Tree.
+        :raises IndexError: If BIT is empty or index is out of range.
+        :raises TypeError: If the `inverse_binop` hasn't been defined.
+        :raises OverflowError: If a node doesn't fit the typecode, the
+                               tree is left unchanged.
+        """
+        length = len(self)
+        index = self._nmlz_index(index, length)
+        if not self.inverse:
+            msg = "Inverse Binary Operator is required for pop."
+            raise TypeError(msg)
+
+        def edit() -> Any:
+            storage = self._st
+            self._original_from(storage, index,
+                                self.inverse)  # type: ignore
+            value = storage[index]
+            storage[index:length - 1] = storage[index + 1:]
+            self._resize(length - 1)
+            self._layout_from(self._st, index, self.binop)
+            return value
+        return self._guarded(index, edit)
+
+    def _check(self, values: List[Any]) -> 'array[Any]':
+        """ Values packed in an array of the typecode of the file.
+
+        :raises OverflowError: If a value doesn't fit the typecode.
+        """
+        return array(self._typecode, values)
+
+    def _guarded(self, start: int, edit: Callable[[], Any]) -> Any:
+        """ Run edit, which rewrites the nodes from start onwards in place
+        and may resize the tree. Writes are checked a level at a time, if
+        one overflows the nodes and length are restored before the
+        OverflowError propagates, so the file isn't left half rewritten.
+        The nodes are saved to a temporary file, a chunk at a time, so an
+        edit near the front doesn't copy the tree into memory.
+        """
+        length = len(self)
+        with tempfile.TemporaryFile() as undo:
+            for i in range(start, length, self._chunk):
+                with self._st[i:i + self._chunk] as nodes:
+                    undo.write(nodes)
+            try:
+                return edit()
+            except OverflowError:
+                self._resize(length)
+                undo.seek(0)
+                for i in range(start, length, self._chunk):
+                    with self._st[i:i + self._chunk] as nodes:
+                        undo.readinto(nodes)
+                raise
+
+    def _map_file(self, length: int, capacity: int) -> None:
+        """ Size the file for capacity nodes and map it, the tree holds
+        the first length of them.
+        """
+        itemsize = array(self._typecode).itemsize
+        self._file.truncate(serial.HEADER.size + capacity * itemsize)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        view = memoryview(self._mmap)[serial.HEADER.size:]
+        self._buf = view.cast(self._typecode)  # type: ignore
+        self._set_length(length)
+
+    def _resize(self, length: int) -> None:
+        """ Set the number of nodes, growing the file if needed. """
+        capacity = len(self._buf)
+        if length > capacity:
+            self._release()
+            self._mmap.close()
+            capacity = max(2 * capacity, length)
+            self._map_file(length, capacity)
+        else:
+            self._set_length(length)
+
+    def _set_length(self, length: int) -> None:
+        """ Point the nodes at the first length slots and record length
+        in the header.
+        """
+        self._st = self._buf[:length]
+        header = serial.pack_header(self._typecode, self.binop, length)
+        self._mmap[:serial.HEADER.size] = header
+
+    def _release(self) -> None:
+        """ Release the views into the mapping so it can be closed. """
+        self._st.release()
+        self._buf.release()
@@ -0,0 +1,98 @@
+"""Binary operators along with what is known about them.
+
+A bare ``binop`` callable doesn't tell :class:`bit.BIT` much. A
+:class:`Monoid` also carries the identity of the operator and whether it
+is commutative or idempotent, a :class:`Group` its inverse too. Trees
+built with one use them to:
+
+* default ``inverse_binop`` to the inverse of a group,
+* build trees of identities without combining anything
+  (``BIT.identity``),
+* answer range queries over idempotent operators in :math:`O(1)` from a
+  frozen copy of the values (``BIT.freeze``),
+* use the NumPy ufunc computing the operator elementwise
+  (:class:`bit.NumpyBIT`).
+
+Monoids are callable, so they can be passed anywhere a ``binop`` is.
+"""
+from collections import Counter
+from operator import add, and_, mul, or_, sub, xor
+from typing import Any, Callable, Optional
+
+_Op = Callable[[Any, Any], Any]
+
+
+class Monoid:
+    """ An associative binary operator with an identity. """
+
+    # None for monoids, see Group.
+    inverse: Optional[_Op] = None
+
+    def __init__(self,
+                 binop: _Op,
+                 identity: Any,
+                 name: str,
+                 commutative: bool = True,
+                 idempotent: bool = False,
+                 ufunc: Optional[str] = None):
+        """
+        Describe binop, whose identity is identity.
+
+        >>> MAX(3, 5), MAX.identity, MAX.idempotent
+        (5, -inf, True)
+
+        ``commutative`` and ``idempotent`` (``x`` combined with itself is
+        ``x``) state the properties of binop, ``ufunc`` names the NumPy
+        ufunc computing it elementwise, if any.
+        """
+        self.binop = binop
+        self.identity = identity
+        self.name = name
+        self.commutative = commutative
+        self.idempotent = idempotent
+        self.ufunc = ufunc
+
+    def __call__(self, x: Any, y: Any) -> Any:
+        return self.binop(x, y)
+
+    def __repr__(self) -> str:
+        return "{0}({1!r})".format(type(self).__name__, self.name)
+
+
+class Group(Monoid):
+    """ A monoid whose values all have an inverse. """
+
+    def __init__(self,
+                 binop: _Op,
+                 identity: Any,
+                 inverse: _Op,
+                 name: str,
+                 commutative: bool = True,
+                 ufunc: Optional[str] = None,
+                 inverse_ufunc: Optional[str] = None):
+        """
+        Describe binop, whose identity is identity, and its inverse:
+        ``inverse(binop(x, y), y) == x``.
+
+        >>> ADD.inverse(ADD(3, 5), 5)
+        3
+
+        A group can't be idempotent, unless it only has one value.
+        """
+        super().__init__(binop, identity, name, commutative, False, ufunc)
+        self.inverse = inverse
+        self.inverse_ufunc = inverse_ufunc
+
+
+ADD = Group(add, 0, sub, 'add', ufunc='add', inverse_ufunc='subtract')
+XOR = Group(xor, 0, xor, 'xor', ufunc='bitwise_xor',
+            inverse_ufunc='bitwise_xor')
+# Counter.__sub__ drops counts that aren't positive, it is only an inverse
+# when removing counts that were added before, as BIT does.
+COUNTER = Group(Counter.__add__, Counter(), Counter.__sub__, 'counter')
+OR = Monoid(or_, 0, 'or', idempotent=True, ufunc='bitwise_or')
+AND = Monoid(and_, -1, 'and', idempotent=True, ufunc='bitwise_and')
+MIN = Monoid(min, float('inf'), 'min', idempotent=True, ufunc='minimum')
+MAX = Monoid(max, float('-inf'), 'max', idempotent=True, ufunc='maximum')
+MUL = Monoid(mul, 1, 'mul', ufunc='multiply')
+UNION = Monoid(set.union, set(), 'union', idempotent=True)
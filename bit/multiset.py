@@ -0,0 +1,204 @@
+"""Ordered multiset over a bounded universe of integers.
+
+Keeps a count per value in ``range(universe)`` and a Binary Indexed Tree
+over those counts. Prefix sums of the counts are ranks, so ``rank`` is a
+prefix query and ``select`` a single ``BIT.upper_bound`` descent.
+"""
+from operator import add, sub
+from typing import Iterable, Iterator, Optional
+
+from .bit import BIT
+
+
+class FenwickMultiset:
+    """ Multiset of integers in ``range(universe)`` supporting rank and
+    order statistic queries.
+    """
+
+    def __init__(self,
+                 universe: int,
+                 iterable: Optional[Iterable[int]] = None):
+        """
+        Initialize a new multiset able to hold the values in
+        ``range(universe)``, optionally filled from an iterable.
+
+        >>> FenwickMultiset(10, [3, 1, 3, 7])
+        FenwickMultiset(10, [1, 3, 3, 7])
+
+        :complexity: :math:`O(n + U)` where `n` is the number of items in
+                     the iterable and `U` is the size of the universe.
+        :raises ValueError: If a value is outside ``range(universe)``.
+        """
+        counts = [0] * universe
+        for value in iterable or []:
+            counts[self._check(value, universe)] += 1
+        self._counts = counts
+        self._tree = BIT(counts, add, sub)
+        self._len = sum(counts)
+
+    def __repr__(self) -> str:
+        """ Return a sensible representation of the multiset.
+
+        >>> FenwickMultiset(4)
+        FenwickMultiset(4, [])
+
+        :complexity: :math:`O(n + U)`
+        """
+        return "{0}({1}, {2})".format(
+            type(self).__name__, self.universe, list(self)
+        )
+
+    def __len__(self) -> int:
+        """ Return the number of values held, counting duplicates.
+
+        >>> len(FenwickMultiset(10, [3, 1, 3, 7]))
+        4
+
+        :complexity: :math:`O(1)`
+        """
+        return self._len
+
+    def __contains__(self, value: object) -> bool:
+        """ Return whether value is held at least once.
+
+        >>> 3 in FenwickMultiset(10, [3, 1, 3, 7])
+        True
+
+        :complexity: :math:`O(1)`
+        """
+        counts = self._counts
+        return (isinstance(value, int) and 0 <= value < len(counts) and
+                counts[value] > 0)
+
+    def __iter__(self) -> Iterator[int]:
+        """ Yield the values held in sorted order, duplicates included.
+
+        >>> list(FenwickMultiset(10, [3, 1, 3, 7]))
+        [1, 3, 3, 7]
+
+        :complexity: :math:`O(n + U)`
+        """
+        for value, count in enumerate(self._counts):
+            for _ in range(count):
+                yield value
+
+    @property
+    def universe(self) -> int:
+        """ Size of the universe, values live in ``range(universe)``. """
+        return len(self._counts)
+
+    def count(self, value: int) -> int:
+        """ Return how many times value is held.
+
+        >>> FenwickMultiset(10, [3, 1, 3, 7]).count(3)
+        2
+
+        :complexity: :math:`O(1)`
+        """
+        return self._counts[value] if value in self else 0
+
+    def add(self, value: int, count: int = 1) -> None:
+        """ Add ``count`` copies of value.
+
+        >>> m = FenwickMultiset(10, [3, 1])
+        >>> m.add(5, 2)
+        >>> m
+        FenwickMultiset(10, [1, 3, 5, 5])
+
+        :complexity: :math:`O(\\log{}U)`
+        :raises ValueError: If value is outside ``range(universe)`` or
+                            count is negative.
+        """
+        value = self._check(value, self.universe)
+        if count < 0:
+            raise ValueError("count must be non-negative.")
+        self._counts[value] += count
+        self._tree.update(value, count)
+        self._len += count
+
+    def discard(self, value: int, count: int = 1) -> None:
+        """ Remove up to ``count`` copies of value, if present.
+
+        >>> m = FenwickMultiset(10, [3, 1, 3])
+        >>> m.discard(3)
+        >>> m.discard(9)
+        >>> m
+        FenwickMultiset(10, [1, 3])
+
+        :complexity: :math:`O(\\log{}U)`
+        :raises ValueError: If count is negative.
+        """
+        if count < 0:
+            raise ValueError("count must be non-negative.")
+        if value not in self:
+            return
+        count = min(count, self._counts[value])
+        self._counts[value] -= count
+        self._tree.update(value, -count)
+        self._len -= count
+
+    def remove(self, value: int) -> None:
+        """ Remove one copy of value.
+
+        >>> m = FenwickMultiset(10, [3])
+        >>> m.remove(3)
+        >>> m.remove(3)
+        Traceback (most recent call last):
+        ...
+        KeyError: 3
+
+        :complexity: :math:`O(\\log{}U)`
+        :raises KeyError: If value is not present.
+        """
+        if value not in self:
+            raise KeyError(value)
+        self.discard(value)
+
+    def rank(self, value: int) -> int:
+        """ Return the number of values strictly smaller than value.
+
+        >>> m = FenwickMultiset(10, [3, 1, 3, 7])
+        >>> m.rank(3), m.rank(4), m.rank(0), m.rank(100)
+        (1, 3, 0, 4)
+
+        :complexity: :math:`O(\\log{}U)`
+        """
+        if value <= 0:
+            return 0
+        if value >= self.universe:
+            return self._len
+        return self._tree.prefix_sum(value - 1)
+
+    def select(self, k: int) -> int:
+        """ Return the k-th smallest value (zero based, duplicates
+        included). Negative k counts from the largest value.
+
+        >>> m = FenwickMultiset(10, [3, 1, 3, 7])
+        >>> m.select(0), m.select(2), m.select(-1)
+        (1, 3, 7)
+
+        :complexity: :math:`O(\\log{}U)`, a single tree descent.
+        :raises IndexError: If k is out of range.
+        """
+        k = self._tree._nmlz_index(k, self._len)
+        return self._tree.upper_bound(k)
+
+    def count_range(self, lo: int, hi: int) -> int:
+        """ Return the number of values ``v`` with ``lo <= v < hi``.
+
+        >>> FenwickMultiset(10, [3, 1, 3, 7]).count_range(2, 8)
+        3
+
+        :complexity: :math:`O(\\log{}U)`
+        """
+        if hi <= lo:
+            return 0
+        return self.rank(hi) - self.rank(lo)
+
+    @staticmethod
+    def _check(value: int, universe: int) -> int:
+        """ Validate that value lies in ``range(universe)``. """
+        if not 0 <= value < universe:
+            msg = "{0} is outside of range({1})."
+            raise ValueError(msg.format(value, universe))
+        return value
@@ -0,0 +1,533 @@
+"""NumPy backed Binary Indexed Tree.
+
+The layout is exactly the one used by :class:`bit.BIT`, only the storage
+is a one dimensional ``numpy.ndarray``. Building the tree and recovering
+the original layout are done a whole level at a time (one strided slice
+per power of two) instead of one ``binop`` call per node. Queries and
+updates gather the ``O(log n)`` nodes they touch with fancy indexing and
+apply ``binop`` on them in a single call.
+
+``binop`` and ``inverse_binop`` must therefore operate elementwise on
+arrays. Ufuncs such as ``np.add``, ``np.bitwise_xor`` or ``np.maximum``
+are the intended operators, ``operator.add`` and friends work too.
+"""
+from functools import reduce
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+from .bit import BIT
+from .monoid import Monoid
+
+_Array = np.ndarray
+_Op = Callable[[Any, Any], Any]
+# shifts used to enumerate the bits of an index.
+_SHIFTS = np.arange(64, dtype=np.int64)
+
+
+class NumpyBIT(BIT[Any]):
+    """ Binary Indexed Tree stored in a ``numpy.ndarray``. """
+
+    # a vectorized pass over n nodes costs about as much as walking a
+    # few dozen nodes from Python.
+    _dense_ratio = 64
+    # typecode the tree was built with, if any.
+    _typecode: Optional[str] = None
+
+    def __init__(self,
+                 iterable: Optional[Iterable[Any]] = None,
+                 binop: _Op = np.add,
+                 inverse_binop: Optional[_Op] = None,
+                 keep_values: bool = False,
+                 typecode: Optional[str] = None,
+                 promote: bool = False,
+                 dtype: Any = None):
+        """
+        Initialize a new NumPy backed Binary Indexed Tree with an optional
+        iterable.
+
+        >>> NumpyBIT(range(10))
+        [0, 1, 2, 6, 4, 9, 6, 28, 8, 17]
+
+        ``dtype`` is forwarded to ``numpy.array`` when converting the
+        iterable, by default NumPy infers it. The arguments of
+        ``BIT.__init__`` are accepted so that the two classes can be
+        swapped, an ``array`` ``typecode`` picks the matching dtype:
+
+        >>> NumpyBIT(range(10), typecode='b').dtype
+        dtype('int8')
+
+        Unlike ``BIT`` the nodes aren't checked for overflow, integer
+        dtypes wrap around as NumPy arithmetic does. ``keep_values`` and
+        ``promote`` aren't supported and raise ``ValueError`` when set.
+
+        A :class:`bit.monoid.Monoid` is replaced by the ufunc it names
+        (and, for a group, the ufunc of its inverse):
+
+        >>> from bit.monoid import XOR
+        >>> NumpyBIT(range(10), XOR).inverse is np.bitwise_xor
+        True
+
+        :complexity: :math:`O(n)` where `n` is the number of
+                     items in the iterable, in :math:`O(\\log{}n)`
+                     vectorized passes.
+        :raises ValueError: If ``keep_values`` or ``promote`` is set, or
+                            ``typecode`` and ``dtype`` don't agree.
+        """
+        if keep_values or promote:
+            msg = "NumpyBIT doesn't support keep_values or promote."
+            raise ValueError(msg)
+        if typecode is not None:
+            if dtype is not None and np.dtype(dtype) != np.dtype(typecode):
+                msg = "typecode {0!r} doesn't match dtype {1!r}."
+                raise ValueError(msg.format(typecode, dtype))
+            self._typecode, dtype = typecode, np.dtype(typecode)
+        if isinstance(binop, Monoid) and binop.ufunc:
+            self.monoid = binop
+            binop = getattr(np, binop.ufunc)
+            inverse_ufunc = getattr(self.monoid, 'inverse_ufunc', None)
+            if inverse_binop is None and inverse_ufunc:
+                inverse_binop = getattr(np, inverse_ufunc)
+        arr = self._as_array(iterable, dtype)
+        self._layout(arr, binop)
+        # _buf holds spare capacity for appends, _st is a view
+        # of its first len(self) items.
+        self._buf = arr
+        self._st = arr
+        # an empty array defaults to float64, let the first append decide.
+        self._infer = dtype is None and not len(arr)
+        self.binop = binop
+        self.inverse = inverse_binop
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """ Attributes to pickle. ``_st`` is a view of ``_buf`` which
+        pickle would copy apart from it, only the nodes are kept.
+        """
+        state = dict(self.__dict__)
+        state['_buf'] = state['_st'] = self._st.copy()
+        return state
+
+    @property
+    def dtype(self) -> Any:
+        """ The dtype of the underlying array. """
+        return self._st.dtype
+
+    @property
+    def typecode(self) -> Optional[str]:
+        """ Typecode the tree was built with, ``None`` if it wasn't given
+        one.
+        """
+        return self._typecode
+
+    def __repr__(self) -> str:
+        """ Return a sensible representation of the
+        Binary Index Tree.
+
+        >>> print(NumpyBIT(range(10)))
+        [0, 1, 2, 6, 4, 9, 6, 28, 8, 17]
+
+        :complexity: :math:`O(n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        """
+        return repr(self._st.tolist())
+
+    def __setitem__(self, index: int, value: Any) -> None:
+        """ Replaces the value originally located at index ``index`` with a new
+        value. In order to do this, a sensible ``inverse_binop`` is required.
+
+        >>> b = NumpyBIT(range(10), inverse_binop=np.subtract)
+        >>> b[0] = 10
+        >>> b.original_layout().tolist()
+        [10, 1, 2, 3, 4, 5, 6, 7, 8, 9]
+
+        :complexity: :math:`O(\\log{}n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        :raises IndexError: If BIT is empty or index is out of bounds.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        length, storage = len(self), self._st
+        index = self._nmlz_index(index, length)
+        binop, inverse = self.binop, self.inverse
+        if not inverse:
+            msg = "Inverse Operator is required to set an item. "
+            raise TypeError(msg)
+        old = storage[index]
+        children = self._children(index)
+        if len(children):
+            old = inverse(old, self._fold(storage[children]))
+        path = self._f_zero_path(index, length)
+        storage[path] = binop(inverse(storage[path], old), value)
+
+    def update(self, index: int, value: Any) -> None:
+        """ Updates the value at given index. This does not replace the
+        original value that was placed there; the `value` supplied is applied
+        to what was originally there by using `binop`.
+
+        >>> b = NumpyBIT(range(10), inverse_binop=np.subtract)
+        >>> b.update(5, 10)
+        >>> b.original_layout().tolist()
+        [0, 1, 2, 3, 4, 15, 6, 7, 8, 9]
+
+        :complexity: :math:`O(\\log{}n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        :raises IndexError: If BIT is empty or index is out of bounds.
+        """
+        storage, length = self._st, len(self)
+        index = self._nmlz_index(index, length)
+        path = self._f_zero_path(index, length)
+        storage[path] = self.binop(storage[path], value)
+
+    def update_many(self,
+                    indices: Iterable[int],
+                    values: Iterable[Any]) -> None:
+        """ Batched ``update``. Large batches with a ufunc ``binop`` that
+        has an identity (``np.add``, ``np.bitwise_xor``, ...) scatter the
+        values into an identity filled array with ``ufunc.at``, lay it out
+        level by level and merge it in one vectorized call. Other batches
+        take the path of ``BIT.update_many``. Values of a kind the nodes
+        can't hold (floats for an integer tree) are applied one by one, as
+        ``update`` would, since merging them would round once instead.
+
+        >>> b = NumpyBIT(range(10), inverse_binop=np.subtract)
+        >>> b.update_many([5, 0, 5], [10, 1, 2])
+        >>> b.original_layout().tolist()
+        [1, 1, 2, 3, 4, 17, 6, 7, 8, 9]
+
+        :complexity: :math:`O(\\min(k\\log{}n, n + k))` where `k` is the
+                     number of updates and `n` is the number of items in
+                     the Binary Indexed Tree.
+        :raises IndexError: If any index is out of bounds.
+        :raises ValueError: If indices and values differ in length.
+        """
+        storage, length, binop = self._st, len(self), self.binop
+        identity = getattr(binop, 'identity', None)
+        idx = self._as_array(indices, np.int64).ravel()
+        values = self._as_array(values).ravel()
+        if len(idx) != len(values):
+            raise ValueError("indices and values must be of equal length.")
+        idx[idx < 0] += length
+        if len(idx) and (idx.min() < 0 or idx.max() >= length):
+            raise IndexError("Index out of range.")
+        if not np.can_cast(values.dtype, storage.dtype, 'same_kind'):
+            # merged deltas would be cast once, update casts every one.
+            for index, value in zip(idx.tolist(), values):
+                self.update(index, value)
+            return
+        if (identity is None or
+                len(idx) * length.bit_length() < self._dense_ratio * length):
+            super().update_many(idx.tolist(), values)
+            return
+        deltas = np.full(length, identity, dtype=storage.dtype)
+        binop.at(deltas, idx, values)  # type: ignore
+        storage[:] = binop(storage, self._layout(deltas, binop))
+
+    def append(self, value: Any) -> None:
+        """ Append a new value to the BIT. Storage grows geometrically so
+        appends are amortized.
+
+        >>> b = NumpyBIT(range(10), inverse_binop=np.subtract)
+        >>> b.append(10)
+        >>> print(b[10])
+        55
+
+        :complexity: amortized :math:`O(\\log{}n)` where `n` is the number
+                     of items in the Binary Indexed Tree.
+        """
+        length = len(self)
+        children = self._children(length)
+        if len(children):
+            value = self.binop(value, self._fold(self._st[children]))
+        buf = self._buf
+        if self._infer:
+            buf = np.empty(max(2 * length, 8), np.asarray(value).dtype)
+            buf[:length] = self._st
+            self._buf = buf
+            self._infer = False
+        elif length == len(buf):
+            buf = self._buf = np.resize(buf, max(2 * length, 8))
+        buf[length] = value
+        self._st = buf[:length + 1]
+
+    def extend(self, iterable: Iterable[Any]) -> None:
+        """ ``NumpyBIT.append`` every value of iterable, the values of a
+        BIT when iterable is one.
+
+        :complexity: amortized :math:`O(k\\log{}n)` for `k` new elements.
+        :raises TypeError: If iterable is an instance of BIT and its
+                           values can't be recovered.
+        """
+        if isinstance(iterable, BIT):
+            iterable = iterable.original_layout()
+        for value in list(iterable):
+            self.append(value)
+
+    def insert(self, index: int, value: Any) -> None:
+        """ Insert value before index, requires ``inverse_binop`` be defined
+        unless value is appended.
+
+        >>> b = NumpyBIT(range(5), inverse_binop=np.subtract)
+        >>> b.insert(0, 50)
+        >>> b.original_layout().tolist()
+        [50, 0, 1, 2, 3, 4]
+
+        :complexity: :math:`O(n)` where `n` is the number of items in the
+                     Binary Indexed Tree, :math:`O(\\log{}n)` when
+                     inserting at the end.
+        :raises TypeError: If ``inverse_binop`` is required but hasn't
+                           been supplied.
+        """
+        length = len(self)
+        # np.insert doesn't clamp like list.insert does.
+        index = min(max(index + length if index < 0 else index, 0), length)
+        if index == length:
+            self.append(value)
+            return
+        arr = self.original_layout()
+        if self._infer:
+            # same as append, the first value decides the dtype.
+            arr = arr.astype(np.asarray(value).dtype)
+        self._set_storage(self._layout(np.insert(arr, index, value),
+                                       self.binop))
+
+    def pop(self, index: int = -1) -> Any:
+        """ Remove and return item at given index (default -1).
+        Requires `inverse_binop` be specified.
+
+        >>> b = NumpyBIT(range(5), inverse_binop=np.subtract)
+        >>> int(b.pop())
+        4
+        >>> int(b.pop(0))
+        0
+        >>> b.original_layout().tolist()
+        [1, 2, 3]
+
+        :complexity: :math:`O(n)` where `n` is the number of items in
+                     the Binary Indexed Tree, :math:`O(\\log{}n)` when
+                     popping from the end.
+        :raises IndexError: If BIT is empty or index is out of range.
+        :raises TypeError: If the `inverse_binop` hasn't been defined.
+        """
+        length = len(self)
+        index = self._nmlz_index(index, length)
+        if not self.inverse:
+            msg = "Inverse Binary Operator is required for pop."
+            raise TypeError(msg)
+        if index == length - 1:
+            storage = self._st
+            value = storage[index]
+            children = self._children(index)
+            if len(children):
+                value = self.inverse(value, self._fold(storage[children]))
+            self._st = self._buf[:index]
+            return value
+
+        arr = self.original_layout()
+        value = arr[index]
+        self._set_storage(self._layout(np.delete(arr, index), self.binop))
+        return value
+
+    def index(self,
+              value: Any,
+              start: int = 0,
+              stop: Optional[int] = None) -> int:
+        """ Return the index of the first occurence of value.
+        `inverse_binop` is required in order to run `index`.
+
+        >>> b = NumpyBIT(range(5), inverse_binop=np.subtract)
+        >>> b.index(4)
+        4
+
+        :complexity: :math:`O(n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        :raises ValueError: If value is not present in the collection.
+        """
+        arr = self.original_layout()
+        start, stop, _ = slice(start, stop).indices(len(arr))
+        hits = np.flatnonzero(arr[start:stop] == value)
+        if not len(hits):
+            raise ValueError("{0!r} is not in BIT".format(value))
+        return start + int(hits[0])
+
+    def prefix_sum(self, index: int) -> Any:
+        """ Return the prefix sum (or prefix ``<binop>``) until (including!)
+        the given index.
+
+        >>> b = NumpyBIT(range(10))
+        >>> print(b.prefix_sum(9))
+        45
+        >>> print(b.prefix_sum(9) == b[9])
+        True
+
+        :complexity: :math:`O(\\log{}n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        :raises IndexError: If BIT is empty or index is out of bounds.
+                            Valid bounds for index are in range ``[0, len(B))``
+        """
+        index = self._nmlz_index(index, len(self)) + 1
+        return self._fold(self._st[self._c_one_path(index)])
+
+    def prefix_sums(self,  # type: ignore
+                    indices: Iterable[int]) -> _Array:
+        """ Return the prefix sums until (including!) each of the given
+        indices as an array aligned with ``indices``. All queries walk the
+        tree together, one vectorized step per level.
+
+        >>> b = NumpyBIT(range(10))
+        >>> b.prefix_sums([9, 3, -1, 4])
+        array([45,  6, 45, 10])
+
+        :complexity: :math:`O(k\\log{}n)` where `k` is the number of
+                     indices and `n` is the number of items in the Binary
+                     Indexed Tree, in :math:`O(\\log{}n)` vectorized steps.
+        :raises IndexError: If BIT is empty or any index is out of bounds.
+        """
+        length, storage, binop = len(self), self._st, self.binop
+        queries = np.array(indices, dtype=np.int64)
+        shape, queries = queries.shape, queries.ravel()
+        queries[queries < 0] += length
+        if len(queries) and (queries.min() < 0 or queries.max() >= length):
+            raise IndexError("Index out of range.")
+        queries += 1
+        acc: _Array = storage[queries - 1]
+        queries &= queries - 1
+        live = np.flatnonzero(queries)
+        while len(live):
+            nodes = queries[live]
+            acc[live] = binop(acc[live], storage[nodes - 1])
+            queries[live] = nodes & (nodes - 1)
+            live = live[queries[live] > 0]
+        return acc.reshape(shape)
+
+    def range_sums(self,  # type: ignore
+                   starts: Iterable[int],
+                   stops: Iterable[int]) -> _Array:
+        """ Batched ``BIT.range_sum``, returns an array aligned with
+        ``starts`` and ``stops``.
+
+        >>> b = NumpyBIT(range(10), inverse_binop=np.subtract)
+        >>> b.range_sums([3, 0], [6, 9])
+        array([15, 45])
+
+        :complexity: :math:`O(k\\log{}n)` where `k` is the number of
+                     pairs and `n` is the number of items in the Binary
+                     Indexed Tree.
+        :raises IndexError: If BIT is empty, any `i > j`, or any index is
+                            out of bounds.
+        :raises TypeError: If `inverse_binop` hasn't been provided.
+        :raises ValueError: If starts and stops differ in length.
+        """
+        starts, stops = np.asarray(starts), np.asarray(stops)
+        if starts.shape != stops.shape:
+            raise ValueError("starts and stops must be of equal length.")
+        if np.any(stops < starts):
+            raise IndexError("j must be > than i.")
+        if not self.inverse:
+            msg = "Inverse operator required for range_sums. "
+            raise TypeError(msg)
+        sums: _Array = self.inverse(self.prefix_sums(stops),
+                                    self.prefix_sums(starts))
+        return sums
+
+    def original_layout(self) -> _Array:  # type: ignore
+        """ Returns an array whose values, when transformed to a fenwick
+        tree would equal self.
+
+        >>> b = NumpyBIT(range(10), inverse_binop=np.subtract)
+        >>> b.original_layout()
+        array([0, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+
+        :complexity: :math:`O(n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        :raises TypeError: If `inverse_binop` isn't provided.
+        """
+        if not self.inverse:
+            msg = "Inverse Binary Operator is required for original_layout"
+            raise TypeError(msg)
+        arr: _Array = self._st.copy()
+        inverse, length = self.inverse, len(arr)
+        # undo levels in the reverse order bit_layout applied them.
+        i = 1 << max(length - 1, 0).bit_length() >> 1
+        while i:
+            dst = arr[2 * i - 1::2 * i]
+            arr[2 * i - 1::2 * i] = inverse(dst, arr[i - 1::2 * i][:len(dst)])
+            i //= 2
+        return arr
+
+    @staticmethod
+    def bit_layout(iterable: Iterable[Any],  # type: ignore
+                   binary_op: _Op = np.add) -> _Array:
+        """ Transform iterable to fenwick (BIT) representation.
+
+        >>> NumpyBIT.bit_layout([1, 20, 4, 32])
+        array([ 1, 21,  4, 57])
+
+        :complexity: :math:`O(n)` where `n` is the number of items
+                     in the iterable.
+        """
+        return NumpyBIT._layout(NumpyBIT._as_array(iterable), binary_op)
+
+    # Helpers.
+    def _set_storage(self, arr: _Array) -> None:
+        """ Replace storage (and spare capacity) with arr, whose dtype is
+        the one of the tree from now on.
+        """
+        self._buf = self._st = arr
+        self._infer = False
+
+    def _fold(self, values: _Array) -> Any:
+        """ Reduce values with binop, from left to right. """
+        binop = self.binop
+        if isinstance(binop, np.ufunc):
+            return binop.reduce(values)
+        return reduce(binop, values)
+
+    @staticmethod
+    def _layout(arr: _Array, binary_op: _Op) -> _Array:
+        """ In-place, level by level, version of ``BIT.bit_layout``. """
+        i, length = 1, len(arr)
+        while i < length:
+            dst = arr[2 * i - 1::2 * i]
+            arr[2 * i - 1::2 * i] = binary_op(dst,
+                                              arr[i - 1::2 * i][:len(dst)])
+            i *= 2
+        return arr
+
+    @staticmethod
+    def _as_array(iterable: Optional[Iterable[Any]],
+                  dtype: Any = None) -> _Array:
+        """ Copy iterable into a new one dimensional array. """
+        if iterable is None:
+            iterable = []
+        elif not hasattr(iterable, '__len__'):
+            # generators and friends.
+            iterable = list(iterable)
+        return np.array(iterable, dtype=dtype)
+
+    @staticmethod
+    def _c_one_path(index: int) -> _Array:
+        """ Vectorized ``BIT._c_one_lsb``, returns the (zero based)
+        indices of the nodes summed for a prefix of length index.
+        """
+        shifts = _SHIFTS[:index.bit_length()]
+        set_bits = (index >> shifts) & 1 == 1
+        path: _Array = ((index >> shifts[set_bits]) << shifts[set_bits]) - 1
+        return path
+
+    @staticmethod
+    def _f_zero_path(index: int, stop: int) -> _Array:
+        """ Vectorized ``BIT._f_zero_lsb``, ``index | (2**k - 1)`` for
+        every k where the bit ``k - 1`` of index is unset.
+        """
+        shifts = _SHIFTS[:stop.bit_length() + 1]
+        unset = (index >> np.maximum(shifts - 1, 0)) & 1 == 0
+        unset[0] = True
+        path: _Array = index | ((1 << shifts[unset]) - 1)
+        return path[path < stop]
+
+    @staticmethod
+    def _children(index: int) -> _Array:
+        """ Vectorized ``BIT._c_zero_lsb``, indices of the nodes that
+        are folded in node ``index``.
+        """
+        lsb = (index + 1) & -(index + 1)
+        return index - (1 << _SHIFTS[:lsb.bit_length() - 1])
@@ -0,0 +1,96 @@
+"""Parallel construction of large trees.
+
+The doubling pass of ``BIT.bit_layout`` at level ``i`` combines node
+``j`` with node ``j - i``. For a block of ``B`` values starting at a
+multiple of ``B`` (a power of two), every level below ``B`` only ever
+combines nodes of the block itself: the layout of each such block can be
+computed on its own, in a different process. The levels from ``B`` up
+touch one node per ``B`` values, they are combined afterwards in a pass
+over ``n / B`` nodes.
+
+Values are handed to the workers through a ``multiprocessing`` shared
+memory segment, so they must be fixed width numbers (see ``typecode``),
+and ``binop`` must be picklable.
+"""
+import os
+from array import array
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Iterable, Optional
+
+from .bit import BIT
+
+_Op = Callable[[Any, Any], Any]
+# smallest default block, a job costs about as much as laying out a few
+# thousand values.
+MIN_BLOCK = 1 << 14
+
+
+def parallel_layout(iterable: Iterable[Any],
+                    binary_op: _Op,
+                    typecode: str = 'q',
+                    workers: Optional[int] = None,
+                    block: Optional[int] = None) -> 'array[Any]':
+    """ Return ``BIT.bit_layout(iterable, binary_op, typecode)``, laying
+    out blocks of block values (a power of two, by default chosen so
+    that each worker gets a few, of at least ``MIN_BLOCK`` values) in a
+    pool of workers processes, ``os.cpu_count()`` by default.
+
+    :complexity: :math:`O(n)`, each of `w` workers makes
+                 :math:`O(n / w)` calls to ``binop`` and this process
+                 :math:`O(n / B)` for blocks of `B` values.
+    :raises ValueError: If block isn't a power of two.
+    :raises OverflowError: If a node doesn't fit ``typecode``.
+    """
+    arr = array(typecode, iterable)
+    length = len(arr)
+    workers = workers or os.cpu_count() or 1
+    if block is None:
+        block = 1 << max((length // (4 * workers)).bit_length() - 1, 0)
+        block = max(block, MIN_BLOCK)
+    elif block < 1 or block & (block - 1):
+        raise ValueError("block must be a power of two.")
+    if workers > 1 and block < length:
+        data = memoryview(arr).cast('B')
+        shm = SharedMemory(create=True, size=len(data))
+        buf: memoryview = shm.buf  # type: ignore
+        try:
+            buf[:len(data)] = data
+            jobs = [(shm.name, typecode, start, min(start + block, length),
+                     binary_op) for start in range(0, length, block)]
+            with get_context().Pool(workers) as pool:
+                pool.starmap(_layout_block, jobs)
+            data[:] = buf[:len(data)]
+        finally:
+            shm.close()
+            shm.unlink()
+    else:
+        block = 1
+    # levels left out by the blocks, one node per block values.
+    i = block
+    while i < length:
+        j = 2 * i - 1
+        while j < length:
+            arr[j] = binary_op(arr[j], arr[j - i])
+            j += 2 * i
+        i *= 2
+    return arr
+
+
+def _layout_block(name: str,
+                  typecode: str,
+                  start: int,
+                  stop: int,
+                  binary_op: _Op) -> None:
+    """ In the segment called name, replace the values in
+    ``[start, stop)`` by their layout. Runs in a worker.
+    """
+    shm = SharedMemory(name)
+    view = shm.buf.cast(typecode)  # type: ignore
+    try:
+        layout = BIT.bit_layout(view[start:stop].tolist(), binary_op,
+                                typecode)
+        view[start:stop] = memoryview(layout)
+    finally:
+        view.release()
+        shm.close()
@@ -0,0 +1,388 @@
+"""Range update structures built from Binary Indexed Trees.
+
+Both keep the differences between consecutive values in a :class:`BIT`.
+Adding a value to a whole range then only touches the two ends of the
+range and reading a value back is a prefix query over the differences.
+:class:`RangeBIT` keeps a second tree, of differences scaled by their
+index, which turns prefix sums of the values into prefix queries too.
+
+Indexing follows what each structure answers: ``RangeUpdateBIT[i]`` is
+the value at ``i`` while ``RangeBIT[i]`` is, as for :class:`BIT`, the
+prefix sum until ``i``. ``RangeBIT.range_sum(i, j)`` follows
+``BIT.range_sum`` and covers ``(i, j]``.
+"""
+from operator import add, mul, sub
+from typing import (Callable, Generic, Iterable, List, Optional, Tuple,
+                    TypeVar, Union)
+
+from .bit import BIT
+
+_T = TypeVar('_T')
+
+
+def _retract(tree: BIT[_T], index: int, value: _T) -> None:
+    """ Inverse of ``BIT.update``, remove value from every node covering
+    index.
+    """
+    storage, inverse = tree._st, tree.inverse
+    for idx in tree._f_zero_lsb(index, len(storage)):
+        storage[idx] = inverse(storage[idx], value)  # type: ignore
+
+
+def _differences(values: List[_T],
+                 inverse: Callable[[_T, _T], _T]) -> List[_T]:
+    """ Return ``values[i] - values[i - 1]`` for each value, the first
+    value is kept as is.
+    """
+    return values[:1] + [inverse(b, a) for a, b in zip(values, values[1:])]
+
+
+def _bounds(index: Union[int, slice], length: int) -> Tuple[int, int]:
+    """ Translate an index or a slice (of step 1) to a half open range. """
+    if isinstance(index, slice):
+        start, stop, step = index.indices(length)
+        if step != 1:
+            raise ValueError("Only slices with a step of 1 supported.")
+        return start, stop
+    index = BIT._nmlz_index(index, length)
+    return index, index + 1
+
+
+class RangeUpdateBIT(Generic[_T]):
+    """ Sequence supporting range updates and point queries. """
+
+    binop: Callable[[_T, _T], _T]
+    inverse: Callable[[_T, _T], _T]
+    # differences between consecutive values.
+    _tree: BIT[_T]
+
+    def __init__(self,
+                 iterable: Optional[Iterable[_T]] = None,
+                 binop: Callable[[_T, _T], _T] = add,
+                 inverse_binop: Callable[[_T, _T], _T] = sub):
+        """
+        Initialize a new range update tree with an optional iterable.
+
+        >>> RangeUpdateBIT(range(5))
+        RangeUpdateBIT([0, 1, 2, 3, 4])
+
+        ``binop`` and ``inverse_binop`` must form a commutative group, the
+        tree holds ``inverse_binop(a[i], a[i - 1])`` at index ``i``.
+
+        :complexity: :math:`O(n)` where `n` is the number of
+                     items in the iterable.
+        """
+        values = list(iterable or [])
+        self._tree = BIT(_differences(values, inverse_binop),
+                         binop, inverse_binop)
+        self.binop = binop
+        self.inverse = inverse_binop
+
+    def __repr__(self) -> str:
+        """ Return a sensible representation of the sequence.
+
+        :complexity: :math:`O(n)`
+        """
+        return "{0}({1!r})".format(type(self).__name__,
+                                   self.original_layout())
+
+    def __len__(self) -> int:
+        """ Return the number of elements in the sequence.
+
+        >>> len(RangeUpdateBIT(range(5)))
+        5
+
+        :complexity: :math:`O(1)`
+        """
+        return len(self._tree)
+
+    def __getitem__(self, index: int) -> _T:
+        """ Shorthand for ``RangeUpdateBIT.value_at``, the value at index.
+        Unlike ``BIT.__getitem__`` this isn't a prefix sum.
+
+        >>> RangeUpdateBIT(range(5))[-1]
+        4
+        """
+        return self.value_at(index)
+
+    def __setitem__(self, index: int, value: _T) -> None:
+        """ Replace the value at index.
+
+        >>> r = RangeUpdateBIT(range(5))
+        >>> r[1] = 10
+        >>> r
+        RangeUpdateBIT([0, 10, 2, 3, 4])
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If index is out of bounds.
+        """
+        index = BIT._nmlz_index(index, len(self))
+        delta = self.inverse(value, self.value_at(index))
+        self.update(slice(index, index + 1), delta)
+
+    def value_at(self, index: int) -> _T:
+        """ Return the value at index, a prefix query over the
+        differences.
+
+        >>> r = RangeUpdateBIT(range(5))
+        >>> r.update(slice(1, 3), 10)
+        >>> r.value_at(2), r.value_at(3)
+        (12, 3)
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If index is out of bounds.
+        """
+        return self._tree.prefix_sum(index)
+
+    def update(self, index: Union[int, slice], value: _T) -> None:
+        """ Apply value, with ``binop``, to the item at index or to
+        every item in a slice. Slices follow the usual Python semantics
+        (``stop`` is excluded) and must have a step of 1.
+
+        >>> r = RangeUpdateBIT(range(5))
+        >>> r.update(slice(1, None), 10)
+        >>> r.update(0, 5)
+        >>> r
+        RangeUpdateBIT([5, 11, 12, 13, 14])
+
+        :complexity: :math:`O(\\log{}n)` regardless of the slice length.
+        :raises IndexError: If an integer index is out of bounds.
+        :raises ValueError: If the slice step isn't 1.
+        """
+        start, stop = _bounds(index, len(self))
+        if start >= stop:
+            return
+        self._tree.update(start, value)
+        if stop < len(self):
+            _retract(self._tree, stop, value)
+
+    def append(self, value: _T) -> None:
+        """ Append a new value to the sequence.
+
+        >>> r = RangeUpdateBIT(range(3))
+        >>> r.append(10)
+        >>> r
+        RangeUpdateBIT([0, 1, 2, 10])
+
+        :complexity: :math:`O(\\log{}n)`
+        """
+        if len(self):
+            value = self.inverse(value, self.value_at(-1))
+        self._tree.append(value)
+
+    def extend(self, iterable: Iterable[_T]) -> None:
+        """ Extend the sequence by appending elements from the iterable.
+
+        :complexity: :math:`O(k\\log{}n)` for `k` new elements.
+        """
+        for value in iterable:
+            self.append(value)
+
+    def original_layout(self) -> List[_T]:
+        """ Return the values held, in order.
+
+        >>> RangeUpdateBIT([3, 1, 4]).original_layout()
+        [3, 1, 4]
+
+        :complexity: :math:`O(n)`
+        """
+        values = self._tree.original_layout()
+        binop = self.binop
+        for i in range(1, len(values)):
+            values[i] = binop(values[i], values[i - 1])
+        return values
+
+
+class RangeBIT(Generic[_T]):
+    """ Sequence supporting range updates and range sums, built from two
+    Binary Indexed Trees.
+    """
+
+    binop: Callable[[_T, _T], _T]
+    inverse: Callable[[_T, _T], _T]
+    scale: Callable[[_T, int], _T]
+    # differences between consecutive values, and each scaled by its index.
+    _diffs: BIT[_T]
+    _scaled: BIT[_T]
+
+    def __init__(self,
+                 iterable: Optional[Iterable[_T]] = None,
+                 binop: Callable[[_T, _T], _T] = add,
+                 inverse_binop: Callable[[_T, _T], _T] = sub,
+                 scale: Callable[[_T, int], _T] = mul):
+        """
+        Initialize a new range update/range query tree with an optional
+        iterable.
+
+        >>> RangeBIT(range(5))
+        RangeBIT([0, 1, 2, 3, 4])
+
+        With ``d[m]`` the difference at ``m``, the sum of the first
+        ``i + 1`` values is ``(i + 1) * sum(d[:i + 1]) - sum(m * d[m])``.
+        ``scale(value, k)`` supplies the multiplication by an integer, it
+        defaults to ``operator.mul`` which works for ints, floats,
+        ``Decimal`` and ``Fraction`` alike.
+
+        :complexity: :math:`O(n)` where `n` is the number of
+                     items in the iterable.
+        """
+        diffs = _differences(list(iterable or []), inverse_binop)
+        self._diffs = BIT(diffs, binop, inverse_binop)
+        self._scaled = BIT([scale(d, m) for m, d in enumerate(diffs)],
+                           binop, inverse_binop)
+        self.binop = binop
+        self.inverse = inverse_binop
+        self.scale = scale
+
+    def __repr__(self) -> str:
+        """ Return a sensible representation of the sequence.
+
+        :complexity: :math:`O(n)`
+        """
+        return "{0}({1!r})".format(type(self).__name__,
+                                   self.original_layout())
+
+    def __len__(self) -> int:
+        """ Return the number of elements in the sequence.
+
+        >>> len(RangeBIT(range(5)))
+        5
+
+        :complexity: :math:`O(1)`
+        """
+        return len(self._diffs)
+
+    def __getitem__(self, index: int) -> _T:
+        """ Shorthand for ``RangeBIT.prefix_sum``, the sum of the values
+        until (including!) index, like ``BIT.__getitem__``. The value at
+        index is returned by ``RangeBIT.value_at``.
+
+        >>> RangeBIT(range(5))[-1]
+        10
+        """
+        return self.prefix_sum(index)
+
+    def value_at(self, index: int) -> _T:
+        """ Return the value at index.
+
+        >>> RangeBIT(range(5)).value_at(3)
+        3
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If index is out of bounds.
+        """
+        return self._diffs.prefix_sum(index)
+
+    def prefix_sum(self, index: int) -> _T:
+        """ Return the sum of the values until (including!) index.
+
+        >>> r = RangeBIT(range(5))
+        >>> r.add_range(1, 2, 10)
+        >>> r.prefix_sum(2), r.prefix_sum(4)
+        (23, 30)
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If index is out of bounds.
+        """
+        index = BIT._nmlz_index(index, len(self))
+        return self.inverse(
+            self.scale(self._diffs.prefix_sum(index), index + 1),
+            self._scaled.prefix_sum(index)
+        )
+
+    def range_sum(self, i: int = 0, j: Optional[int] = None) -> _T:
+        """ Return the sum of the values after i until (including!) j,
+        ``prefix_sum(j)`` with ``prefix_sum(i)`` removed, as
+        ``BIT.range_sum`` does. j defaults to the last index.
+
+        >>> r = RangeBIT(range(5))
+        >>> r.range_sum(1, 3), r.range_sum(-3, -1)
+        (5, 7)
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If `i > j` or any of them is out of bounds.
+        """
+        length = len(self)
+        i = BIT._nmlz_index(i, length)
+        j = BIT._nmlz_index(length - 1 if j is None else j, length)
+        if j < i:
+            raise IndexError("j must be >= than i.")
+        return self.inverse(self.prefix_sum(j), self.prefix_sum(i))
+
+    def add_range(self, i: int, j: int, value: _T) -> None:
+        """ Apply value, with ``binop``, to every item from i to j, both
+        included (unlike ``RangeBIT.range_sum``, i is updated too).
+
+        >>> r = RangeBIT(range(5))
+        >>> r.add_range(0, -2, 10)
+        >>> r
+        RangeBIT([10, 11, 12, 13, 4])
+
+        :complexity: :math:`O(\\log{}n)` regardless of the range length.
+        :raises IndexError: If `i > j` or any of them is out of bounds.
+        """
+        length = len(self)
+        i, j = BIT._nmlz_index(i, length), BIT._nmlz_index(j, length)
+        if j < i:
+            raise IndexError("j must be >= than i.")
+        scale = self.scale
+        self._diffs.update(i, value)
+        self._scaled.update(i, scale(value, i))
+        if j + 1 < length:
+            _retract(self._diffs, j + 1, value)
+            _retract(self._scaled, j + 1, scale(value, j + 1))
+
+    def update(self, index: Union[int, slice], value: _T) -> None:
+        """ Apply value to the item at index or to every item in a slice,
+        as ``RangeUpdateBIT.update`` does.
+
+        >>> r = RangeBIT(range(5))
+        >>> r.update(slice(3, None), 1)
+        >>> r
+        RangeBIT([0, 1, 2, 4, 5])
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If an integer index is out of bounds.
+        :raises ValueError: If the slice step isn't 1.
+        """
+        start, stop = _bounds(index, len(self))
+        if start < stop:
+            self.add_range(start, stop - 1, value)
+
+    def append(self, value: _T) -> None:
+        """ Append a new value to the sequence.
+
+        >>> r = RangeBIT(range(3))
+        >>> r.append(10)
+        >>> r.range_sum(1, 3)
+        12
+
+        :complexity: :math:`O(\\log{}n)`
+        """
+        length = len(self)
+        if length:
+            value = self.inverse(value, self.value_at(-1))
+        self._diffs.append(value)
+        self._scaled.append(self.scale(value, length))
+
+    def extend(self, iterable: Iterable[_T]) -> None:
+        """ Extend the sequence by appending elements from the iterable.
+
+        :complexity: :math:`O(k\\log{}n)` for `k` new elements.
+        """
+        for value in iterable:
+            self.append(value)
+
+    def original_layout(self) -> List[_T]:
+        """ Return the values held, in order.
+
+        >>> RangeBIT([3, 1, 4]).original_layout()
+        [3, 1, 4]
+
+        :complexity: :math:`O(n)`
+        """
+        values = self._diffs.original_layout()
+        binop = self.binop
+        for i in range(1, len(values)):
+            values[i] = binop(values[i], values[i - 1])
+        return values
@@ -0,0 +1,261 @@
+"""Range queries for operators without an inverse.
+
+``BIT.range_sum`` takes the prefix up to ``j`` and removes the prefix up
+to ``i`` with ``inverse_binop``, which ``min``, ``max``, ``gcd`` or set
+intersection don't have. :class:`RangeQueryBIT` keeps a second, mirrored,
+tree next to the usual one: (one based) node ``i`` holds the ``binop`` of
+the values in ``[i, i + lsb(i))`` instead of ``(i - lsb(i), i]``. A query
+over ``[lo, hi]`` climbs the mirrored tree from ``lo`` and the usual one
+from ``hi``, taking whole nodes while they fit in the range, until the
+two walks meet at a single value. Every value is combined exactly once,
+so any commutative ``binop`` works, idempotent or not.
+"""
+from operator import add
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+from .bit import BIT
+
+_T = TypeVar('_T')
+
+
+class RangeQueryBIT(BIT[_T]):
+    """ Binary Indexed Tree answering range queries without an
+    ``inverse_binop``.
+    """
+
+    # always kept, the mirror and range_query are built from them.
+    _values: List[_T]
+    _mirror: List[_T]
+
+    def __init__(self,
+                 iterable: Optional[Iterable[_T]] = None,
+                 binop: Callable[[_T, _T], _T] = add,
+                 inverse_binop: Optional[Callable[[_T, _T], _T]] = None):
+        """
+        Initialize the tree, its mirror and the list of values.
+
+        >>> b = RangeQueryBIT([5, 1, 4, 2, 3], min)
+        >>> b.range_query(2, 4), b.range_query(0, 2)
+        (2, 1)
+        >>> b[3] = 0
+        >>> b.range_query(2, 4)
+        0
+
+        ``binop`` can be a :class:`bit.monoid.Monoid`, whose identity is
+        then the sum of an empty range. Values are always kept, see
+        ``keep_values`` in :class:`bit.BIT`.
+
+        :complexity: :math:`O(n)` where `n` is the number of
+                     items in the iterable.
+        """
+        super().__init__(iterable, binop, inverse_binop, keep_values=True)
+        self._mirror = self.mirror_layout(self._values, self.binop)
+
+    def range_query(self, i: int, j: int) -> _T:
+        """ Return the ``binop`` of the values from i to j, both
+        included.
+
+        >>> from math import gcd
+        >>> RangeQueryBIT([12, 18, 24, 9, 6], gcd).range_query(0, 2)
+        6
+
+        :complexity: :math:`O(\\log{}n)` where `n` is the number of items
+                     in the Binary Indexed Tree.
+        :raises IndexError: If `i > j` or any of them is out of bounds.
+        """
+        length = len(self)
+        i, j = self._nmlz_index(i, length), self._nmlz_index(j, length)
+        if j < i:
+            raise IndexError("j must be >= than i.")
+        storage, mirror, binop = self._st, self._mirror, self.binop
+        # one based from here on.
+        lo, hi = i + 1, j + 1
+        acc = None
+        while lo + (lo & -lo) - 1 <= hi:
+            node = mirror[lo - 1]
+            acc = node if acc is None else binop(acc, node)
+            lo += lo & -lo
+        while hi - (hi & -hi) + 1 >= lo:
+            node = storage[hi - 1]
+            acc = node if acc is None else binop(acc, node)
+            hi -= hi & -hi
+        # the walks meet at a single value, or have covered the range.
+        if lo <= hi:
+            node = self._values[lo - 1]
+            acc = node if acc is None else binop(acc, node)
+        return acc  # type: ignore
+
+    def range_sum(self, i: int = 0, j: Optional[int] = None) -> _T:
+        """ Same as ``BIT.range_sum``, the values in ``(i, j]``, falling
+        back to ``RangeQueryBIT.range_query`` without an
+        ``inverse_binop``. An empty range needs the identity of a
+        :class:`bit.monoid.Monoid`.
+
+        >>> RangeQueryBIT([5, 1, 4, 2, 3], max).range_sum(1, 3)
+        4
+
+        :complexity: :math:`O(\\log{}n)` where `n` is the number of items
+                     in the Binary Indexed Tree.
+        :raises IndexError: If `i > j` or any of them is out of bounds.
+        :raises TypeError: If the range is empty and there is neither an
+                           ``inverse_binop`` nor a monoid.
+        """
+        if self.inverse:
+            return super().range_sum(i, j)
+        length = len(self)
+        if j is None:
+            j = length - 1
+        i, j = self._nmlz_index(i, length), self._nmlz_index(j, length)
+        if j < i:
+            raise IndexError("j must be > than i.")
+        if i < j:
+            return self.range_query(i + 1, j)
+        if self.monoid is None:
+            msg = "An empty range requires an inverse or a monoid. "
+            raise TypeError(msg)
+        return self.monoid.identity  # type: ignore
+
+    def __setitem__(self, index: int, value: _T) -> None:
+        """ Replace the value at index. Without an ``inverse_binop`` the
+        nodes covering index are recomputed from their children.
+
+        :complexity: :math:`O(\\log^2{}n)`, :math:`O(\\log{}n)` with an
+                     ``inverse_binop``.
+        :raises IndexError: If BIT is empty or index is out of bounds.
+        """
+        length = len(self)
+        index = self._nmlz_index(index, length)
+        values, binop = self._values, self.binop
+        if self.inverse:
+            old = values[index]
+            super().__setitem__(index, value)
+            self._spread(index, self.inverse(value, old))
+            return
+        values[index] = value
+        storage, mirror = self._st, self._mirror
+        # nodes covering index, smallest first, from their children.
+        i = index + 1
+        while i <= length:
+            node = values[i - 1]
+            for step in self._c_zero_lsb(i):
+                node = binop(node, storage[i - 1 - step])
+            storage[i - 1] = node
+            i += i & -i
+        i = index + 1
+        while i:
+            node = values[i - 1]
+            for step in self._c_zero_lsb(i):
+                if i + step > length:
+                    break
+                node = binop(node, mirror[i - 1 + step])
+            mirror[i - 1] = node
+            i -= i & -i
+
+    def update(self, index: int, value: _T) -> None:
+        """ Apply value, with ``binop``, to the value at index, in both
+        trees.
+
+        >>> b = RangeQueryBIT([5, 1, 4, 2, 3], max)
+        >>> b.update(0, 7)
+        >>> b.range_query(0, 1)
+        7
+
+        :complexity: :math:`O(\\log{}n)` where `n` is the number of items
+                     in the Binary Indexed Tree.
+        :raises IndexError: If BIT is empty or index is out of bounds.
+        """
+        index = self._nmlz_index(index, len(self))
+        super().update(index, value)
+        self._spread(index, value)
+
+    def update_many(self,
+                    indices: Iterable[int],
+                    values: Iterable[_T]) -> None:
+        """ ``RangeQueryBIT.update`` for every pair of index and value.
+
+        :complexity: :math:`O(k\\log{}n)` for `k` updates.
+        :raises IndexError: If any index is out of bounds.
+        :raises ValueError: If indices and values differ in length.
+        """
+        indices, values = list(indices), list(values)
+        if len(indices) != len(values):
+            raise ValueError("indices and values must be of equal length.")
+        for index, value in zip(indices, values):
+            self.update(index, value)
+
+    def append(self, value: _T) -> None:
+        """ Append a value, the mirrored nodes ending before it now reach
+        it too.
+
+        :complexity: :math:`O(\\log{}n)` where `n` is the number of items
+                     in the Binary Indexed Tree.
+        """
+        super().append(value)
+        self._mirror.append(value)
+        i = len(self)
+        self._spread(i - 1 - (i & -i), value)
+
+    def extend(self, iterable: Iterable[_T]) -> None:
+        """ ``RangeQueryBIT.append`` every value of iterable, the values
+        of a BIT when iterable is one.
+
+        :complexity: :math:`O(k\\log{}n)` for `k` new elements.
+        :raises TypeError: If iterable is an instance of BIT and its
+                           values can't be recovered.
+        """
+        if isinstance(iterable, BIT):
+            iterable = iterable.original_layout()
+        for value in list(iterable):
+            self.append(value)
+
+    def insert(self, index: int, value: _T) -> None:
+        """ Insert value before index, rebuilding the mirror.
+
+        :complexity: :math:`O(n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        """
+        super().insert(index, value)
+        self._mirror = self.mirror_layout(self._values, self.binop)
+
+    def pop(self, index: int = -1) -> _T:
+        """ Remove and return the value at index, rebuilding the mirror.
+
+        :complexity: :math:`O(n)` where `n` is the number of items in
+                     the Binary Indexed Tree.
+        :raises IndexError: If BIT is empty or index is out of range.
+        """
+        value = super().pop(index)
+        self._mirror = self.mirror_layout(self._values, self.binop)
+        return value
+
+    def _spread(self, index: int, value: _T) -> None:
+        """ Apply value to every mirrored node covering (zero based)
+        index, going down from index itself.
+        """
+        mirror, binop = self._mirror, self.binop
+        i = index + 1
+        while i > 0:
+            mirror[i - 1] = binop(mirror[i - 1], value)
+            i -= i & -i
+
+    @staticmethod
+    def mirror_layout(iterable: Iterable[_T],
+                      binary_op: Callable[[_T, _T], _T] = add) -> List[_T]:
+        """ Transform iterable to the mirrored layout, where (one based)
+        node ``i`` combines the values in ``[i, i + lsb(i))``. The
+        doubling pass of ``BIT.bit_layout``, combining every node with
+        the one after it.
+
+        >>> RangeQueryBIT.mirror_layout([1, 2, 3, 4, 5])
+        [1, 5, 3, 9, 5]
+
+        :complexity: :math:`O(n)` where `n` is the number of items
+                     in the iterable.
+        """
+        arr = list(iterable)
+        i, length = 1, len(arr)
+        while i < length:
+            for j in range(2 * i - 1, length - i, 2 * i):
+                arr[j] = binary_op(arr[j], arr[j + i])
+            i *= 2
+        return arr
@@ -0,0 +1,385 @@
+"""Segment tree with lazy propagation.
+
+A companion to :class:`bit.BIT` for workloads a Fenwick tree can't serve:
+assigning a value to, or adding a value to, every element of a range,
+mixed with range queries, all in :math:`O(\\log{}n)`.
+
+The tree is iterative and array backed: node ``k`` has children ``2k``
+and ``2k + 1``, the leaves start at the first power of two not below
+``n``. Internal nodes can hold a pending tag ``(assign, delta)``: set
+every value below to ``assign`` (unless it is ``None``), then add
+``delta`` to each (unless it is ``None``). Tags are pushed down only when
+a query or update needs to go below them. Two hooks tell the tree what a
+tag does to the aggregate of ``count`` values:
+
+* ``repeat(value, count)``: ``binop`` of count copies of value,
+* ``shift(aggregate, delta, count)``: the aggregate after adding delta to
+  each of the values.
+
+Both have defaults for ``add``, ``min`` and ``max`` (and the matching
+monoids). Other operators get a generic ``repeat`` by doubling, and no
+``shift``.
+"""
+from operator import add
+from typing import (Any, Callable, Generic, Iterable, Iterator, List,
+                    Optional, Tuple, TypeVar, Union)
+
+from .bit import BIT
+from .monoid import Monoid
+
+_T = TypeVar('_T')
+_Tag = Tuple[Any, Any]
+_Repeat = Callable[[Any, int], Any]
+_Shift = Callable[[Any, Any, int], Any]
+# default (repeat, shift) hooks per operator.
+_HOOKS = {
+    add: (lambda v, c: v * c, lambda s, d, c: s + d * c),
+    min: (lambda v, c: v, lambda s, d, c: s + d),
+    max: (lambda v, c: v, lambda s, d, c: s + d),
+}
+
+
+class SegmentTree(Generic[_T]):
+    """ Segment tree with range assignment, range addition and range
+    queries.
+    """
+
+    binop: Callable[[_T, _T], _T]
+    # nodes hold None where there is no identity.
+    _nodes: List[Any]
+    _counts: List[int]
+    _tags: List[Optional[_Tag]]
+
+    def __init__(self,
+                 iterable: Optional[Iterable[_T]] = None,
+                 binop: Callable[[_T, _T], _T] = add,
+                 repeat: Optional[_Repeat] = None,
+                 shift: Optional[_Shift] = None):
+        """
+        Build a tree over the values of iterable.
+
+        >>> t = SegmentTree([5, 1, 4, 2, 3], min)
+        >>> t.assign_range(1, 2, 6)
+        >>> t.add_range(3, 4, 10)
+        >>> t.range_query(1, 4), t.original_layout()
+        (6, [5, 6, 6, 12, 13])
+
+        ``binop`` can be a :class:`bit.monoid.Monoid`, whose identity then
+        fills the unused leaves (otherwise ``None`` stands in for it).
+        ``repeat`` and ``shift`` override the hooks described in
+        :mod:`bit.segtree`, ``add_range`` requires a ``shift``.
+
+        :complexity: :math:`O(n)` where `n` is the number of
+                     items in the iterable.
+        """
+        values = list(iterable or [])
+        self.monoid: Optional[Monoid] = None
+        identity = None
+        if isinstance(binop, Monoid):
+            self.monoid, identity = binop, binop.identity
+            binop = binop.binop
+        default = _HOOKS.get(binop, (None, None))
+        if repeat is None and self.monoid and self.monoid.idempotent:
+            repeat = _HOOKS[min][0]
+        self.binop = binop
+        self._repeat = repeat or default[0] or self._doubling
+        self._shift = shift or default[1]
+        self._identity = identity
+
+        length = len(values)
+        size = 1 << max(length - 1, 0).bit_length()
+        self._length, self._size = length, size
+        self._log = size.bit_length() - 1
+        nodes: List[Any] = [identity] * (2 * size)
+        nodes[size:size + length] = values
+        # number of actual values below each node.
+        counts = [0] * (2 * size)
+        counts[size:size + length] = [1] * length
+        for k in range(size - 1, 0, -1):
+            nodes[k] = self._op(nodes[2 * k], nodes[2 * k + 1])
+            counts[k] = counts[2 * k] + counts[2 * k + 1]
+        self._nodes, self._counts = nodes, counts
+        self._tags = [None] * size
+
+    def __repr__(self) -> str:
+        """ Return the values the tree holds.
+
+        :complexity: :math:`O(n)`
+        """
+        return "{0}({1!r})".format(type(self).__name__,
+                                   self.original_layout())
+
+    def __len__(self) -> int:
+        """ Return the number of values.
+
+        :complexity: :math:`O(1)`
+        """
+        return self._length
+
+    def __getitem__(self, index: Union[int, slice]) -> _T:
+        """ Prefix query until (including!) index, or a range query for
+        a slice, with the conventions of ``BIT.__getitem__``.
+
+        >>> t = SegmentTree(range(10))
+        >>> t[4], t[3:6]
+        (10, 15)
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If index is out of bounds.
+        """
+        if isinstance(index, slice):
+            length = len(self)
+            start, end = index.start, index.stop
+            if start is None:
+                start = 0
+            else:
+                start = start + length if start < 0 else start
+            if end is None:
+                end = length - 1
+            else:
+                end = end + length if end < 0 else end
+            return self.range_sum(start, end)
+        return self.prefix_sum(index)
+
+    def __setitem__(self, index: int, value: _T) -> None:
+        """ Replace the value at index.
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If index is out of bounds.
+        """
+        index = BIT._nmlz_index(index, self._length)
+        self.assign_range(index, index, value)
+
+    def __iter__(self) -> Iterator[_T]:
+        """ Iterate over the prefix sums, like ``BIT.__iter__``.
+
+        >>> list(SegmentTree(range(5)))
+        [0, 1, 3, 6, 10]
+
+        :complexity: :math:`O(n)`
+        """
+        acc = None
+        for value in self.original_layout():
+            acc = self._op(acc, value)
+            yield acc
+
+    def value_at(self, index: int) -> _T:
+        """ Return the value at index.
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If index is out of bounds.
+        """
+        index = BIT._nmlz_index(index, self._length)
+        leaf = index + self._size
+        for i in range(self._log, 0, -1):
+            self._push(leaf >> i)
+        value: _T = self._nodes[leaf]
+        return value
+
+    def original_layout(self) -> List[_T]:
+        """ Return the values, pushing every pending tag down.
+
+        :complexity: :math:`O(n)`
+        """
+        for k in range(1, self._size):
+            self._push(k)
+        size = self._size
+        return self._nodes[size:size + self._length]
+
+    def update(self, index: int, value: _T) -> None:
+        """ Apply value, with ``binop``, to the value at index, like
+        ``BIT.update``.
+
+        >>> t = SegmentTree(range(5))
+        >>> t.update(2, 10)
+        >>> t[4]
+        20
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If index is out of bounds.
+        """
+        index = BIT._nmlz_index(index, self._length)
+        leaf = index + self._size
+        for i in range(self._log, 0, -1):
+            self._push(leaf >> i)
+        self._nodes[leaf] = self._op(self._nodes[leaf], value)
+        for i in range(1, self._log + 1):
+            self._pull(leaf >> i)
+
+    def prefix_sum(self, index: int) -> _T:
+        """ Return the ``binop`` of the values until (including!) index.
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If index is out of bounds.
+        """
+        index = BIT._nmlz_index(index, self._length)
+        return self.range_query(0, index)
+
+    def range_sum(self, i: int = 0, j: Optional[int] = None) -> _T:
+        """ Return the ``binop`` of the values in ``(i, j]``, like
+        ``BIT.range_sum``. An empty range needs the identity of a
+        :class:`bit.monoid.Monoid`.
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If `i > j` or any of them is out of bounds.
+        :raises TypeError: If the range is empty and binop isn't a
+                           monoid.
+        """
+        length = self._length
+        if j is None:
+            j = length - 1
+        i, j = BIT._nmlz_index(i, length), BIT._nmlz_index(j, length)
+        if j < i:
+            raise IndexError("j must be > than i.")
+        if i < j:
+            return self.range_query(i + 1, j)
+        if self.monoid is None:
+            raise TypeError("An empty range requires a monoid. ")
+        return self._identity  # type: ignore
+
+    def range_query(self, i: int, j: int) -> _T:
+        """ Return the ``binop`` of the values from i to j, both
+        included.
+
+        >>> SegmentTree([5, 1, 4, 2, 3], max).range_query(2, 4)
+        4
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If `i > j` or any of them is out of bounds.
+        """
+        lo, hi = self._bounds(i, j)
+        nodes, op = self._nodes, self._op
+        left = right = None
+        while lo < hi:
+            if lo & 1:
+                left = op(left, nodes[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                right = op(nodes[hi], right)
+            lo >>= 1
+            hi >>= 1
+        result: _T = op(left, right)
+        return result
+
+    def assign_range(self, i: int, j: int, value: _T) -> None:
+        """ Set every value from i to j, both included, to value.
+
+        >>> t = SegmentTree(range(10))
+        >>> t.assign_range(2, 5, 1)
+        >>> t[9], t.range_query(1, 3)
+        (35, 3)
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If `i > j` or any of them is out of bounds.
+        """
+        self._apply_range(i, j, (value, None))
+
+    def add_range(self, i: int, j: int, value: Any) -> None:
+        """ Add value to every value from i to j, both included.
+
+        >>> t = SegmentTree(range(10))
+        >>> t.add_range(0, 4, 2)
+        >>> t[9]
+        55
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If `i > j` or any of them is out of bounds.
+        :raises TypeError: If there is no ``shift`` hook for binop.
+        """
+        if self._shift is None:
+            raise TypeError("add_range requires a shift hook for binop.")
+        self._apply_range(i, j, (None, value))
+
+    def _apply_range(self, i: int, j: int, tag: _Tag) -> None:
+        """ Apply tag to the leaves from i to j, both included. """
+        lo, hi = self._bounds(i, j)
+        start, stop = lo, hi
+        while lo < hi:
+            if lo & 1:
+                self._apply(lo, tag)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                self._apply(hi, tag)
+            lo >>= 1
+            hi >>= 1
+        for k in range(1, self._log + 1):
+            if (start >> k) << k != start:
+                self._pull(start >> k)
+            if (stop >> k) << k != stop:
+                self._pull((stop - 1) >> k)
+
+    def _bounds(self, i: int, j: int) -> Tuple[int, int]:
+        """ Normalize i and j, push down the tags above the leaves at
+        either end, and return the half open range of leaves.
+        """
+        length = self._length
+        i, j = BIT._nmlz_index(i, length), BIT._nmlz_index(j, length)
+        if j < i:
+            raise IndexError("j must be >= than i.")
+        lo, hi = i + self._size, j + 1 + self._size
+        for k in range(self._log, 0, -1):
+            if (lo >> k) << k != lo:
+                self._push(lo >> k)
+            if (hi >> k) << k != hi:
+                self._push((hi - 1) >> k)
+        return lo, hi
+
+    def _apply(self, k: int, tag: _Tag) -> None:
+        """ Apply tag to node k, and keep it pending for its children. """
+        count = self._counts[k]
+        if not count:
+            return
+        value, delta = tag
+        node = self._nodes[k]
+        if value is not None:
+            node = self._repeat(value, count)
+        if delta is not None:
+            node = self._shift(node, delta, count)  # type: ignore
+        self._nodes[k] = node
+        if k < self._size:
+            self._tags[k] = self._compose(tag, self._tags[k])
+
+    @staticmethod
+    def _compose(tag: _Tag, old: Optional[_Tag]) -> _Tag:
+        """ Tag equivalent to applying old, then tag. """
+        if old is None or tag[0] is not None:
+            return tag
+        value, delta = old
+        if delta is None:
+            return value, tag[1]
+        return value, delta + tag[1]
+
+    def _push(self, k: int) -> None:
+        """ Hand the pending tag of node k down to its children. """
+        tag = self._tags[k]
+        if tag is not None:
+            self._apply(2 * k, tag)
+            self._apply(2 * k + 1, tag)
+            self._tags[k] = None
+
+    def _pull(self, k: int) -> None:
+        """ Recompute node k from its children. """
+        self._nodes[k] = self._op(self._nodes[2 * k], self._nodes[2 * k + 1])
+
+    def _op(self, x: Any, y: Any) -> Any:
+        """ ``binop``, with ``None`` as its identity. """
+        if x is None:
+            return y
+        if y is None:
+            return x
+        return self.binop(x, y)
+
+    def _doubling(self, value: Any, count: int) -> Any:
+        """ Default ``repeat``, combines count copies of value with
+        :math:`O(\\log{}count)` calls to ``binop``.
+        """
+        acc = None
+        while count:
+            if count & 1:
+                acc = self._op(acc, value)
+            count >>= 1
+            if count:
+                value = self.binop(value, value)
+        return acc
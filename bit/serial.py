@@ -0,0 +1,113 @@
+"""Compact binary format shared by file backed and serialized trees.
+
+A tree is a fixed size header followed by its nodes, in the byte order
+of the host that wrote them, as packed by ``array.array``. The header
+records everything needed to use the nodes again without rebuilding them:
+
+* a magic string and a format version,
+* the ``array`` typecode of the nodes,
+* the id of ``binop`` in :data:`BINOPS`,
+* the byte order of the nodes, ``<`` or ``>`` as in :mod:`struct`,
+* the number of nodes.
+
+Only operators listed in :data:`BINOPS` can be recorded, arbitrary
+callables (lambdas in particular) can't be restored by name.
+"""
+import operator
+import struct
+import sys
+from typing import Any, Callable, List, Optional, Tuple
+
+_Op = Callable[[Any, Any], Any]
+
+MAGIC = b'BITF'
+VERSION = 1
+# magic, version, typecode, binop id, byte order, number of nodes.
+HEADER = struct.Struct('<4sBcBcQ')
+# byte order nodes are written in on this host.
+NATIVE = b'<' if sys.byteorder == 'little' else b'>'
+# (name, binop, default inverse), the id of an operator is its position.
+# Only ever append to this list, ids are stored in files.
+BINOPS: List[Tuple[str, _Op, Optional[_Op]]] = [
+    ('add', operator.add, operator.sub),
+    ('xor', operator.xor, operator.xor),
+    ('or', operator.or_, None),
+    ('and', operator.and_, None),
+    ('mul', operator.mul, None),
+    ('max', max, None),
+    ('min', min, None),
+]
+
+
+def binop_id(binop: _Op) -> int:
+    """ Return the id binop is recorded with.
+
+    >>> binop_id(operator.xor)
+    1
+
+    :raises ValueError: If binop isn't one of :data:`BINOPS`.
+    """
+    for op_id, (_, op, _) in enumerate(BINOPS):
+        if op is binop:
+            return op_id
+    msg = "Can't record binop {0!r}, it must be one of: {1}."
+    raise ValueError(msg.format(binop, ', '.join(b[0] for b in BINOPS)))
+
+
+def pack_header(typecode: str, binop: _Op, length: int) -> bytes:
+    """ Return the header for ``length`` nodes of the given typecode.
+
+    :raises ValueError: If binop isn't one of :data:`BINOPS`.
+    """
+    return HEADER.pack(MAGIC, VERSION, typecode.encode('ascii'),
+                       binop_id(binop), NATIVE, length)
+
+
+def unpack_header(buffer: Any) -> Tuple[str, _Op, Optional[_Op], int]:
+    """ Read the header at the start of buffer and return the typecode,
+    ``binop``, default ``inverse_binop`` and number of nodes.
+
+    >>> unpack_header(pack_header('q', operator.add, 10))[::3]
+    ('q', 10)
+
+    :raises ValueError: If buffer doesn't start with a valid header.
+    """
+    if len(buffer) < HEADER.size:
+        raise ValueError("Buffer too small to hold a header.")
+    magic, version, typecode, op_id, order, length = HEADER.unpack_from(
+        buffer
+    )
+    if magic != MAGIC:
+        raise ValueError("Not a serialized Binary Indexed Tree.")
+    if version != VERSION:
+        msg = "Unsupported format version {0}, expected {1}."
+        raise ValueError(msg.format(version, VERSION))
+    if op_id >= len(BINOPS):
+        raise ValueError("Unknown binop id {0}.".format(op_id))
+    if order not in (b'<', b'>'):
+        raise ValueError("Unknown byte order {0!r}.".format(order))
+    _, binop, inverse = BINOPS[op_id]
+    return typecode.decode('ascii'), binop, inverse, length
+
+
+def swapped(buffer: Any) -> bool:
+    """ Return whether the nodes after the (valid) header at the start
+    of buffer are in the other byte order than the one of this host.
+
+    >>> swapped(pack_header('q', operator.add, 10))
+    False
+    """
+    order: bytes = HEADER.unpack_from(buffer)[4]
+    return order != NATIVE
+
+
+def check_native(buffer: Any) -> None:
+    """ Check that the nodes after the (valid) header at the start of
+    buffer can be used in place on this host.
+
+    :raises ValueError: If the nodes are in the other byte order.
+    """
+    if swapped(buffer):
+        msg = "Nodes were written in {0}-endian byte order, not {1}."
+        raise ValueError(msg.format('big' if NATIVE == b'<' else 'little',
+                                    sys.byteorder))
@@ -0,0 +1,458 @@
+"""Binary Indexed Tree in shared memory, for several processes.
+
+The segment holds the :mod:`bit.serial` header, the number of slots, a
+sequence number and an owner per slot and then one tree of fixed width
+nodes per slot. Instead of locking across processes every process writes
+to a slot of its own, so each slot has a single writer: a slot records
+the pid of the process that claimed it, ``SharedBIT.attach`` refuses a
+slot that is already claimed and ``SharedBIT.close`` gives it back.
+Claiming isn't atomic, two processes attaching to the same free slot at
+the same moment can both get it, so hand the slots out from one place.
+The slot of a process that died without closing the tree stays claimed
+until it is given back with ``SharedBIT.release``.
+
+Only the creating process owns the segment: processes that attach don't
+register it with their ``multiprocessing`` resource tracker, which would
+otherwise unlink it from under the others when they exit.
+
+A query combines its answer over every slot that has been written to,
+``binop`` must be commutative (as it is for :class:`bit.BIT`) and have
+zero as its identity, since slots start out zeroed.
+
+Writers bump the sequence number of their slot before and after touching
+its nodes, readers retry a slot whose number was odd or changed while
+they read it (see :mod:`bit.concurrent`). Every update made by a process
+is thus seen in full or not at all, updates from different processes are
+independent of each other.
+
+Reads and writes of the shared nodes and sequence numbers are plain loads
+and stores of aligned words, without memory barriers. This is safe
+on x86 and x86-64, which don't reorder stores with other stores nor loads
+with other loads. Weakly ordered CPUs (ARM, POWER) may make a write
+visible before the sequence number guarding it, so queries running there
+concurrently with updates can see an update in part.
+"""
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from operator import add, or_, xor
+from typing import (Any, Callable, Generic, Iterable, Iterator, List,
+                    Optional, TypeVar)
+
+from .bit import BIT
+from . import serial
+
+_T = TypeVar('_T')
+_R = TypeVar('_R')
+_Op = Callable[[Any, Any], Any]
+# number of slots, follows the header.
+SLOTS = struct.Struct('<Q')
+# binops whose identity is zero, the value unused slots hold.
+_ZERO_IDENTITY = (add, xor, or_)
+# serializes attaching, while registering is switched off.
+_untracked = threading.Lock()
+
+
+def _attach_segment(name: str) -> SharedMemory:
+    """ Open the existing segment called name without registering it
+    with the resource tracker, whose process may be shared with the
+    creator (say, for pool workers) and would unlink the segment when the
+    attaching process exits otherwise.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, track=False)  # type: ignore
+    with _untracked:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedBIT(Generic[_T]):
+    """ Binary Indexed Tree in shared memory, updated and queried by
+    several processes.
+    """
+
+    # the nodes are fixed width numbers.
+    binop: _Op
+    inverse: Optional[_Op]
+    _shm: SharedMemory
+    # views of the segment: a sequence number, an owner and a tree per
+    # slot.
+    _seqs: memoryview
+    _owners: memoryview
+    _trees: List[memoryview]
+    _typecode: str
+    _length: int
+    _slot: Optional[int]
+
+    def __init__(self,
+                 name: Optional[str] = None,
+                 iterable: Optional[Iterable[Any]] = None,
+                 binop: _Op = add,
+                 inverse_binop: Optional[_Op] = None,
+                 typecode: str = 'q',
+                 slots: int = 8):
+        """
+        Create a shared memory segment named name (a unique name is
+        generated when it is None) and build a tree in it from an
+        optional iterable.
+
+        >>> from operator import add, sub
+        >>> b = SharedBIT(None, range(10), add, sub, slots=2)
+        >>> other = SharedBIT.attach(b.name, slot=1)
+        >>> other.update(3, 10)
+        >>> b[9], b.range_sum(2, 5)
+        (55, 22)
+        >>> other.close(); b.close(); b.unlink()
+
+        The creating process writes to slot 0, up to ``slots - 1`` other
+        processes can attach with ``SharedBIT.attach`` and a slot of their
+        own. The number of values is fixed. The segment lives on until
+        ``unlink`` is called, by one of the processes, once all of them
+        are done with it.
+
+        :complexity: :math:`O(n)` where `n` is the number of
+                     items in the iterable.
+        :raises ValueError: If binop isn't ``add``, ``xor`` or ``or_``
+                            or slots is less than 1.
+        :raises OverflowError: If a node doesn't fit typecode.
+        """
+        if not any(binop is op for op in _ZERO_IDENTITY):
+            msg = "binop must be add, xor or or_, got {0!r}."
+            raise ValueError(msg.format(binop))
+        if slots < 1:
+            raise ValueError("slots must be at least 1.")
+        nodes = BIT.bit_layout(list(iterable or []), binop, typecode)
+        length = len(nodes)
+        size = self._offset(slots) + slots * length * nodes.itemsize
+        self._shm = SharedMemory(name, create=True, size=size)
+        view: memoryview = self._shm.buf  # type: ignore
+        view[:serial.HEADER.size] = serial.pack_header(typecode, binop,
+                                                       length)
+        SLOTS.pack_into(view, serial.HEADER.size, slots)
+        self._map(inverse_binop, 0)
+        self._owners[0] = os.getpid()
+        self._trees[0][:] = memoryview(nodes)
+        # mark slot 0 as written to, it holds the initial values.
+        self._seqs[0] = 2
+
+    @classmethod
+    def attach(cls,
+               name: str,
+               slot: Optional[int] = None,
+               inverse_binop: Optional[_Op] = None) -> 'SharedBIT[Any]':
+        """ Attach to the tree in the segment called name. ``binop`` is
+        restored from the segment, as is the inverse of operators that
+        have a well-known one. Updates go to slot, which is claimed until
+        ``SharedBIT.close`` and can't be attached to by anyone else
+        meanwhile, the tree is read only without one.
+
+        :complexity: :math:`O(s)` for `s` slots.
+        :raises ValueError: If the segment doesn't hold a tree, slot is
+                            out of range or already claimed.
+        :raises FileNotFoundError: If there is no segment called name.
+        """
+        self = cls.__new__(cls)
+        self._shm = _attach_segment(name)
+        try:
+            self._map(inverse_binop, slot)
+        except ValueError:
+            self._shm.close()
+            raise
+        if slot is not None:
+            try:
+                self._claim(slot)
+            except ValueError:
+                # detach without giving back a slot that isn't ours.
+                self._slot = None
+                self.close()
+                raise
+        return self
+
+    def _map(self, inverse_binop: Optional[_Op], slot: Optional[int]) -> None:
+        """ Read the header and set up views of the sequence numbers and
+        of the tree of every slot.
+        """
+        view: memoryview = self._shm.buf  # type: ignore
+        typecode, binop, inverse, length = serial.unpack_header(view)
+        slots, = SLOTS.unpack_from(view, serial.HEADER.size)
+        if slot is not None and not 0 <= slot < slots:
+            msg = "slot must be in range [0, {0}), got {1}."
+            raise ValueError(msg.format(slots, slot))
+        start = serial.HEADER.size + SLOTS.size
+        self._seqs = view[start:start + 8 * slots].cast('Q')
+        start += 8 * slots
+        self._owners = view[start:start + 8 * slots].cast('Q')
+        start, size = self._offset(slots), length * array(typecode).itemsize
+        self._trees = [
+            view[start + k * size:start + (k + 1) * size].cast(
+                typecode)  # type: ignore
+            for k in range(slots)
+        ]
+        self._typecode, self._length, self._slot = typecode, length, slot
+        self.binop = binop
+        self.inverse = inverse_binop or inverse
+
+    def _claim(self, slot: int) -> None:
+        """ Record this process as the owner of slot.
+
+        :raises ValueError: If slot is already claimed.
+        """
+        owner = self._owners[slot]
+        if owner:
+            msg = "slot {0} is already claimed by process {1}."
+            raise ValueError(msg.format(slot, owner))
+        self._owners[slot] = os.getpid()
+
+    def release(self, slot: int) -> None:
+        """ Give back slot, claimed by a process that died without
+        closing the tree, so that it can be attached to again. Only call
+        it once the owner is known to be gone. An update the owner was in
+        the middle of may be left applied in part.
+
+        :complexity: :math:`O(1)`
+        :raises ValueError: If slot is out of range or our own.
+        """
+        if not 0 <= slot < len(self._owners):
+            msg = "slot must be in range [0, {0}), got {1}."
+            raise ValueError(msg.format(len(self._owners), slot))
+        if slot == self._slot:
+            raise ValueError("Can't release our own slot, use close.")
+        seqs = self._seqs
+        if seqs[slot] & 1:
+            # let readers through the interrupted write.
+            seqs[slot] += 1
+        self._owners[slot] = 0
+
+    @staticmethod
+    def _offset(slots: int) -> int:
+        """ Offset of the first node, for a segment with slots slots. """
+        return serial.HEADER.size + SLOTS.size + 16 * slots
+
+    def __enter__(self) -> 'SharedBIT[_T]':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """ Detach from the segment and give back our slot, the tree can't
+        be used afterwards. The segment itself stays around, see
+        ``SharedBIT.unlink``.
+        """
+        if self._slot is not None:
+            self._owners[self._slot] = 0
+            self._slot = None
+        for tree in self._trees:
+            tree.release()
+        self._seqs.release()
+        self._owners.release()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """ Destroy the segment once every process has closed it. Call
+        it exactly once, from any of the processes.
+        """
+        self._shm.unlink()
+
+    @property
+    def name(self) -> str:
+        """ Name other processes attach with. """
+        return self._shm.name
+
+    @property
+    def slot(self) -> Optional[int]:
+        """ Slot updates are written to, None if the tree is read only. """
+        return self._slot
+
+    @property
+    def typecode(self) -> str:
+        """ Typecode of the nodes. """
+        return self._typecode
+
+    def __len__(self) -> int:
+        """ Return the number of values.
+
+        :complexity: :math:`O(1)`
+        """
+        return self._length
+
+    def __repr__(self) -> str:
+        """ Return the nodes every slot adds up to, see
+        ``SharedBIT.snapshot``.
+
+        :complexity: :math:`O(sn)` for `s` slots in use.
+        """
+        return repr(self._merged())
+
+    def __getitem__(self, index: int) -> _T:
+        """ Shorthand for ``SharedBIT.prefix_sum(index)``. """
+        return self.prefix_sum(index)
+
+    def __setitem__(self, index: int, value: _T) -> None:
+        """ Replace the value at index, requires ``inverse_binop``. The
+        difference to the current value is written to our slot, so a
+        concurrent update of index from another process still counts.
+
+        :complexity: :math:`O(s\\log{}n)` for `s` slots in use.
+        :raises IndexError: If index is out of bounds.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied or
+                           the tree is read only.
+        """
+        old: _T = self.value_at(index)
+        self.update(index, self.inverse(value, old))  # type: ignore
+
+    def update(self, index: int, value: _T) -> None:
+        """ Apply value, with ``binop``, to the value at index, writing
+        to our slot only.
+
+        :complexity: :math:`O(\\log{}n)` where `n` is the number of items
+                     in the Binary Indexed Tree.
+        :raises IndexError: If index is out of bounds.
+        :raises TypeError: If the tree is read only.
+        :raises OverflowError: If a node doesn't fit the typecode, the
+                               tree is left unchanged.
+        """
+        slot = self._slot
+        if slot is None:
+            raise TypeError("Attached without a slot, the tree is read only.")
+        index = BIT._nmlz_index(index, self._length)
+        tree, binop = self._trees[slot], self.binop
+        path = list(BIT._f_zero_lsb(index, self._length))
+        # check every new node fits before touching any.
+        nodes = array(self._typecode, [binop(tree[i], value) for i in path])
+        seqs = self._seqs
+        seqs[slot] += 1
+        try:
+            for i, node in zip(path, nodes):
+                tree[i] = node
+        finally:
+            seqs[slot] += 1
+
+    def prefix_sum(self, index: int) -> _T:
+        """ Return the prefix sum until (including!) index, over the
+        updates of every process.
+
+        :complexity: :math:`O(s\\log{}n)` for `s` slots in use.
+        :raises IndexError: If index is out of bounds.
+        """
+        index = BIT._nmlz_index(index, self._length)
+        binop = self.binop
+
+        def prefix(tree: memoryview) -> Any:
+            acc = tree[index]
+            for idx in BIT._c_one_lsb((index + 1) & index):
+                acc = binop(acc, tree[idx - 1])
+            return acc
+        total: _T = self._combine(prefix)
+        return total
+
+    def range_sum(self, i: int = 0, j: Optional[int] = None) -> _T:
+        """ Return the sum of the values in ``(i, j]``, like
+        ``BIT.range_sum``, requires ``inverse_binop``.
+
+        :complexity: :math:`O(s\\log{}n)` for `s` slots in use.
+        :raises IndexError: If `i > j` or any of them is out of bounds.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        if j is None:
+            j = self._length - 1
+        if j < i:
+            raise IndexError("j must be > than i.")
+        if not self.inverse:
+            msg = "Inverse operator required for range_sum. "
+            raise TypeError(msg)
+        total: _T = self.inverse(self.prefix_sum(j), self.prefix_sum(i))
+        return total
+
+    def value_at(self, index: int) -> _T:
+        """ Return the value at index, requires ``inverse_binop``.
+
+        :complexity: :math:`O(s\\log{}n)` for `s` slots in use.
+        :raises IndexError: If index is out of bounds.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        index = BIT._nmlz_index(index, self._length)
+        inverse = self.inverse
+        if not inverse:
+            msg = "Inverse Operator is required for value_at. "
+            raise TypeError(msg)
+
+        def value(tree: memoryview) -> Any:
+            acc = tree[index]
+            for step in BIT._c_zero_lsb(index + 1):
+                acc = inverse(acc, tree[index - step])
+            return acc
+        total: _T = self._combine(value)
+        return total
+
+    def original_layout(self) -> List[_T]:
+        """ Return the values, requires ``inverse_binop``.
+
+        :complexity: :math:`O(sn)` for `s` slots in use.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        return self.snapshot().original_layout()
+
+    def __iter__(self) -> Iterator[_T]:
+        """ Iterate over the prefix sums of a snapshot of the tree.
+
+        :complexity: :math:`O(sn)` for `s` slots in use.
+        """
+        return iter(self.snapshot())
+
+    def snapshot(self) -> BIT[_T]:
+        """ Return a ``BIT``, in local memory, whose nodes combine those
+        of every slot.
+
+        :complexity: :math:`O(sn)` for `s` slots in use.
+        """
+        tree: BIT[_T] = BIT.__new__(BIT)
+        tree._st = self._merged()
+        tree.binop, tree.inverse = self.binop, self.inverse
+        return tree
+
+    def _merged(self) -> List[_T]:
+        """ Combine the nodes of every slot, node by node. Since each
+        slot holds the layout of its values, the result is the layout of
+        the values of all of them.
+        """
+        binop = self.binop
+        nodes: Optional[List[Any]] = None
+        for tree in self._written(list):
+            nodes = tree if nodes is None else list(map(binop, nodes, tree))
+        return nodes or []
+
+    def _combine(self, query: Callable[[memoryview], Any]) -> Any:
+        """ Run query on every slot in use and combine the answers. """
+        binop, acc = self.binop, None
+        for value in self._written(query):
+            acc = value if acc is None else binop(acc, value)
+        return acc
+
+    def _written(self, query: Callable[[memoryview], _R]) -> Iterator[_R]:
+        """ Yield the answer of query for every slot that has been
+        written to, retrying a slot while a write to it overlaps the
+        query.
+        """
+        seqs = self._seqs
+        for slot, tree in enumerate(self._trees):
+            while True:
+                seq = seqs[slot]
+                if not seq:
+                    break
+                if not seq & 1:
+                    value = query(tree)
+                    if seqs[slot] == seq:
+                        yield value
+                        break
+                # the writer is another process, let it run.
+                time.sleep(0)
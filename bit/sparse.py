@@ -0,0 +1,406 @@
+"""Binary Indexed Trees over huge, mostly untouched, index domains.
+
+:class:`SparseBIT` addresses ``range(universe)`` like a :class:`bit.BIT`
+of that length would, but only stores the nodes an update has reached,
+in a dict: ``k`` updates cost :math:`O(k\\log{}U)` memory whatever the
+size ``U`` of the universe. ``SparseBIT.freeze`` packs the nodes in two
+sorted arrays once the tree is only queried.
+
+:class:`CompressedBIT` is the offline alternative, when the keys are known
+upfront: they are sorted and mapped to the indices of a dense
+:class:`bit.BIT`.
+
+Untouched positions hold the identity of ``binop``, which comes from a
+:class:`bit.monoid.Monoid` or is zero for ``add``, ``xor`` and ``or_``.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from operator import add, or_, xor
+from typing import (Any, Callable, Dict, Generic, Iterable, List, Mapping,
+                    Optional, Tuple, TypeVar, Union)
+
+from .bit import BIT
+from .monoid import Monoid
+
+_T = TypeVar('_T')
+_Op = Callable[[Any, Any], Any]
+# binops whose identity is zero.
+_ZERO_IDENTITY = (add, xor, or_)
+
+
+def _unwrap(binop: Any,
+            inverse_binop: Optional[_Op]) -> Tuple[_Op, Optional[_Op], Any]:
+    """ Return the bare binop, its inverse and its identity (None when it
+    isn't known).
+    """
+    if isinstance(binop, Monoid):
+        return binop.binop, inverse_binop or binop.inverse, binop.identity
+    if any(binop is op for op in _ZERO_IDENTITY):
+        return binop, inverse_binop, 0
+    return binop, inverse_binop, None
+
+
+class SparseBIT(Generic[_T]):
+    """ Binary Indexed Tree over ``range(universe)`` storing only the
+    nodes that were updated.
+    """
+
+    binop: Callable[[_T, _T], _T]
+    inverse: Optional[Callable[[_T, _T], _T]]
+    # None once frozen.
+    _nodes: Optional[Dict[int, _T]]
+    _packed: List[_T]
+
+    def __init__(self,
+                 universe: int,
+                 binop: Callable[[_T, _T], _T] = add,
+                 inverse_binop: Optional[Callable[[_T, _T], _T]] = None):
+        """
+        Initialize an empty tree over ``range(universe)``, every value
+        being the identity of binop.
+
+        >>> from operator import sub
+        >>> b = SparseBIT(2 ** 40, add, sub)
+        >>> b.update(10 ** 12, 5)
+        >>> b.update(7, 3)
+        >>> b[10 ** 12 - 1], b[-1], b.range_sum(7, 10 ** 12)
+        (3, 8, 5)
+
+        ``binop`` can be a :class:`bit.monoid.Monoid`, whose identity is
+        then the value of untouched positions (and whose inverse is used
+        for a :class:`bit.monoid.Group`).
+
+        :complexity: :math:`O(1)`
+        :raises ValueError: If universe is negative.
+        """
+        if universe < 0:
+            raise ValueError("universe must not be negative.")
+        self.binop, self.inverse, self._identity = _unwrap(binop,
+                                                           inverse_binop)
+        self._universe = universe
+        self._nodes = {}
+        # sorted indices and nodes, once frozen.
+        self._keys = array('Q')
+        self._packed = []
+
+    def __repr__(self) -> str:
+        """ Return the universe and the stored nodes, by index.
+
+        >>> b = SparseBIT(100)
+        >>> b.update(5, 1)
+        >>> b
+        SparseBIT(100, {5: 1, 7: 1, 15: 1, 31: 1, 63: 1})
+
+        :complexity: :math:`O(k)` for `k` stored nodes.
+        """
+        nodes = self._nodes
+        if nodes is None:
+            nodes = dict(zip(self._keys, self._packed))
+        return "{0}({1}, {2!r})".format(type(self).__name__,
+                                        self._universe, nodes)
+
+    def __len__(self) -> int:
+        """ Return the size of the universe.
+
+        :complexity: :math:`O(1)`
+        """
+        return self._universe
+
+    @property
+    def frozen(self) -> bool:
+        """ Whether the nodes have been packed by ``SparseBIT.freeze``. """
+        return self._nodes is None
+
+    def __getitem__(self, index: Union[int, slice]) -> _T:
+        """ Prefix query until (including!) index, or ``range_sum`` for a
+        slice, like ``BIT.__getitem__``.
+
+        :complexity: :math:`O(\\log{}U)` where `U` is the size of the
+                     universe.
+        :raises IndexError: If index is out of bounds.
+        """
+        if isinstance(index, slice):
+            length = self._universe
+            start, end = index.start, index.stop
+            if start is None:
+                start = 0
+            else:
+                start = start + length if start < 0 else start
+            if end is None:
+                end = length - 1
+            else:
+                end = end + length if end < 0 else end
+            return self.range_sum(start, end)
+        return self.prefix_sum(index)
+
+    def __setitem__(self, index: int, value: _T) -> None:
+        """ Replace the value at index, requires ``inverse_binop``.
+
+        :complexity: :math:`O(\\log{}U)`
+        :raises IndexError: If index is out of bounds.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied or
+                           the tree is frozen.
+        """
+        old: _T = self.value_at(index)
+        self.update(index, self.inverse(value, old))  # type: ignore
+
+    def update(self, index: int, value: _T) -> None:
+        """ Apply value, with ``binop``, to the value at index, storing
+        the nodes it reaches for the first time.
+
+        :complexity: :math:`O(\\log{}U)` where `U` is the size of the
+                     universe.
+        :raises IndexError: If index is out of bounds.
+        :raises TypeError: If the tree is frozen.
+        """
+        nodes = self._nodes
+        if nodes is None:
+            raise TypeError("The tree is frozen, it can't be updated.")
+        index = BIT._nmlz_index(index, self._universe)
+        binop = self.binop
+        for i in BIT._f_zero_lsb(index, self._universe):
+            node = nodes.get(i)
+            nodes[i] = value if node is None else binop(node, value)
+
+    def prefix_sum(self, index: int) -> _T:
+        """ Return the prefix sum until (including!) index.
+
+        :complexity: :math:`O(\\log{}U)`, :math:`O(\\log{}U\\log{}k)` for
+                     `k` stored nodes once frozen.
+        :raises IndexError: If index is out of bounds.
+        :raises TypeError: If no node was ever stored in the prefix and
+                           the identity of binop isn't known.
+        """
+        index = BIT._nmlz_index(index, self._universe) + 1
+        binop, node_at = self.binop, self._node
+        acc: Optional[_T] = None
+        for idx in BIT._c_one_lsb(index):
+            node = node_at(idx - 1)
+            if node is not None:
+                acc = node if acc is None else binop(acc, node)
+        return self._or_identity(acc)
+
+    def range_sum(self, i: int = 0, j: Optional[int] = None) -> _T:
+        """ Return the sum of the values in ``(i, j]``, like
+        ``BIT.range_sum``, requires ``inverse_binop``.
+
+        :complexity: :math:`O(\\log{}U)`
+        :raises IndexError: If `i > j` or any of them is out of bounds.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        if j is None:
+            j = self._universe - 1
+        if j < i:
+            raise IndexError("j must be > than i.")
+        if not self.inverse:
+            msg = "Inverse operator required for range_sum. "
+            raise TypeError(msg)
+        return self.inverse(self.prefix_sum(j), self.prefix_sum(i))
+
+    def value_at(self, index: int) -> _T:
+        """ Return the value at index, requires ``inverse_binop``.
+
+        :complexity: :math:`O(\\log{}U)`
+        :raises IndexError: If index is out of bounds.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        index = BIT._nmlz_index(index, self._universe)
+        inverse = self.inverse
+        if not inverse:
+            msg = "Inverse Operator is required for value_at. "
+            raise TypeError(msg)
+        acc = self._node(index)
+        if acc is not None:
+            for step in BIT._c_zero_lsb(index + 1):
+                node = self._node(index - step)
+                if node is not None:
+                    acc = inverse(acc, node)
+        return self._or_identity(acc)
+
+    def freeze(self) -> None:
+        """ Pack the nodes in two sorted arrays, a fraction of the memory
+        of a dict. The tree can still be queried, but no longer updated.
+
+        >>> b = SparseBIT(2 ** 40)
+        >>> b.update(12345, 2)
+        >>> b.freeze()
+        >>> b.frozen, b[-1]
+        (True, 2)
+
+        :complexity: :math:`O(k\\log{}k)` for `k` stored nodes.
+        """
+        nodes = self._nodes
+        if nodes is None:
+            return
+        keys = sorted(nodes)
+        self._keys = array('Q', keys)
+        self._packed = [nodes[i] for i in keys]
+        self._nodes = None
+
+    def _node(self, index: int) -> Optional[_T]:
+        """ Return the node at index, None if it was never stored. """
+        nodes = self._nodes
+        if nodes is not None:
+            return nodes.get(index)
+        keys = self._keys
+        pos = bisect_left(keys, index)
+        if pos < len(keys) and keys[pos] == index:
+            return self._packed[pos]
+        return None
+
+    def _or_identity(self, acc: Optional[_T]) -> _T:
+        """ Return acc, or the identity if nothing was combined into it. """
+        if acc is not None:
+            return acc
+        if self._identity is None:
+            msg = "Untouched positions require the identity of binop. "
+            raise TypeError(msg)
+        return self._identity  # type: ignore
+
+
+class CompressedBIT(Generic[_T]):
+    """ Binary Indexed Tree over a known set of sparse keys, mapped to the
+    indices of a dense :class:`bit.BIT`.
+    """
+
+    _keys: List[Any]
+    _tree: BIT[_T]
+
+    def __init__(self,
+                 items: Union[Mapping[int, _T], Iterable[Tuple[int, _T]]],
+                 binop: Callable[[_T, _T], _T] = add,
+                 inverse_binop: Optional[Callable[[_T, _T], _T]] = None):
+        """
+        Coordinate-compress the keys of items, a mapping or an iterable of
+        ``(key, value)`` pairs, and build a tree over their values (values
+        of a repeated key are combined with binop).
+
+        >>> from operator import sub
+        >>> b = CompressedBIT({10 ** 12: 5, 7: 3, 2 ** 40: 1}, add, sub)
+        >>> b.keys
+        [7, 1000000000000, 1099511627776]
+        >>> b[10 ** 12], b[10 ** 12 - 1], b.range_sum(7, 2 ** 40)
+        (8, 3, 6)
+
+        Keys only need to be comparable. Updates are limited to the keys
+        given here, queries take any key.
+
+        :complexity: :math:`O(n\\log{}n)` where `n` is the number of
+                     items.
+        """
+        binop, inverse, self._identity = _unwrap(binop, inverse_binop)
+        pairs = items.items() if isinstance(items, Mapping) else items
+        merged: Dict[Any, _T] = {}
+        for key, value in pairs:
+            old = merged.get(key)
+            merged[key] = value if old is None else binop(old, value)
+        self._keys = sorted(merged)
+        values = [merged[key] for key in self._keys]
+        self._tree = BIT(values, binop, inverse)
+
+    def __repr__(self) -> str:
+        """ Return the keys and their values.
+
+        :complexity: :math:`O(n)`, requires ``inverse_binop``.
+        """
+        values = self._tree.original_layout()
+        return "{0}({1!r})".format(type(self).__name__,
+                                   dict(zip(self._keys, values)))
+
+    def __len__(self) -> int:
+        """ Return the number of keys.
+
+        :complexity: :math:`O(1)`
+        """
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        """ Return whether key is one of the keys.
+
+        :complexity: :math:`O(\\log{}n)`
+        """
+        try:
+            self._index(key)
+        except KeyError:
+            return False
+        return True
+
+    @property
+    def keys(self) -> List[Any]:
+        """ The keys, sorted. """
+        return self._keys
+
+    @property
+    def tree(self) -> BIT[_T]:
+        """ The dense tree, its index ``i`` holds key ``keys[i]``. """
+        return self._tree
+
+    def __getitem__(self, key: Any) -> _T:
+        """ Shorthand for ``CompressedBIT.prefix_sum(key)``. """
+        return self.prefix_sum(key)
+
+    def __setitem__(self, key: Any, value: _T) -> None:
+        """ Replace the value of key, requires ``inverse_binop``.
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises KeyError: If key isn't one of the keys.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        self._tree[self._index(key)] = value
+
+    def update(self, key: Any, value: _T) -> None:
+        """ Apply value, with ``binop``, to the value of key.
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises KeyError: If key isn't one of the keys.
+        """
+        self._tree.update(self._index(key), value)
+
+    def value_at(self, key: Any) -> _T:
+        """ Return the value of key, requires ``inverse_binop``.
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises KeyError: If key isn't one of the keys.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        return self._tree.value_at(self._index(key))
+
+    def prefix_sum(self, key: Any) -> _T:
+        """ Return the sum of the values of the keys up to (including!)
+        key, which doesn't need to be one of the keys.
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises TypeError: If key is below every key and the identity of
+                           binop isn't known.
+        """
+        index = bisect_right(self._keys, key) - 1
+        if index >= 0:
+            return self._tree.prefix_sum(index)
+        if self._identity is None:
+            msg = "An empty prefix requires the identity of binop. "
+            raise TypeError(msg)
+        return self._identity  # type: ignore
+
+    def range_sum(self, lo: Any, hi: Any) -> _T:
+        """ Return the sum of the values of the keys in ``(lo, hi]``,
+        requires ``inverse_binop``.
+
+        :complexity: :math:`O(\\log{}n)`
+        :raises IndexError: If `lo > hi`.
+        :raises TypeError: If ``inverse_binop`` hasn't been supplied.
+        """
+        if hi < lo:
+            raise IndexError("hi must be >= than lo.")
+        inverse = self._tree.inverse
+        if not inverse:
+            msg = "Inverse operator required for range_sum. "
+            raise TypeError(msg)
+        return inverse(self.prefix_sum(hi), self.prefix_sum(lo))
+
+    def _index(self, key: Any) -> int:
+        """ Return the index of key in the dense tree. """
+        keys = self._keys
+        index = bisect_left(keys, key)
+        if index == len(keys) or keys[index] != key:
+            raise KeyError(key)
+        return index
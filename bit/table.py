@@ -0,0 +1,97 @@
+"""Sparse table over a frozen sequence of values.
+
+Row ``k`` of the table holds the ``binop`` of every run of ``2^k``
+consecutive values. Any range is covered by two, possibly overlapping,
+runs of the same length, which only gives the right answer when
+combining a value twice doesn't change the result: ``binop`` must be
+idempotent (``min``, ``max``, ``|``, ``&``, set union, ...). Answers
+then take a single ``binop`` instead of :math:`O(\\log{}n)`, in exchange
+for :math:`O(n\\log{}n)` memory and no updates.
+"""
+from typing import Generic, Iterable, List, Optional, TypeVar
+
+from .monoid import Monoid
+
+_T = TypeVar('_T')
+
+
+class SparseTable(Generic[_T]):
+    """ Read only range queries over an idempotent monoid. """
+
+    def __init__(self, iterable: Iterable[_T], monoid: Monoid):
+        """
+        Build the table for the values of iterable.
+
+        >>> from bit.monoid import MAX
+        >>> t = SparseTable([5, 1, 4, 2, 3], MAX)
+        >>> t.range_sum(1, 3), t[2]
+        (4, 5)
+
+        :complexity: :math:`O(n\\log{}n)` where `n` is the number of
+                     items in the iterable.
+        :raises TypeError: If monoid isn't idempotent.
+        """
+        if not monoid.idempotent:
+            msg = "SparseTable requires an idempotent monoid, got {0!r}."
+            raise TypeError(msg.format(monoid))
+        binop = monoid.binop
+        rows: List[List[_T]] = [list(iterable)]
+        width = 1
+        while 2 * width <= len(rows[0]):
+            prev = rows[-1]
+            # runs of 2 * width, from two neighbouring runs of width.
+            rows.append(list(map(binop, prev, prev[width:])))
+            width *= 2
+        self._rows = rows
+        self.monoid = monoid
+
+    def __len__(self) -> int:
+        """ Return the number of values.
+
+        :complexity: :math:`O(1)`
+        """
+        return len(self._rows[0])
+
+    def __getitem__(self, index: int) -> _T:
+        """ Return the prefix sum until (including!) index, like
+        ``BIT.prefix_sum``.
+
+        :complexity: :math:`O(1)`
+        :raises IndexError: If index is out of bounds.
+        """
+        index = index + len(self) if index < 0 else index
+        if not 0 <= index < len(self):
+            raise IndexError("Index out of range.")
+        return self._query(0, index)
+
+    def range_sum(self, i: int = 0, j: Optional[int] = None) -> _T:
+        """ Return the sum of the values in ``(i, j]``, like
+        ``BIT.range_sum``. An empty range sums to the identity.
+
+        >>> from bit.monoid import MIN
+        >>> SparseTable([5, 1, 4, 2, 3], MIN).range_sum(2, 4)
+        2
+
+        :complexity: :math:`O(1)`
+        :raises IndexError: If `i > j` or any of them is out of bounds.
+        """
+        length = len(self)
+        if j is None:
+            j = length - 1
+        if j < i:
+            raise IndexError("j must be > than i.")
+        if i < 0 or j >= length:
+            raise IndexError("Index out of range.")
+        if i == j:
+            identity: _T = self.monoid.identity
+            return identity
+        return self._query(i + 1, j)
+
+    def _query(self, lo: int, hi: int) -> _T:
+        """ Combine the values in ``[lo, hi]``, from the two runs of the
+        largest power of two that fits.
+        """
+        k = (hi - lo + 1).bit_length() - 1
+        row = self._rows[k]
+        value: _T = self.monoid.binop(row[lo], row[hi - (1 << k) + 1])
+        return value
@@ -0,0 +1,7 @@
+import sys
+
+# multiprocessing.shared_memory is only available from Python 3.8, don't
+# collect the doctests of the modules importing it on older versions.
+collect_ignore = []
+if sys.version_info < (3, 8):
+    collect_ignore += ['bit/parallel.py', 'bit/shared.py']
@@ -6,6 +6,7 @@ with open('README.md') as readme_file:
     readme = readme_file.read()
 
 requirements = []
+extra_requirements = {'numpy': ['numpy']}
 setup_requirements = ['pytest-runner', ]
 test_requirements = ['pytest>=3', ]
 
@@ -24,6 +25,7 @@ setup(
     ],
     description="Binary Indexed Tree.",
     install_requires=requirements,
+    extras_require=extra_requirements,
     long_description=readme + '\n\n',
     include_package_data=True,
     keywords='bit',
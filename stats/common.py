@@ -6,11 +6,19 @@ OPS = [
     # -- O(N) --
     'create',   # plot ok, easy O(N)
     'layout',   # plot ok, easy O(N)
+    'iter',     # prefix sums, O(N).
+    'insert',   # O(N - i). DynamicBIT series, O(logN).
+    'pop',      # O(N - i).
     # -- O(logN) --
     'append',   # plot ok, logN
     'getitem',  # plot ok, logN.
     'setitem',  # plot ok, logN
     'update',   # plot ok, logN.
+    'select',   # FenwickMultiset, logU.
+    'threads',  # ConcurrentBIT prefix sums, logN, per reader thread.
+    'rmq',      # RangeQueryBIT assign + range min, log^2N.
+    'assign',   # SegmentTree range assign + range sum, logN.
+    'extend',   # extend by N values, O(N). append and concat series.
 ]
 # IMPORT just imports needed objects.
 # IMPORT_INIT also initializes a BIT.
@@ -19,6 +27,22 @@ from bit import BIT
 from operator import add, sub
 """
 IMPORT_INIT = "\n".join([IMPORT, "b = BIT(range({0}), add, sub)"])
+# Same as above, for the NumPy backed tree.
+IMPORT_NP = """
+from bit import NumpyBIT
+import numpy as np
+"""
+IMPORT_NP_INIT = "\n".join([
+    IMPORT_NP, "b = NumpyBIT(np.arange({0}), np.add, np.subtract)"
+])
+# Same as above, for the tree specialized for add.
+IMPORT_ADD_INIT = """
+from bit.fast import AddBIT
+b = AddBIT(range({0}))
+"""
+# Benchmarks for alternative implementations are named
+# '<series>-<size>', plain '<size>' is the BIT baseline.
+SERIES_FMT = "{0}-{1}"
 # Relative to top level.
 RESULTS_PATH = 'stats/results/'
 PLOTS_PATH = 'stats/plots/'
@@ -26,6 +50,7 @@ RES_FMT = f"{RESULTS_PATH}{{0}}.json"
 
 __all__ = [
     'SIZES', 'OPS', 'IMPORT',
-    'IMPORT_INIT', 'RESULTS_PATH',
+    'IMPORT_INIT', 'IMPORT_NP', 'IMPORT_NP_INIT', 'IMPORT_ADD_INIT',
+    'SERIES_FMT', 'RESULTS_PATH',
     'RES_FMT', 'PLOTS_PATH'
 ]
@@ -0,0 +1,36 @@
+""" Perf for assigning a value to a range and querying a range sum. Should
+show O(logN) for SegmentTree, against assigning the values and rebuilding
+the BIT, O(N).
+"""
+from common import SIZES, SERIES_FMT
+import pyperf
+
+SETUP = """
+from bit import BIT, SegmentTree
+from operator import add, sub
+values = list(range({0}))
+b = BIT(values, add, sub)
+t = SegmentTree(values, add)
+"""
+# assign the middle half, query a range overlapping it.
+STMTS = {
+    '': "t.assign_range({0}, {1}, 1); t.range_query({2}, {3})",
+    'rebuild': ("values[{0}:{1} + 1] = [1] * ({1} - {0} + 1); "
+                "b = BIT(values, add, sub); b.range_sum({2}, {3})"),
+}
+
+
+def perf_assign():
+    runner = pyperf.Runner()
+    for size in SIZES:
+        lo, hi = size // 4, size - 1 - size // 4
+        for name, stmt in STMTS.items():
+            runner.timeit(
+                SERIES_FMT.format(name, size) if name else str(size),
+                stmt=stmt.format(lo, hi, 0, size // 2),
+                setup=SETUP.format(size)
+            )
+
+
+if __name__ == "__main__":
+    perf_assign()
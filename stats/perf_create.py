@@ -1,10 +1,16 @@
 """ Perf for creating the BIT structure, should show O(N). """
-from common import SIZES, IMPORT
+from common import SIZES, IMPORT, IMPORT_NP, SERIES_FMT
 import pyperf
 
+WORKERS = [2, 4, 8]
+
 
 def perf_create():
-    """ Basically testing bit_layout. """
+    """ Basically testing bit_layout. The NumPy backed tree builds
+    level by level, one vectorized pass per power of two. The
+    'workers<k>' series build with BIT.build_parallel in k processes,
+    sizes below bit.parallel.MIN_BLOCK are built in process.
+    """
     runner = pyperf.Runner()
     for size in SIZES:
         runner.timeit(
@@ -12,6 +18,18 @@ def perf_create():
             stmt="BIT(range({0}), add, sub)".format(size),
             setup=IMPORT
         )
+        runner.timeit(
+            SERIES_FMT.format('numpy', size),
+            stmt="NumpyBIT(arr, np.add, np.subtract)",
+            setup="\n".join([IMPORT_NP, "arr = np.arange({0})".format(size)])
+        )
+        for workers in WORKERS:
+            runner.timeit(
+                SERIES_FMT.format("workers{0}".format(workers), size),
+                stmt="BIT.build_parallel(range({0}), add, sub, "
+                     "workers={1})".format(size, workers),
+                setup=IMPORT
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,36 @@
+""" Perf for extending a BIT by as many values as it holds. Should show
+O(k + logN) for extend, O(klogN) for the 'append' series appending the
+values one at a time, and O(k / a + logN) for the 'concat' series
+extending with a BIT of the values (a = N here, sizes are powers of 2).
+"""
+from common import SIZES, SERIES_FMT
+import pyperf
+
+SETUP = """
+from bit import BIT
+from operator import add, sub
+b = BIT(range({0}), add, sub)
+values = list(range({0}))
+other = BIT(values, add, sub)
+"""
+# nodes before the old length never change, truncating them restores b.
+STMTS = {
+    '': "b.extend(values); del b._st[{0}:]",
+    'append': "for v in values: b.append(v)\ndel b._st[{0}:]",
+    'concat': "b.extend(other); del b._st[{0}:]",
+}
+
+
+def perf_extend():
+    runner = pyperf.Runner()
+    for size in SIZES:
+        for name, stmt in STMTS.items():
+            runner.timeit(
+                SERIES_FMT.format(name, size) if name else str(size),
+                stmt=stmt.format(size),
+                setup=SETUP.format(size)
+            )
+
+
+if __name__ == "__main__":
+    perf_extend()
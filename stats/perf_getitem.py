@@ -1,5 +1,5 @@
 """ Perf for __getitem__ on BIT structure. Should show O(logn). """
-from common import SIZES, IMPORT_INIT
+from common import SIZES, IMPORT_INIT, IMPORT_ADD_INIT, SERIES_FMT
 import pyperf
 
 
@@ -13,6 +13,9 @@ def perf_getitem():
     *including* a given index, so it adds one to the index passed
     in. (pow_of_2 - 2 + 1 => pow_of_2 - 1 => '1' * log(pow_of_2)
     representation)
+
+    The 'add' series indexes a bit.fast.AddBIT, 'unchecked' calls its
+    prefix_sum_unchecked.
     """
     runner = pyperf.Runner()
     for size in SIZES:
@@ -21,6 +24,16 @@ def perf_getitem():
             stmt="b[{0}]".format(size-2),
             setup=IMPORT_INIT.format(size)
         )
+        runner.timeit(
+            SERIES_FMT.format('add', size),
+            stmt="b[{0}]".format(size-2),
+            setup=IMPORT_ADD_INIT.format(size)
+        )
+        runner.timeit(
+            SERIES_FMT.format('unchecked', size),
+            stmt="b.prefix_sum_unchecked({0})".format(size-2),
+            setup=IMPORT_ADD_INIT.format(size)
+        )
 
 
 if __name__ == "__main__":
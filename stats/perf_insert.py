@@ -0,0 +1,40 @@
+""" Perf for insert at different positions. BIT only rebuilds the nodes
+from the insert position onwards, O(N - i), while DynamicBIT only shifts
+the values of one block.
+"""
+from common import SIZES, IMPORT_INIT, SERIES_FMT
+import pyperf
+
+IMPORT_DYNAMIC_INIT = """
+from bit import DynamicBIT
+from operator import add, sub
+b = DynamicBIT(range({0}), add, sub)
+"""
+
+
+def positions(size):
+    """ Insert positions benchmarked, the middle is the baseline. """
+    return {'front': 0, '': size // 2, 'back': size - 1}
+
+
+def perf_insert():
+    """ Insert and pop the last value again so the size stays fixed
+    across loops, popping the end is O(logn).
+    """
+    runner = pyperf.Runner()
+    for size in SIZES:
+        for name, index in positions(size).items():
+            runner.timeit(
+                SERIES_FMT.format(name, size) if name else str(size),
+                stmt="b.insert({0}, 1); b.pop()".format(index),
+                setup=IMPORT_INIT.format(size)
+            )
+        runner.timeit(
+            SERIES_FMT.format('dynamic', size),
+            stmt="b.insert({0}, 1); b.pop()".format(size // 2),
+            setup=IMPORT_DYNAMIC_INIT.format(size)
+        )
+
+
+if __name__ == "__main__":
+    perf_insert()
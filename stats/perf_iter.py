@@ -0,0 +1,18 @@
+""" Perf for __iter__ on BIT structure. Should show O(N). """
+from common import SIZES, IMPORT_INIT
+import pyperf
+
+
+def perf_iter():
+    """ Materialize every prefix sum with list(b). """
+    runner = pyperf.Runner()
+    for size in SIZES:
+        runner.timeit(
+            "{0}".format(size),
+            stmt="list(b)",
+            setup=IMPORT_INIT.format(size)
+        )
+
+
+if __name__ == "__main__":
+    perf_iter()
@@ -1,5 +1,5 @@
 """ Perf file for translating to original layout. Should show O(N). """
-from common import SIZES, IMPORT_INIT
+from common import SIZES, IMPORT_INIT, IMPORT_NP_INIT, SERIES_FMT
 import pyperf
 
 
@@ -14,6 +14,11 @@ def perf_olayout():
             stmt="b.original_layout()",
             setup=IMPORT_INIT.format(size)
         )
+        runner.timeit(
+            SERIES_FMT.format('numpy', size),
+            stmt="b.original_layout()",
+            setup=IMPORT_NP_INIT.format(size)
+        )
 
 
 if __name__ == "__main__":
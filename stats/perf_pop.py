@@ -0,0 +1,24 @@
+""" Perf for pop at different positions, BIT only rebuilds the nodes
+from the popped position onwards, O(N - i).
+"""
+from common import SIZES, IMPORT_INIT, SERIES_FMT
+from perf_insert import positions
+import pyperf
+
+
+def perf_pop():
+    """ Pop and append a value again so the size stays fixed across
+    loops, appending is O(logn).
+    """
+    runner = pyperf.Runner()
+    for size in SIZES:
+        for name, index in positions(size).items():
+            runner.timeit(
+                SERIES_FMT.format(name, size) if name else str(size),
+                stmt="b.pop({0}); b.append(1)".format(index),
+                setup=IMPORT_INIT.format(size)
+            )
+
+
+if __name__ == "__main__":
+    perf_pop()
@@ -0,0 +1,35 @@
+""" Perf for assigning a value and querying a range minimum. Should show
+O(log^2N) for RangeQueryBIT, against rebuilding a SparseTable after the
+assignment, O(NlogN), and scanning the range, O(N).
+"""
+from common import SIZES, SERIES_FMT
+import pyperf
+
+SETUP = """
+from bit import RangeQueryBIT, SparseTable
+from bit.monoid import MIN
+values = list(range({0}, 0, -1))
+b = RangeQueryBIT(values, MIN)
+"""
+# assign the middle value, query a range around it.
+STMTS = {
+    '': "b[{0}] = 1; b.range_query({1}, {2})",
+    'rebuild': "values[{0}] = 1; SparseTable(values, MIN).range_sum({1}, {2})",
+    'scan': "values[{0}] = 1; min(values[{1}:{2} + 1])",
+}
+
+
+def perf_rmq():
+    runner = pyperf.Runner()
+    for size in SIZES:
+        mid = size // 2
+        for name, stmt in STMTS.items():
+            runner.timeit(
+                SERIES_FMT.format(name, size) if name else str(size),
+                stmt=stmt.format(mid, size // 4, size - 1 - size // 4),
+                setup=SETUP.format(size)
+            )
+
+
+if __name__ == "__main__":
+    perf_rmq()
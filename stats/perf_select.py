@@ -0,0 +1,27 @@
+""" Perf for select (k-th smallest) on FenwickMultiset, should show
+O(logn) in the size of the universe.
+"""
+from common import SIZES
+import pyperf
+
+IMPORT_MULTISET = """
+from bit import FenwickMultiset
+m = FenwickMultiset({0}, range({0}))
+"""
+
+
+def perf_select():
+    """ Every value is held once, selecting the last value walks
+    every level of the tree.
+    """
+    runner = pyperf.Runner()
+    for size in SIZES:
+        runner.timeit(
+            "{0}".format(size),
+            stmt="m.select({0})".format(size - 1),
+            setup=IMPORT_MULTISET.format(size)
+        )
+
+
+if __name__ == "__main__":
+    perf_select()
@@ -1,10 +1,12 @@
 """ Perf for setitem on BIT structure, should show O(logn). """
-from common import SIZES, IMPORT_INIT
+from common import SIZES, IMPORT_INIT, IMPORT_ADD_INIT, SERIES_FMT
 import pyperf
 
 
 def perf_setitem():
-    """ Worse position coincides with worse position for update. """
+    """ Worse position coincides with worse position for update. The
+    'add' series sets an item of a bit.fast.AddBIT.
+    """
     runner = pyperf.Runner()
     for size in SIZES:
         runner.timeit(
@@ -12,6 +14,11 @@ def perf_setitem():
             stmt="b[0] = 0",
             setup=IMPORT_INIT.format(size)
         )
+        runner.timeit(
+            SERIES_FMT.format('add', size),
+            stmt="b[0] = 0",
+            setup=IMPORT_ADD_INIT.format(size)
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+""" Perf for prefix sums served from several threads while another
+thread keeps updating a ConcurrentBIT. Should show O(logN), each reader
+runs the same number of queries so flat series mean reads scale with the
+number of threads. The 'bit' series times the same queries on a plain
+BIT from a single thread, the cost of the read protocol.
+"""
+from operator import add, sub
+from threading import Event, Thread
+from time import perf_counter
+from common import SIZES, SERIES_FMT
+from bit import BIT, ConcurrentBIT
+import pyperf
+
+READERS = [1, 2, 4]
+
+
+def query(b, loops):
+    """ Query every prefix sum, in a stride that visits them all. """
+    size = len(b)
+    for k in range(loops):
+        b.prefix_sum(k * 7919 % size)
+
+
+def write(b, stop):
+    """ Keep updating until told to stop. """
+    size, k = len(b), 0
+    while not stop.is_set():
+        b.update(k % size, 1)
+        k += 7
+
+
+def time_threads(loops, size, readers):
+    """ Time readers threads running loops queries each, alongside a
+    writer.
+    """
+    b, stop = ConcurrentBIT(range(size), add, sub), Event()
+    writer = Thread(target=write, args=(b, stop))
+    threads = [Thread(target=query, args=(b, loops)) for _ in range(readers)]
+    writer.start()
+    start = perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = perf_counter() - start
+    stop.set()
+    writer.join()
+    return elapsed
+
+
+def time_plain(loops, size):
+    """ The same queries on a plain BIT, no threads. """
+    b = BIT(range(size), add, sub)
+    start = perf_counter()
+    query(b, loops)
+    return perf_counter() - start
+
+
+def perf_threads():
+    runner = pyperf.Runner()
+    for size in SIZES:
+        for readers in READERS:
+            name = SERIES_FMT.format("readers{0}".format(readers), size)
+            if readers == 1:
+                name = str(size)
+            runner.bench_time_func(name, time_threads, size, readers)
+        runner.bench_time_func(
+            SERIES_FMT.format('bit', size), time_plain, size
+        )
+
+
+if __name__ == "__main__":
+    perf_threads()
@@ -1,5 +1,5 @@
 """ Perf for update on BIT structure, should show O(logn). """
-from common import SIZES, IMPORT_INIT
+from common import SIZES, IMPORT_INIT, IMPORT_ADD_INIT, SERIES_FMT
 import pyperf
 
 
@@ -7,6 +7,9 @@ def perf_update():
     """ Worse position to place new index is 0. This triggers
     a re-adjustment of the most consequent values.
     (see _follow_left in BIT for why.)
+
+    The 'add' series updates a bit.fast.AddBIT, 'unchecked' calls its
+    update_unchecked.
     """
     runner = pyperf.Runner()
     for size in SIZES:
@@ -16,6 +19,16 @@ def perf_update():
             stmt="b.update(0, 0)",
             setup=IMPORT_INIT.format(size)
         )
+        runner.timeit(
+            SERIES_FMT.format('add', size),
+            stmt="b.update(0, 0)",
+            setup=IMPORT_ADD_INIT.format(size)
+        )
+        runner.timeit(
+            SERIES_FMT.format('unchecked', size),
+            stmt="b.update_unchecked(0, 0)",
+            setup=IMPORT_ADD_INIT.format(size)
+        )
 
 
 if __name__ == "__main__":
@@ -8,12 +8,23 @@ def get_benchmark(op):
     return BenchmarkSuite.load(RES_FMT.format(op))
 
 
+def split_series(op, benches):
+    """ Group benchmarks named '<series>-<size>' by series, plain
+    '<size>' benchmarks are grouped under op.
+    """
+    series = {}
+    for b in benches:
+        label, _, size = b.get_name().rpartition('-')
+        sizes, time = series.setdefault(label or op, ([], []))
+        sizes.append(int(size))
+        time.append(b.mean())
+    return series
+
+
 def plot_single(op, benches):
-    sizes = [int(b.get_name()) for b in benches]
-    time = [b.mean() for b in benches]
-    
     figure, axes = plt.subplots()  # Create a figure and an axes.
-    axes.plot(sizes, time, label=f'{op}')  # Plot some data on the axes.
+    for label, (sizes, time) in split_series(op, benches).items():
+        axes.plot(sizes, time, label=label)  # Plot some data on the axes.
     axes.set_xlabel('Size')  # Add an x-label to the axes.
     axes.set_ylabel('Time')  # Add a y-label to the axes.
     axes.set_title("")  # Add a title to the axes.
@@ -151,11 +151,12 @@ multiset_add = Counter.__add__
 multiset_sub = Counter.__sub__
 
 
-def bit_dummy(lst, binop, inverse):
+def bit_dummy(lst, binop, inverse, keep_values=False):
     """ Create instances of BIT and dummy version with given list,
     binary op and inverse binary op.
     """
-    return BIT(lst, binop, inverse), DummyPS(lst, binop, inverse)
+    return (BIT(lst, binop, inverse, keep_values),
+            DummyPS(lst, binop, inverse))
 
 
 __all__ = [
@@ -0,0 +1,70 @@
+import pytest
+from random import randint
+from support import rand_int_list, int_add, int_sub, int_xor
+from bit import BIT2D
+
+SHAPES = [(1, 1), (1, 7), (5, 1), (8, 8), (13, 29),
+          (randint(1, 40), randint(1, 40))]
+
+
+def rand_grid(rows, cols):
+    return [rand_int_list(cols) for _ in range(rows)]
+
+
+def brute(grid, r0, c0, r1, c1, op):
+    total = None
+    for row in grid[r0:r1 + 1]:
+        for value in row[c0:c1 + 1]:
+            total = value if total is None else op(total, value)
+    return total
+
+
+@pytest.mark.parametrize('shape', SHAPES)
+@pytest.mark.parametrize('bf, ibf', [(int_add, int_sub), (int_xor, int_xor)])
+def test_bit2d(shape, bf, ibf):
+    rows, cols = shape
+    grid = rand_grid(rows, cols)
+    b = BIT2D(grid, bf, ibf)
+    assert b.original_layout() == grid
+
+    for _ in range(50):
+        r, c = randint(-rows, rows - 1), randint(-cols, cols - 1)
+        value = randint(0, 1000)
+        if randint(0, 1):
+            b.update(r, c, value)
+            grid[r][c] = bf(grid[r][c], value)
+        else:
+            b[r, c] = value
+            grid[r][c] = value
+
+        r, c = randint(0, rows - 1), randint(0, cols - 1)
+        assert b[r, c] == b.prefix_sum(r, c) == brute(grid, 0, 0, r, c, bf)
+        r0, c0 = randint(0, rows - 1), randint(0, cols - 1)
+        r1, c1 = randint(r0, rows - 1), randint(c0, cols - 1)
+        assert b.rect_sum(r0, c0, r1, c1) == brute(grid, r0, c0, r1, c1, bf)
+    assert b.original_layout() == grid
+
+    rects = []
+    for _ in range(30):
+        r0, c0 = randint(0, rows - 1), randint(0, cols - 1)
+        rects.append((r0, c0, randint(r0, rows - 1), randint(c0, cols - 1)))
+    assert b.rect_sums(rects) == [brute(grid, *rect, bf) for rect in rects]
+    points = [(randint(0, rows - 1), randint(0, cols - 1)) for _ in range(30)]
+    assert b.prefix_sums(points) == [
+        brute(grid, 0, 0, r, c, bf) for r, c in points
+    ]
+
+
+def test_errors():
+    b = BIT2D(rand_grid(3, 4))
+    with pytest.raises(IndexError):
+        b.prefix_sum(3, 0)
+    with pytest.raises(IndexError):
+        b.update(0, 4, 1)
+    with pytest.raises(TypeError):
+        b.rect_sum(0, 0, 1, 1)
+    with pytest.raises(ValueError):
+        BIT2D([[1, 2], [3]])
+    with pytest.raises(IndexError):
+        BIT2D(rand_grid(3, 4), int_add, int_sub).rect_sum(2, 0, 1, 1)
+    assert BIT2D().shape == (0, 0)
@@ -0,0 +1,84 @@
+import pytest
+from itertools import product
+from random import randint
+from support import rand_int_list, int_add, int_sub, int_xor
+from bit import BITND
+
+SHAPES = [(1,), (13,), (4, 7), (1, 1, 1), (3, 5, 2), (2, 3, 4, 5),
+          tuple(randint(1, 6) for _ in range(3))]
+
+
+def nest(flat, shape):
+    for n in reversed(shape[1:]):
+        flat = [flat[k:k + n] for k in range(0, len(flat), n)]
+    return flat
+
+
+def brute(values, lo, hi, op):
+    total = None
+    for point in product(*(range(a, b + 1) for a, b in zip(lo, hi))):
+        value = values[point]
+        total = value if total is None else op(total, value)
+    return total
+
+
+def rand_point(shape, low=None):
+    low = low or [0] * len(shape)
+    return tuple(randint(a, n - 1) for a, n in zip(low, shape))
+
+
+@pytest.mark.parametrize('shape', SHAPES)
+@pytest.mark.parametrize('bf, ibf', [(int_add, int_sub), (int_xor, int_xor)])
+@pytest.mark.parametrize('typecode', [None, 'q'])
+def test_bitnd(shape, bf, ibf, typecode):
+    size = 1
+    for n in shape:
+        size *= n
+    flat = rand_int_list(size)
+    points = list(product(*(range(n) for n in shape)))
+    values = dict(zip(points, flat))
+    b = BITND(shape, bf, ibf, nest(flat, shape), typecode)
+    assert b.original_layout() == nest(flat, shape)
+    assert BITND(shape, bf, ibf, flat, typecode)._st == b._st
+    assert len(b) == size and b.ndim == len(shape) and b.shape == shape
+
+    origin = [0] * len(shape)
+    for _ in range(50):
+        point = rand_point(shape)
+        value = randint(0, 1000)
+        if randint(0, 1):
+            b.update(point, value)
+            values[point] = bf(values[point], value)
+        else:
+            b[point] = value
+            values[point] = value
+
+        point = rand_point(shape)
+        assert b[point] == brute(values, origin, point, bf)
+        lo = rand_point(shape)
+        hi = rand_point(shape, lo)
+        assert b.rect_sum(lo, hi) == brute(values, lo, hi, bf)
+    assert b.original_layout() == nest([values[p] for p in points], shape)
+
+
+def test_errors():
+    b = BITND((3, 4, 2))
+    with pytest.raises(IndexError):
+        b.prefix_sum((3, 0, 0))
+    with pytest.raises(IndexError):
+        b.update((0, 0), 1)
+    with pytest.raises(TypeError):
+        b.rect_sum((0, 0, 0), (1, 1, 1))
+    with pytest.raises(TypeError):
+        b.original_layout()
+    with pytest.raises(ValueError):
+        BITND((2, 2), iterable=[1, 2, 3])
+    with pytest.raises(ValueError):
+        BITND((2, 2), iterable=[[1, 2], [3]])
+    with pytest.raises(IndexError):
+        BITND((3, 3), int_add, int_sub).rect_sum((2, 0), (1, 1))
+    assert b[-1, -1, -1] == 0 and b.shape == (3, 4, 2)
+    # a tree of fill values is laid out without calling binop.
+    calls = []
+    BITND((4, 4), lambda x, y: calls.append(x) or x + y)
+    assert not calls
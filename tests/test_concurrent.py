@@ -0,0 +1,141 @@
+import pickle
+import sys
+import pytest
+from operator import add, sub
+from random import Random, randint
+from threading import Thread
+from support import DummyPS, intensities, rand_int_list as gl
+from bit import BIT, ConcurrentBIT
+
+INTENSITY = 'quick'
+
+
+@pytest.fixture
+def switchy():
+    # switch threads as often as possible to provoke torn reads.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_operations():
+    for length in intensities[INTENSITY]:
+        lst = gl(length)
+        b, dummy = ConcurrentBIT(lst, add, sub), DummyPS(lst, add, sub)
+        for value in gl(50):
+            op = randint(0, 4)
+            if op == 0:
+                index = randint(-len(dummy), len(dummy))
+                b.insert(index, value)
+                dummy.insert(index, value)
+            elif op == 1 and len(dummy):
+                index = randint(-len(dummy), len(dummy) - 1)
+                assert b.pop(index) == dummy.pop(index)
+            elif op == 2 and len(dummy):
+                index = randint(-len(dummy), len(dummy) - 1)
+                b[index] = value
+                dummy[index] = value
+            elif op == 3:
+                b.extend([value, value])
+                dummy.extend([value, value])
+            elif len(dummy):
+                i = randint(0, len(dummy) - 1)
+                j = randint(i, len(dummy) - 1)
+                assert b[i] == dummy[i]
+                assert b.range_sum(i, j) == dummy.range_sum(i, j)
+        assert b.original_layout() == dummy.storage
+        assert list(b) == [dummy[i] for i in range(len(dummy))]
+        assert list(reversed(b)) == list(b)[::-1]
+        # nested writes leave the sequence number even.
+        assert not b._seq & 1
+
+
+def test_retry():
+    b = ConcurrentBIT(range(10), add, sub)
+    writes = []
+
+    def binop(x, y):
+        # the first combine of the read lets another thread write.
+        if not writes:
+            writes.append(Thread(target=b.update, args=(0, 100)))
+            writes[0].start()
+            writes[0].join()
+        return x + y
+
+    b.binop = binop
+    assert b[9] == 145
+    assert b._seq == 2
+
+
+def test_errors():
+    b = ConcurrentBIT(range(10))
+    with pytest.raises(IndexError):
+        b[10]
+    with pytest.raises(TypeError):
+        b[0] = 1
+    # the lock is released after a failed write.
+    assert not b._seq & 1
+    b.update(0, 1)
+    assert b[9] == 46
+
+
+def test_snapshot_pickle():
+    b = ConcurrentBIT(range(10), add, sub, keep_values=True)
+    snap = b.snapshot()
+    b[0] = 10
+    assert type(snap) is BIT
+    assert snap.original_layout() == list(range(10))
+    restored = pickle.loads(pickle.dumps(b))
+    assert type(restored) is ConcurrentBIT
+    assert restored.original_layout() == b.original_layout()
+    restored.update(1, 1)
+    assert restored[9] == 56
+
+    loaded = ConcurrentBIT.from_buffer(bytearray(BIT(range(10)).to_bytes()))
+    loaded.update(0, 1)
+    assert type(loaded) is ConcurrentBIT and loaded[9] == 46
+
+
+@pytest.mark.parametrize('typecode', [None, 'q'])
+def test_stress(switchy, typecode):
+    # one writer moves amounts between the last values, another inserts
+    # a zero near the front and pops it again, so every consistent read
+    # sees the same total. A plain BIT tears most of these reads.
+    length, total, rounds = 64, 64 * 10, 300
+    b = ConcurrentBIT([10] * length, add, sub, typecode=typecode)
+    errors = []
+
+    def mover():
+        rng = Random(1)
+        for _ in range(rounds):
+            i, j = rng.randint(1, 32), rng.randint(1, 32)
+            amount = rng.randint(-5, 5)
+            b.update_many([-i, -j], [amount, -amount])
+
+    def resizer():
+        rng = Random(2)
+        for _ in range(rounds):
+            i = rng.randrange(16)
+            b.insert(i, 0)
+            if b.pop(i) != 0:
+                errors.append('pop')
+
+    def reader():
+        for _ in range(rounds):
+            sums = list(b)
+            if sums[-1] != total or len(sums) not in (length, length + 1):
+                errors.append(sums)
+            if b[-1] != total or b.prefix_sums([-1]) != [total]:
+                errors.append('prefix_sum')
+            if sum(b.original_layout()) != total:
+                errors.append('original_layout')
+
+    threads = [Thread(target=mover), Thread(target=resizer)]
+    threads += [Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert b[-1] == total and len(b) == length
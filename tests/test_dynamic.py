@@ -0,0 +1,73 @@
+import pytest
+from random import randint
+from support import (DummyPS, intensities, int_add, int_sub, int_xor,
+                     rand_int_list as gl)
+from bit import BIT, DynamicBIT
+
+INTENSITY = 'quick'
+LOADS = [2, 3, 8, 256]
+
+
+def check(d, dummy):
+    assert d.original_layout() == dummy.storage
+    assert list(d) == [dummy[i] for i in range(len(dummy))]
+    assert d._index._st == BIT.bit_layout(d._aggs, d.binop)
+    assert sum(map(len, d._blocks)) == len(d) == len(dummy)
+    assert all(d._blocks)
+
+
+@pytest.mark.parametrize('load', LOADS)
+@pytest.mark.parametrize('bf, ibf', [(int_add, int_sub), (int_xor, int_xor)])
+def test_operations(load, bf, ibf):
+    for length in intensities[INTENSITY]:
+        lst = gl(length)
+        d, dummy = DynamicBIT(lst, bf, ibf, load), DummyPS(lst, bf, ibf)
+        check(d, dummy)
+        for value in gl(4 * length):
+            op = randint(0, 5)
+            if op == 0 or not len(dummy):
+                index = randint(-len(dummy) - 2, len(dummy) + 2)
+                d.insert(index, value)
+                dummy.insert(index, value)
+            elif op == 1:
+                index = randint(-len(dummy), len(dummy) - 1)
+                assert d.pop(index) == dummy.pop(index)
+            elif op == 2:
+                index = randint(-len(dummy), len(dummy) - 1)
+                d.update(index, value)
+                dummy.update(index, value)
+            elif op == 3:
+                index = randint(-len(dummy), len(dummy) - 1)
+                d[index] = value
+                dummy[index] = value
+            elif op == 4:
+                d.append(value)
+                dummy.append(value)
+            else:
+                i = randint(0, len(dummy) - 1)
+                j = randint(i, len(dummy) - 1)
+                assert d[i] == dummy[i]
+                assert d.range_sum(i, j) == dummy.range_sum(i, j)
+                assert d.value_at(j) == dummy.storage[j]
+        check(d, dummy)
+        while len(dummy):
+            assert d.pop() == dummy.pop()
+        check(d, dummy)
+
+
+def test_errors():
+    d = DynamicBIT(range(10))
+    with pytest.raises(IndexError):
+        d[10]
+    with pytest.raises(TypeError):
+        d[0] = 1
+    with pytest.raises(TypeError):
+        d.pop()
+    with pytest.raises(TypeError):
+        d.range_sum(0, 3)
+    with pytest.raises(ValueError):
+        DynamicBIT(load=1)
+    with pytest.raises(IndexError):
+        DynamicBIT().prefix_sum(0)
+    with pytest.raises(ValueError):
+        DynamicBIT([1, 2], int_add, int_sub).remove(3)
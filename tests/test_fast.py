@@ -0,0 +1,97 @@
+import pickle
+import pytest
+from operator import add, and_, or_, sub, xor
+from random import randint
+from support import intensities, rand_int_list as gl
+from bit import AddBIT, AndBIT, BIT, MaxBIT, OrBIT, XorBIT
+from bit.monoid import ADD, XOR
+
+INTENSITY = 'quick'
+CLASSES = [(AddBIT, add, sub), (XorBIT, xor, xor), (OrBIT, or_, None),
+           (AndBIT, and_, None), (MaxBIT, max, None)]
+
+
+@pytest.mark.parametrize('cls, bf, ibf', CLASSES)
+def test_operations(cls, bf, ibf):
+    for length in intensities[INTENSITY]:
+        lst = gl(length, 0, 1000)
+        b, d = cls(lst), BIT(lst, bf, ibf)
+        assert b._st == d._st
+        for value in gl(60, 0, 1000):
+            index = randint(-length, length - 1)
+            op = randint(0, 3 if ibf else 1)
+            if op == 0:
+                b.update(index, value)
+                d.update(index, value)
+            elif op == 1:
+                b.update_unchecked(index % length, value)
+                d.update(index, value)
+            else:
+                b[index] = value
+                d[index] = value
+            assert b[index] == d[index]
+            assert b.prefix_sum_unchecked(index % length) == d[index]
+        assert b._st == d._st
+        assert list(b) == list(d)
+
+
+@pytest.mark.parametrize('cls, bf, ibf', CLASSES)
+def test_generic_paths(cls, bf, ibf):
+    # typed and kept values trees write through BIT.
+    for kwargs in ({'typecode': 'q'}, {'keep_values': True}):
+        lst = gl(50, 0, 1000)
+        b, d = cls(lst, **kwargs), BIT(lst, bf, ibf, **kwargs)
+        b.update(-1, 7)
+        d.update(-1, 7)
+        b.update_unchecked(5, 11)
+        d.update(5, 11)
+        if ibf:
+            b[3] = 9
+            d[3] = 9
+            assert b.value_at(5) == d.value_at(5)
+        assert list(b._st) == list(d._st)
+        b = pickle.loads(pickle.dumps(b))
+        b.update_unchecked(5, 11)
+        d.update(5, 11)
+        assert list(b._st) == list(d._st)
+    if cls is not AndBIT:
+        b = cls(range(1, 20), typecode='b', promote=True)
+        b.update(0, 1 << 20)
+        assert isinstance(b._st, list)
+
+
+def test_construction():
+    assert AddBIT(range(10), ADD).range_sum(3, 6) == 15
+    with pytest.raises(ValueError):
+        AddBIT(range(10), xor)
+    b = pickle.loads(pickle.dumps(AddBIT(range(10))))
+    assert type(b) is AddBIT and b[9] == 45
+    # inherited constructors pass binop along.
+    b = XorBIT.identity(4, XOR)
+    assert type(b) is XorBIT and b[3] == 0
+
+
+def test_errors():
+    b = AddBIT(range(10))
+    for index in (10, -11):
+        with pytest.raises(IndexError):
+            b[index]
+        with pytest.raises(IndexError):
+            b.update(index, 1)
+        with pytest.raises(IndexError):
+            b[index] = 1
+    with pytest.raises(IndexError):
+        AddBIT()[0]
+    with pytest.raises(TypeError):
+        MaxBIT(range(10))[0] = 1
+    # typed trees are left unchanged when a node overflows, however they
+    # were made.
+    data = bytearray(BIT([100, 1, 2, 3], typecode='b').to_bytes())
+    for b in (AddBIT([100, 1, 2, 3], typecode='b'),
+              AddBIT.from_buffer(data),
+              AddBIT.from_buffer(data, copy=True),
+              AddBIT.build_parallel([100, 1, 2, 3], typecode='b')):
+        assert type(b) is AddBIT
+        with pytest.raises(OverflowError):
+            b.update_unchecked(0, 100)
+        assert list(b._st) == [100, 101, 2, 106]
@@ -19,6 +19,35 @@ def test_sums():
             bit[length]
 
 
+def test_prefix_sums():
+    for length in intensities[INTENSITY]:
+        bit, dummy = bit_dummy(gl(length), bf, ibf)
+
+        indices = [randint(-length, length - 1) for _ in range(length)]
+        expected = [dummy[i] for i in indices]
+        assert bit.prefix_sums(indices) == expected
+        assert bit[indices] == expected
+        assert bit.prefix_sums(sorted(indices)) == [
+            dummy[i] for i in sorted(indices)
+        ]
+
+        # sanity, check that IndexError is raised.
+        with pytest.raises(IndexError):
+            bit.prefix_sums([0, length])
+    assert bit_dummy([], bf, ibf)[0].prefix_sums([]) == []
+
+
+def test_iter_prefix_sums():
+    for length in intensities[INTENSITY] | {0, 1}:
+        bit, dummy = bit_dummy(gl(length), bf, ibf)
+        expected = [dummy[i] for i in range(length)]
+        assert list(bit) == expected
+        assert list(reversed(bit)) == expected[::-1]
+        for _ in range(10):
+            start, stop = randint(-length, length), randint(-length, length)
+            assert list(bit.iter_prefix_sums(start, stop)) ==                 expected[start:stop]
+
+
 def test_append():
     for length in intensities[INTENSITY]:
         bit, dummy = bit_dummy([], bf, ibf)
@@ -30,6 +59,19 @@ def test_append():
             assert bit[idx] == dummy[idx]
 
 
+def test_extend_aligned():
+    # no inverse is needed while the tree appended is no longer than
+    # the alignment of the one extended.
+    for left in (1, 2, 4, 8, 12, 16):
+        for right in range(1, (left & -left) + 1):
+            lst, other = gl(left), gl(right)
+            bit, dummy = bit_dummy(lst, bf, None)
+            bit.extend(bit_dummy(other, bf, None)[0])
+            dummy.extend(other)
+            for index in range(len(bit)):
+                assert bit[index] == dummy[index]
+
+
 @pytest.mark.timeout(timeouts[INTENSITY])
 def test_update():
     for length in intensities[INTENSITY]:
@@ -50,9 +92,76 @@ def test_update():
             bit.update(length+1, None)
 
 
+@pytest.mark.timeout(timeouts[INTENSITY])
+def test_update_many():
+    for length in intensities[INTENSITY]:
+        # small batches push deltas up, large ones do a full pass and
+        # a handful of repeated indices checks merging.
+        for count in (1, length // 8, length * 2):
+            bit, dummy = bit_dummy(gl(length), bf, ibf)
+            indices = [randint(-length, length - 1) for _ in range(count)]
+            indices += indices[:3]
+            values = gl(len(indices))
+            bit.update_many(indices, values)
+            for index, value in zip(indices, values):
+                dummy.update(index, value)
+            for ni in range(length):
+                assert bit[ni] == dummy[ni]
+
+        with pytest.raises(IndexError):
+            bit.update_many([0, length], gl(2))
+        with pytest.raises(ValueError):
+            bit.update_many([0, 1], gl(1))
+
+
+def test_keep_values():
+    for length in intensities[INTENSITY]:
+        bit, dummy = bit_dummy(gl(length), bf, ibf, keep_values=True)
+        for value in gl(20):
+            index = randint(-length, length - 1)
+            bit.update(index, value)
+            dummy.update(index, value)
+            assert bit.value_at(index) == dummy.storage[index]
+            if ibf is not None:
+                index = randint(-length, length - 1)
+                bit[index] = value
+                dummy[index] = value
+        indices = [randint(-length, length - 1) for _ in range(length)]
+        values = gl(length)
+        bit.update_many(indices, values)
+        for index, value in zip(indices, values):
+            dummy.update(index, value)
+        for value in gl(10):
+            bit.append(value)
+            dummy.append(value)
+            index = randint(-len(bit), len(bit))
+            bit.insert(index, value)
+            dummy.insert(index, value)
+            index = randint(-len(bit), len(bit) - 1)
+            assert bit.pop(index) == dummy.pop(index)
+        assert bit.original_layout() == dummy.storage
+        assert bit._st == BIT.bit_layout(dummy.storage, bf)
+        assert list(bit) == [dummy[i] for i in range(len(dummy))]
+        value = dummy.storage[randint(0, len(dummy) - 1)]
+        assert bit.index(value) == dummy.index(value)
+        while len(bit):
+            assert bit.pop() == dummy.pop()
+
+    with pytest.raises(TypeError):
+        BIT(gl(5), bf).value_at(0)
+    bit, dummy = bit_dummy(gl(5), bf, ibf)
+    value = gl(1)[0]
+    bit.insert(10, value)
+    dummy.insert(10, value)
+    assert bit._st == BIT.bit_layout(dummy.storage, bf)
+    if ibf is None:
+        with pytest.raises(TypeError):
+            bit.insert(0, value)
+
+
 def test_iter():
-    # Both should use old iteration protocol (which
-    # invokes __getitem__
+    # BIT.__iter__ yields the prefix sums, DummyPS uses the old
+    # iteration protocol (which invokes __getitem__).
     for length in intensities[INTENSITY]:
         bit, dummy = bit_dummy(gl(length), bf, ibf)
 
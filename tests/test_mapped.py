@@ -0,0 +1,143 @@
+import pytest
+from operator import add, sub, xor
+from random import randint
+from support import DummyPS, intensities, rand_int_list as gl
+from bit import BIT, MappedBIT
+
+INTENSITY = 'quick'
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'tree.bit')
+
+
+@pytest.mark.parametrize('bf, ibf', [(add, sub), (xor, xor)])
+def test_build_reopen(path, bf, ibf, monkeypatch):
+    # small chunks so building goes through several of them.
+    monkeypatch.setattr(MappedBIT, '_chunk', 7)
+    for length in intensities[INTENSITY] | {0, 1}:
+        lst = gl(length)
+        with MappedBIT(path, iter(lst), bf) as b:
+            assert b._st.tolist() == BIT.bit_layout(lst, bf)
+        with MappedBIT.open(path) as b:
+            assert b.binop is bf and b.inverse is ibf
+            assert b.original_layout() == lst
+            assert list(b) == list(BIT(lst, bf))
+
+
+def test_extend(path, monkeypatch):
+    monkeypatch.setattr(MappedBIT, '_chunk', 7)
+    lst, more, other = gl(20), gl(30), gl(9)
+    with MappedBIT(path, lst, add, sub) as b:
+        b.extend(more)
+        b += BIT(other, add, sub)
+    with MappedBIT.open(path) as b:
+        assert b._st.tolist() == BIT.bit_layout(lst + more + other)
+
+
+def test_operations(path):
+    for length in intensities[INTENSITY]:
+        lst = gl(length)
+        b, dummy = MappedBIT(path, lst, add, sub), DummyPS(lst, add, sub)
+        for value in gl(50):
+            op = randint(0, 4)
+            if op == 0:
+                index = randint(-len(dummy), len(dummy))
+                b.insert(index, value)
+                dummy.insert(index, value)
+            elif op == 1 and len(dummy) > 1:
+                index = randint(-len(dummy), len(dummy) - 1)
+                assert b.pop(index) == dummy.pop(index)
+            elif op == 2:
+                b.append(value)
+                dummy.append(value)
+            elif op == 3:
+                index = randint(-len(dummy), len(dummy) - 1)
+                b.update(index, value)
+                dummy.update(index, value)
+            else:
+                index = randint(-len(dummy), len(dummy) - 1)
+                b[index] = value
+                dummy[index] = value
+            index = randint(0, len(dummy) - 1)
+            assert b[index] == dummy[index]
+        b.close()
+        with MappedBIT.open(path) as b:
+            assert len(b) == len(dummy)
+            assert b.original_layout() == dummy.storage
+
+
+def test_typecode(path):
+    with MappedBIT(path, [0.5, 1.5, 2.0], typecode='d') as b:
+        b.append(1.0)
+        assert b.typecode == 'd' and b[3] == 5.0
+    with MappedBIT.open(path) as b:
+        assert b.typecode == 'd' and b.original_layout() == [
+            0.5, 1.5, 2.0, 1.0
+        ]
+
+
+def test_overflow(path):
+    big = 2 ** 62
+    with MappedBIT(path, [big, big - 1, 0], inverse_binop=sub) as b:
+        nodes = b._st.tolist()
+        for op, args in [(b.update, (0, 1)), (b.__setitem__, (1, big)),
+                         (b.append, (big,)), (b.insert, (0, big)),
+                         (b.extend, ([big],))]:
+            with pytest.raises(OverflowError):
+                op(*args)
+            assert b._st.tolist() == nodes
+    with MappedBIT.open(path) as b:
+        assert b._st.tolist() == nodes
+
+
+def test_overflow_chunks(path, monkeypatch):
+    # the saved nodes are written and restored over several chunks.
+    monkeypatch.setattr(MappedBIT, '_chunk', 3)
+    big = 2 ** 62
+    lst = [big, -big, big] + list(range(20))
+    with MappedBIT(path, lst, inverse_binop=sub) as b:
+        nodes = b._st.tolist()
+        for op, args in [(b.insert, (0, big)), (b.insert, (5, big)),
+                         (b.pop, (1,))]:
+            with pytest.raises(OverflowError):
+                op(*args)
+            assert b._st.tolist() == nodes
+
+
+def test_errors(path, tmp_path):
+    with pytest.raises(ValueError):
+        MappedBIT(path, [1, 2], lambda a, b: a + b)
+    with MappedBIT(path, [1, 2]) as b:
+        with pytest.raises(TypeError):
+            b.pop()
+    other = tmp_path / 'other'
+    other.write_bytes(b'not a tree' * 10)
+    with pytest.raises(ValueError):
+        MappedBIT.open(str(other))
+
+
+def test_close(path, monkeypatch):
+    b = MappedBIT(path, [1, 2])
+    b.close()
+    b.close()
+    assert b._file.closed
+    # a failed build or reopen doesn't leave the file open.
+    opened = []
+
+    def failing(self, *args):
+        opened.append(self._file)
+        raise OSError("failed")
+    with monkeypatch.context() as m:
+        m.setattr(MappedBIT, 'extend', failing)
+        with pytest.raises(OSError):
+            MappedBIT(path, [1, 2])
+    MappedBIT(path, [1, 2]).close()
+    with monkeypatch.context() as m:
+        m.setattr(MappedBIT, '_map_file', failing)
+        with pytest.raises(OSError):
+            MappedBIT.open(path)
+        with pytest.raises(OSError):
+            MappedBIT(path, [1, 2])
+    assert len(opened) == 3 and all(f.closed for f in opened)
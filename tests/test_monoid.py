@@ -0,0 +1,122 @@
+import pytest
+from collections import Counter
+from operator import add, sub
+from random import randint
+from support import (DummyPS, intensities, rand_int_list as gl,
+                     rand_multiset_list, rand_set_list)
+from bit import BIT, Monoid, SparseTable
+from bit.monoid import (ADD, AND, COUNTER, MAX, MIN, MUL, OR, UNION, XOR)
+
+INTENSITY = 'quick'
+MONOIDS = [ADD, XOR, COUNTER, OR, AND, MIN, MAX, MUL, UNION]
+IDEMPOTENT = [OR, AND, MIN, MAX, UNION]
+
+
+def values(monoid, length):
+    if monoid is UNION:
+        return rand_set_list(length)
+    if monoid is COUNTER:
+        return rand_multiset_list(length)
+    return gl(length, 1, 100)
+
+
+@pytest.mark.parametrize('monoid', MONOIDS, ids=repr)
+def test_laws(monoid):
+    x, y, z = values(monoid, 3)
+    op, e = monoid, monoid.identity
+    assert op(op(x, y), z) == op(x, op(y, z))
+    assert op(x, e) == x == op(e, x)
+    assert op(x, y) == op(y, x)
+    if monoid.idempotent:
+        assert op(x, x) == x
+    if monoid.inverse is not None:
+        assert monoid.inverse(op(x, y), y) == x
+
+
+@pytest.mark.parametrize('monoid', MONOIDS, ids=repr)
+def test_tree(monoid):
+    for length in intensities[INTENSITY]:
+        lst = values(monoid, length)
+        b = BIT(lst, monoid, keep_values=True)
+        # the bare operator is called, not the monoid.
+        assert b.monoid is monoid and b.binop is monoid.binop
+        assert b.inverse is monoid.inverse
+        assert list(b) == list(BIT(lst, monoid.binop))
+
+        empty = BIT.identity(length, monoid)
+        for index, value in enumerate(lst):
+            empty.update(index, value)
+        assert empty._st == b._st
+
+
+def test_identity_calls():
+    calls = []
+
+    def counted(x, y):
+        calls.append((x, y))
+        return x + y
+
+    monoid = Monoid(counted, 0, 'counted')
+    assert BIT.identity(1000, monoid)._st == [0] * 1000
+    typed = BIT.identity(1000, monoid, typecode='q')
+    assert typed.typecode == 'q' and typed._st.tolist() == [0] * 1000
+    assert not calls
+
+
+def test_identity_typecode():
+    assert BIT.identity(4, MIN, typecode='d')[3] == float('inf')
+    for monoid in (MIN, MAX):
+        with pytest.raises(OverflowError):
+            BIT.identity(4, monoid, typecode='q')
+    with pytest.raises(OverflowError):
+        BIT.identity(4, Monoid(add, 1 << 70, 'big'), typecode='q')
+
+
+def test_group_inverse():
+    b = BIT(range(10), ADD)
+    b[3] = 10
+    assert b.original_layout() == [0, 1, 2, 10, 4, 5, 6, 7, 8, 9]
+    # an explicit inverse wins.
+    assert BIT(range(10), XOR, sub).inverse is sub
+    assert BIT(rand_multiset_list(5), COUNTER).value_at(3) is not None
+    assert isinstance(COUNTER.identity, Counter)
+
+
+@pytest.mark.parametrize('monoid', IDEMPOTENT, ids=repr)
+def test_freeze(monoid):
+    for length in intensities[INTENSITY]:
+        lst = values(monoid, length)
+        b = BIT(lst, monoid, keep_values=True)
+        table, dummy = b.freeze(), DummyPS(lst, monoid.binop, None)
+        assert len(table) == length
+        for _ in range(20):
+            i = randint(0, length - 1)
+            j = randint(i, length - 1)
+            expected = monoid.identity
+            for value in lst[i + 1:j + 1]:
+                expected = monoid(expected, value)
+            assert table.range_sum(i, j) == expected
+            assert table[j] == dummy[j] == b[j]
+        # changes to the tree don't reach the table.
+        b.update(0, lst[-1])
+        assert table[0] == lst[0]
+
+
+def test_errors():
+    with pytest.raises(TypeError):
+        BIT(range(10), ADD).freeze()
+    with pytest.raises(TypeError):
+        BIT(range(10), MAX).freeze()
+    with pytest.raises(TypeError):
+        SparseTable(range(10), ADD)
+    cat = Monoid(add, '', 'concat', commutative=False)
+    with pytest.raises(ValueError):
+        BIT(['a', 'b'], cat)
+    table = BIT(range(10), MIN, keep_values=True).freeze()
+    with pytest.raises(IndexError):
+        table.range_sum(5, 4)
+    with pytest.raises(IndexError):
+        table.range_sum(0, 10)
+    with pytest.raises(IndexError):
+        table[10]
+    assert table.range_sum(4, 4) == MIN.identity
@@ -0,0 +1,71 @@
+import pytest
+from bisect import bisect_left, insort
+from random import randint
+from support import intensities
+from bit import FenwickMultiset
+
+INTENSITY = 'quick'
+
+
+def test_build():
+    for length in intensities[INTENSITY]:
+        universe = randint(1, 2 * length)
+        values = [randint(0, universe - 1) for _ in range(length)]
+        m = FenwickMultiset(universe, values)
+        assert list(m) == sorted(values)
+        assert len(m) == length
+
+    with pytest.raises(ValueError):
+        FenwickMultiset(10, [10])
+    with pytest.raises(ValueError):
+        FenwickMultiset(10, [-1])
+
+
+def test_operations():
+    for length in intensities[INTENSITY]:
+        universe = randint(1, 2 * length)
+        m, dummy = FenwickMultiset(universe), []
+        for _ in range(4 * length):
+            value = randint(0, universe - 1)
+            if randint(0, 2):
+                m.add(value)
+                insort(dummy, value)
+            else:
+                m.discard(value)
+                if value in dummy:
+                    dummy.remove(value)
+
+            assert len(m) == len(dummy)
+            assert m.count(value) == dummy.count(value)
+            assert (value in m) == (value in dummy)
+            assert m.rank(value) == bisect_left(dummy, value)
+            if dummy:
+                k = randint(-len(dummy), len(dummy) - 1)
+                assert m.select(k) == dummy[k]
+            lo = randint(-1, universe)
+            hi = randint(lo, universe + 1)
+            assert m.count_range(lo, hi) == sum(
+                lo <= v < hi for v in dummy
+            )
+        assert list(m) == dummy
+
+        with pytest.raises(IndexError):
+            m.select(len(dummy))
+
+
+def test_remove():
+    m = FenwickMultiset(5, [1, 1, 4])
+    m.remove(1)
+    assert list(m) == [1, 4]
+    m.add(2, 3)
+    m.discard(2, 2)
+    assert list(m) == [1, 2, 4]
+    with pytest.raises(KeyError):
+        m.remove(3)
+    with pytest.raises(ValueError):
+        m.add(2, -1)
+    # a negative count would add copies instead.
+    for value in (2, 3):
+        with pytest.raises(ValueError):
+            m.discard(value, -5)
+    assert list(m) == [1, 2, 4]
@@ -0,0 +1,223 @@
+import pickle
+import pytest
+from random import randint
+from operator import add, sub
+from support import DummyPS, intensities, rand_int_list as gl
+
+np = pytest.importorskip('numpy')
+from bit import BIT, NumpyBIT  # noqa: E402
+
+INTENSITY = 'quick'
+# (binop, inverse) pairs, the inverse is None for maximum.
+OPS = [
+    (np.add, np.subtract),
+    (np.bitwise_xor, np.bitwise_xor),
+    (np.maximum, None),
+    (add, sub),
+]
+
+
+def np_dummy(lst, binop, inverse):
+    return NumpyBIT(lst, binop, inverse), DummyPS(lst, binop, inverse)
+
+
+@pytest.mark.parametrize('bf, ibf', OPS)
+def test_layout(bf, ibf):
+    for length in intensities[INTENSITY] | {0, 1, 2}:
+        lst = gl(length)
+        expected = BIT.bit_layout(lst, bf)
+        assert NumpyBIT.bit_layout(lst, bf).tolist() == expected
+        assert NumpyBIT(iter(lst), bf)._st.tolist() == expected
+        if ibf is not None:
+            assert NumpyBIT(lst, bf, ibf).original_layout().tolist() == lst
+
+
+@pytest.mark.parametrize('bf, ibf', OPS)
+def test_sums(bf, ibf):
+    for length in intensities[INTENSITY]:
+        bit, dummy = np_dummy(gl(length), bf, ibf)
+        for i in range(length):
+            assert bit[i] == dummy[i]
+
+        with pytest.raises(IndexError):
+            bit[length]
+
+
+@pytest.mark.parametrize('bf, ibf', OPS)
+def test_update(bf, ibf):
+    for length in intensities[INTENSITY]:
+        bit, dummy = np_dummy(gl(length), bf, ibf)
+        for value in gl(max(20, length // 8)):
+            rand_index = randint(0, length - 1)
+            bit.update(rand_index, value)
+            dummy.update(rand_index, value)
+            for ni in range(rand_index, length):
+                assert bit[ni] == dummy[ni]
+
+
+@pytest.mark.parametrize('bf, ibf', [op for op in OPS if op[1]])
+def test_set(bf, ibf):
+    for length in intensities[INTENSITY]:
+        bit, dummy = np_dummy(gl(length), bf, ibf)
+        for value in gl(min(150, length)):
+            rand_pos = randint(0, length - 1)
+            bit[rand_pos] = value
+            dummy[rand_pos] = value
+            for i in range(rand_pos, length):
+                assert bit[i] == dummy[i]
+
+    with pytest.raises(TypeError):
+        NumpyBIT([1, 2], bf)[0] = 3
+
+
+@pytest.mark.parametrize('bf, ibf', OPS)
+def test_append(bf, ibf):
+    for length in intensities[INTENSITY]:
+        bit, dummy = np_dummy([], bf, ibf)
+        for idx, value in enumerate(gl(length)):
+            bit.append(value)
+            dummy.append(value)
+            assert bit[idx] == dummy[idx]
+        assert bit._st.tolist() == BIT.bit_layout(dummy.storage, bf)
+        more = gl(10)
+        bit.extend(more)
+        dummy.extend(more)
+        assert bit._st.tolist() == BIT.bit_layout(dummy.storage, bf)
+
+
+@pytest.mark.parametrize('bf, ibf', [op for op in OPS if op[1]])
+def test_pop_insert(bf, ibf):
+    for length in intensities[INTENSITY]:
+        bit, dummy = np_dummy(gl(length), bf, ibf)
+        for value in gl(20):
+            rand_pos = randint(-len(bit), len(bit))
+            bit.insert(rand_pos, value)
+            dummy.insert(rand_pos, value)
+            assert bit[-1] == dummy[-1]
+        while len(bit) > 1:
+            rand_index = randint(0, len(bit) - 1)
+            assert bit.pop(rand_index) == dummy.pop(rand_index)
+            assert bit[-1] == dummy[-1]
+        assert bit.pop() == dummy.pop()
+
+
+@pytest.mark.parametrize('bf, ibf', [op for op in OPS if op[1]])
+def test_empty_then_grow(bf, ibf):
+    # the first value stored decides the dtype, whichever call stores it.
+    bit = NumpyBIT([], bf, ibf)
+    bit.insert(0, 23)
+    bit.append(99)
+    assert bit.original_layout().tolist() == [23, 99]
+    assert bit.dtype.kind == 'i'
+    # popped empty, appends reuse the buffer and its dtype.
+    while len(bit):
+        bit.pop()
+    bit.append(7)
+    bit.insert(0, 5)
+    assert bit.original_layout().tolist() == [5, 7]
+    assert bit.dtype.kind == 'i'
+
+
+def test_bit_arguments():
+    # the arguments of BIT are accepted, typecode picks the dtype.
+    bit = NumpyBIT(range(5), np.add, np.subtract, typecode='q')
+    assert bit.typecode == 'q' and bit.dtype == np.dtype('q')
+    bit.append(5)
+    assert bit.dtype == np.dtype('q') and bit[5] == 15
+    assert NumpyBIT(range(5), typecode='b', dtype=np.int8).dtype == np.int8
+    assert NumpyBIT(range(5)).typecode is None
+    for kwargs in ({'keep_values': True}, {'promote': True},
+                   {'typecode': 'b', 'dtype': np.int64}):
+        with pytest.raises(ValueError):
+            NumpyBIT(range(5), np.add, np.subtract, **kwargs)
+
+
+def test_pickle():
+    bit = NumpyBIT(range(5), np.add, np.subtract)
+    bit.append(5)
+    restored = pickle.loads(pickle.dumps(bit))
+    # nodes written after unpickling survive growing the buffer.
+    restored.update(0, 100)
+    restored.append(6)
+    assert restored.original_layout().tolist() == [100, 1, 2, 3, 4, 5, 6]
+
+
+def test_index_range_sum():
+    lst = gl(100)
+    bit = NumpyBIT(lst, np.add, np.subtract)
+    for v in lst:
+        assert bit.index(v) == lst.index(v)
+    with pytest.raises(ValueError):
+        bit.index(-1)
+    assert bit[3:50] == BIT(lst, add, sub)[3:50]
+
+
+@pytest.mark.parametrize('bf, ibf', OPS)
+def test_prefix_sums(bf, ibf):
+    for length in intensities[INTENSITY]:
+        bit, dummy = np_dummy(gl(length), bf, ibf)
+        indices = [randint(-length, length - 1) for _ in range(length)]
+        expected = [dummy[i] for i in indices]
+        assert bit.prefix_sums(indices).tolist() == expected
+        assert bit[np.array(indices)].tolist() == expected
+
+        with pytest.raises(IndexError):
+            bit.prefix_sums([0, length])
+        if ibf is not None:
+            starts = [randint(0, length - 1) for _ in range(length)]
+            stops = [randint(i, length - 1) for i in starts]
+            assert bit.range_sums(starts, stops).tolist() == [
+                dummy.range_sum(i, j) for i, j in zip(starts, stops)
+            ]
+
+
+@pytest.mark.parametrize('bf, ibf', OPS)
+def test_update_many(bf, ibf):
+    for length in intensities[INTENSITY]:
+        for count in (1, length // 8, length * 2):
+            bit, dummy = np_dummy(gl(length), bf, ibf)
+            indices = [randint(-length, length - 1) for _ in range(count)]
+            values = gl(count)
+            bit.update_many(indices, values)
+            for index, value in zip(indices, values):
+                dummy.update(index, value)
+            for ni in range(length):
+                assert bit[ni] == dummy[ni]
+
+
+def test_update_many_cast():
+    # float deltas on an int tree round like one update at a time.
+    for count in (10, 5000):
+        bit = NumpyBIT(range(100), np.add, np.subtract)
+        expected = NumpyBIT(range(100), np.add, np.subtract)
+        indices = [randint(0, 99) for _ in range(count)]
+        bit.update_many(indices, [0.99] * count)
+        for index in indices:
+            expected.update(index, 0.99)
+        assert bit.dtype.kind == 'i'
+        assert bit._st.tolist() == expected._st.tolist()
+    bit = NumpyBIT(range(10), np.add, np.subtract)
+    bit.update_many((i for i in [1, 2]), (v for v in [3, 4]))
+    assert bit.original_layout().tolist() == [0, 4, 6, 3, 4, 5, 6, 7, 8, 9]
+
+
+def test_insert_end():
+    # appending needs no inverse, like BIT.insert.
+    bit = NumpyBIT(range(5))
+    bit.insert(5, 5)
+    bit.insert(100, 6)
+    assert bit._st.tolist() == BIT(range(7))._st
+    with pytest.raises(TypeError):
+        bit.insert(0, 1)
+
+
+def test_monoid():
+    from bit.monoid import ADD, MAX
+    lst = gl(100)
+    bit = NumpyBIT(lst, ADD)
+    assert bit.binop is np.add and bit.inverse is np.subtract
+    assert bit.monoid is ADD
+    assert bit.original_layout().tolist() == lst
+    bit = NumpyBIT(lst, MAX)
+    assert bit.binop is np.maximum and bit.inverse is None
+    assert bit[-1] == max(lst)
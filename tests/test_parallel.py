@@ -0,0 +1,52 @@
+import pytest
+import sys
+from operator import add, sub, xor, or_
+from random import random
+from support import intensities, rand_int_list as gl
+
+if sys.version_info < (3, 8):
+    pytest.skip("bit.parallel requires Python 3.8.", allow_module_level=True)
+from bit import BIT  # noqa: E402
+from bit.parallel import parallel_layout  # noqa: E402
+
+INTENSITY = 'quick'
+
+
+@pytest.mark.parametrize('bf', [add, xor, or_])
+def test_layout(bf):
+    for length in intensities[INTENSITY] | {0, 1, 2, 3}:
+        lst = gl(length)
+        expected = BIT.bit_layout(lst, bf, 'q')
+        for workers, block in [(1, None), (2, 1), (3, 4), (2, 8), (4, 64)]:
+            assert parallel_layout(lst, bf, 'q', workers, block) == expected
+
+
+def test_floats():
+    # same operands in the same order, so floats match exactly.
+    lst = [random() for _ in range(1000)]
+    layout = parallel_layout(lst, add, 'd', 3, 16)
+    assert layout.tolist() == BIT.bit_layout(lst)
+
+
+def test_build_parallel(monkeypatch):
+    monkeypatch.setattr('bit.parallel.MIN_BLOCK', 4)
+    b = BIT.build_parallel(range(100), add, sub, workers=3)
+    assert b.typecode == 'q' and b._st == BIT(range(100), typecode='q')._st
+    assert b.original_layout() == list(range(100))
+    b.append(100)
+    assert b[-1] == sum(range(101))
+
+
+def test_build_parallel_fallback(monkeypatch):
+    # without shared memory, as before Python 3.8, build in process.
+    monkeypatch.setitem(sys.modules, 'bit.parallel', None)
+    b = BIT.build_parallel(range(100), add, sub, workers=3)
+    assert b.typecode == 'q' and b._st == BIT(range(100), typecode='q')._st
+    assert b.original_layout() == list(range(100))
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        parallel_layout(range(10), add, 'q', 2, 3)
+    with pytest.raises(OverflowError):
+        parallel_layout([2 ** 62] * 16, add, 'q', 2, 4)
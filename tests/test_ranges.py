@@ -0,0 +1,89 @@
+import pytest
+from random import randint
+from support import (intensities, rand_int_list, rand_decimal_list,
+                     rand_frac_list, int_add, int_sub, int_xor, dec_add,
+                     dec_sub, frac_add, frac_sub)
+from bit import RangeBIT, RangeUpdateBIT
+
+INTENSITY = 'quick'
+GROUPS = [
+    (rand_int_list, int_add, int_sub),
+    (rand_int_list, int_xor, int_xor),
+    (rand_decimal_list, dec_add, dec_sub),
+    (rand_frac_list, frac_add, frac_sub),
+]
+# RangeBIT needs scalar multiplication, xor has none.
+RINGS = [group for group in GROUPS if group[1] is not int_xor]
+
+
+def rand_slice(length):
+    start = randint(-length, length)
+    return slice(start, randint(start, length + 1))
+
+
+@pytest.mark.parametrize('gl, bf, ibf', GROUPS)
+def test_range_update(gl, bf, ibf):
+    for length in intensities[INTENSITY]:
+        lst = gl(length)
+        r = RangeUpdateBIT(lst, bf, ibf)
+        assert r.original_layout() == lst
+
+        for value in gl(length):
+            index = rand_slice(length)
+            r.update(index, value)
+            for i in range(*index.indices(length)):
+                lst[i] = bf(lst[i], value)
+            i = randint(-length, length - 1)
+            assert r.value_at(i) == r[i] == lst[i]
+        assert r.original_layout() == lst
+
+        for value in gl(5):
+            index = randint(-length, length - 1)
+            r[index] = value
+            lst[index] = value
+            r.append(value)
+            lst.append(value)
+        assert r.original_layout() == lst
+
+    with pytest.raises(ValueError):
+        r.update(slice(0, 4, 2), 1)
+    with pytest.raises(IndexError):
+        r.value_at(len(r))
+    with pytest.raises(IndexError):
+        r.update(len(r), 1)
+
+
+@pytest.mark.parametrize('gl, bf, ibf', RINGS)
+def test_range_bit(gl, bf, ibf):
+    for length in intensities[INTENSITY]:
+        lst = gl(length)
+        r = RangeBIT(lst, bf, ibf)
+        assert r.original_layout() == lst
+
+        for value in gl(length):
+            i = randint(-length, length - 1)
+            j = randint(i % length, length - 1)
+            r.add_range(i, j, value)
+            for k in range(i % length, j + 1):
+                lst[k] = bf(lst[k], value)
+
+            i = randint(0, length - 1)
+            j = randint(i, length - 1)
+            assert r.range_sum(i, j) == sum(lst[i + 1:j + 1],
+                                            lst[0] - lst[0])
+            assert r.value_at(i) == lst[i]
+            assert r[j] == sum(lst[:j + 1], lst[0] - lst[0])
+
+        for value in gl(5):
+            r.append(value)
+            lst.append(value)
+            r.update(slice(-3, None), value)
+            lst[-3:] = [bf(v, value) for v in lst[-3:]]
+        assert r.original_layout() == lst
+        assert r.range_sum() == sum(lst[1:], lst[0] - lst[0])
+        assert r.range_sum(-1, -1) == lst[0] - lst[0]
+
+    with pytest.raises(IndexError):
+        r.range_sum(3, 1)
+    with pytest.raises(IndexError):
+        r.add_range(0, len(r), lst[0])
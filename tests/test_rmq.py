@@ -0,0 +1,90 @@
+import pytest
+from functools import reduce
+from math import gcd
+from operator import add, sub, and_, or_
+from random import randint
+from support import intensities, rand_int_list as gl, rand_set_list
+from bit import BIT, RangeQueryBIT
+from bit.monoid import MIN
+
+INTENSITY = 'quick'
+OPS = [(min, None), (max, None), (gcd, None), (and_, None), (or_, None),
+       (set.intersection, None), (add, sub)]
+
+
+def values(bf, length):
+    if bf is set.intersection:
+        return rand_set_list(length)
+    return gl(length, 1, 1000)
+
+
+def check(b, lst, bf):
+    length = len(lst)
+    assert b._st == BIT.bit_layout(lst, bf)
+    assert b._mirror == RangeQueryBIT.mirror_layout(lst, bf)
+    for _ in range(20):
+        i = randint(0, length - 1)
+        j = randint(i, length - 1)
+        assert b.range_query(i, j) == reduce(bf, lst[i:j + 1])
+        if i < j:
+            assert b.range_sum(i, j) == reduce(bf, lst[i + 1:j + 1])
+
+
+@pytest.mark.parametrize('bf, ibf', OPS)
+def test_operations(bf, ibf):
+    for length in intensities[INTENSITY]:
+        lst = values(bf, length)
+        b = RangeQueryBIT(lst, bf, ibf)
+        check(b, lst, bf)
+        for value in values(bf, 40):
+            op = randint(0, 4)
+            index = randint(-len(lst), len(lst) - 1)
+            if op == 0:
+                b[index] = value
+                lst[index] = value
+            elif op == 1:
+                b.update(index, value)
+                lst[index] = bf(lst[index], value)
+            elif op == 2:
+                b.append(value)
+                lst.append(value)
+            elif op == 3:
+                b.insert(index, value)
+                lst.insert(index, value)
+            elif len(lst) > 1:
+                assert b.pop(index) == lst.pop(index)
+        check(b, lst, bf)
+        indices = [randint(0, len(lst) - 1) for _ in range(10)]
+        updates = values(bf, 10)
+        b.update_many(indices, updates)
+        for index, value in zip(indices, updates):
+            lst[index] = bf(lst[index], value)
+        check(b, lst, bf)
+
+
+def test_extend():
+    lst, more = gl(13, 1, 1000), gl(20, 1, 1000)
+    b = RangeQueryBIT(lst, min)
+    b.extend(more[:10])
+    b += RangeQueryBIT(more[10:], min)
+    check(b, lst + more, min)
+
+
+def test_empty_range():
+    assert RangeQueryBIT([3, 1, 2], MIN).range_sum(1, 1) == MIN.identity
+    assert RangeQueryBIT([3, 1, 2], add, sub).range_sum(1, 1) == 0
+    with pytest.raises(TypeError):
+        RangeQueryBIT([3, 1, 2], min).range_sum(1, 1)
+
+
+def test_errors():
+    b = RangeQueryBIT(range(10), min)
+    with pytest.raises(IndexError):
+        b.range_query(5, 4)
+    with pytest.raises(IndexError):
+        b.range_query(0, 10)
+    with pytest.raises(IndexError):
+        b[10] = 1
+    with pytest.raises(ValueError):
+        b.update_many([1, 2], [1])
+    assert b.range_query(-3, -1) == 7
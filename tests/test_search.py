@@ -0,0 +1,38 @@
+import pytest
+from bisect import bisect_left, bisect_right
+from fractions import Fraction
+from itertools import accumulate
+from random import randint
+from support import intensities, rand_int_list, rand_frac_list
+from bit import BIT
+
+INTENSITY = 'quick'
+
+
+@pytest.mark.parametrize('gl, bf', [
+    (rand_int_list, int.__add__),
+    (rand_frac_list, Fraction.__add__),
+    (rand_int_list, max),
+])
+def test_bounds(gl, bf):
+    for length in intensities[INTENSITY]:
+        lst = gl(length)
+        bit = BIT(lst, bf)
+        sums = list(accumulate(lst, bf))
+        targets = [sums[randint(0, length - 1)] for _ in range(length)]
+        targets += [sums[0] - 1, sums[-1], sums[-1] + 1]
+        for target in targets:
+            assert bit.lower_bound(target) == bisect_left(sums, target)
+            assert bit.upper_bound(target) == bisect_right(sums, target)
+
+    assert BIT().lower_bound(10) == BIT().upper_bound(10) == 0
+
+
+def test_bounds_key():
+    for length in intensities[INTENSITY]:
+        lst = [{i} for i in range(length)]
+        bit = BIT(lst, set.union)
+        for target in range(length + 2):
+            expected = min(max(target - 1, 0), length)
+            assert bit.lower_bound(target, key=len) == expected
+            assert bit.upper_bound(target, key=len) == min(target, length)
@@ -0,0 +1,84 @@
+import pytest
+from functools import reduce
+from operator import add, mul
+from random import randint
+from support import intensities, rand_int_list as gl
+from bit import SegmentTree
+from bit.monoid import ADD, MAX, MIN, MUL
+
+INTENSITY = 'quick'
+OPS = [add, min, max, ADD, MIN, MAX]
+
+
+def check(t, lst, bf):
+    length = len(lst)
+    assert len(t) == length
+    assert t.original_layout() == lst
+    for _ in range(20):
+        i = randint(0, length - 1)
+        j = randint(i, length - 1)
+        assert t.range_query(i, j) == reduce(bf, lst[i:j + 1])
+        assert t[j] == reduce(bf, lst[:j + 1])
+        if i < j:
+            assert t.range_sum(i, j) == reduce(bf, lst[i + 1:j + 1])
+            assert t[i:j] == t.range_sum(i, j)
+
+
+@pytest.mark.parametrize('bf', OPS)
+def test_operations(bf):
+    for length in intensities[INTENSITY]:
+        lst = gl(length, -1000, 1000)
+        t = SegmentTree(lst, bf)
+        check(t, lst, bf)
+        for value in gl(60, -1000, 1000):
+            op = randint(0, 3)
+            i = randint(0, length - 1)
+            j = randint(i, length - 1)
+            if op == 0:
+                t.assign_range(i, j, value)
+                lst[i:j + 1] = [value] * (j - i + 1)
+            elif op == 1:
+                t.add_range(i, j, value)
+                lst[i:j + 1] = [v + value for v in lst[i:j + 1]]
+            elif op == 2:
+                t[-i - 1] = value
+                lst[-i - 1] = value
+            else:
+                t.update(i, value)
+                lst[i] = bf(lst[i], value)
+            assert t.range_query(i, j) == reduce(bf, lst[i:j + 1])
+            assert t.value_at(j) == lst[j]
+        check(t, lst, bf)
+
+
+def test_hooks():
+    # repeat by doubling, shift supplied.
+    lst = gl(37, 1, 5)
+    t = SegmentTree(lst, mul, shift=lambda s, d, c: s * d ** c)
+    t.assign_range(3, 20, 2)
+    lst[3:21] = [2] * 18
+    t.add_range(0, 10, 3)
+    lst[:11] = [v * 3 for v in lst[:11]]
+    assert t.range_query(2, 30) == reduce(mul, lst[2:31])
+    assert t.original_layout() == lst
+    with pytest.raises(TypeError):
+        SegmentTree(lst, MUL).add_range(0, 1, 2)
+
+
+def test_empty_range():
+    assert SegmentTree([3, 1, 2], MIN).range_sum(1, 1) == MIN.identity
+    assert SegmentTree([3, 1, 2], ADD).range_sum(1, 1) == 0
+    with pytest.raises(TypeError):
+        SegmentTree([3, 1, 2], min).range_sum(1, 1)
+
+
+def test_errors():
+    t = SegmentTree(range(10), min)
+    with pytest.raises(IndexError):
+        t.range_query(5, 4)
+    with pytest.raises(IndexError):
+        t.assign_range(0, 10, 1)
+    with pytest.raises(IndexError):
+        t[10] = 1
+    with pytest.raises(IndexError):
+        SegmentTree()[0]
@@ -0,0 +1,136 @@
+import pickle
+import pytest
+from array import array
+from operator import add, sub, xor, or_, and_
+from random import random
+from support import DummyPS, intensities, rand_int_list as gl
+from bit import BIT, MappedBIT, XorBIT
+from bit.monoid import ADD
+from bit.serial import HEADER, NATIVE, swapped
+
+INTENSITY = 'quick'
+OPS = [(add, sub), (xor, xor), (or_, None), (and_, None), (max, None),
+       (min, None)]
+
+
+@pytest.mark.parametrize('bf, ibf', OPS)
+@pytest.mark.parametrize('typecode', [None, 'q', 'l'])
+def test_round_trip(bf, ibf, typecode):
+    for length in intensities[INTENSITY] | {0, 1}:
+        lst = gl(length)
+        bit = BIT(lst, bf, typecode=typecode)
+        data = bit.to_bytes()
+        assert len(data) == HEADER.size + 8 * length
+        for copy in (False, True):
+            loaded = BIT.from_buffer(bytearray(data), copy=copy)
+            assert loaded.binop is bf and loaded.inverse is ibf
+            assert loaded.typecode == (typecode or 'q')
+            assert list(loaded) == list(bit)
+
+        restored = pickle.loads(pickle.dumps(bit))
+        assert restored.typecode == typecode
+        assert restored._st == bit._st and restored.binop is bf
+
+
+def test_floats():
+    lst = [random() for _ in range(100)]
+    bit = BIT(lst)
+    loaded = BIT.from_buffer(bit.to_bytes(), copy=True)
+    assert loaded.typecode == 'd' and loaded._st.tolist() == bit._st
+    # a typecode can be forced, ints pack as floats.
+    assert BIT.from_buffer(BIT(range(5)).to_bytes('d'), copy=True)[4] == 10.0
+
+
+def test_zero_copy():
+    lst = gl(100)
+    buffer = bytearray(BIT(lst, add, sub, typecode='q').to_bytes())
+    bit, dummy = BIT.from_buffer(buffer), DummyPS(lst, add, sub)
+    bit.update(3, 10)
+    dummy.update(3, 10)
+    bit[50] = 7
+    dummy[50] = 7
+    # the buffer itself changed.
+    assert BIT.from_buffer(buffer).original_layout() == dummy.storage
+    bit.append(1)
+    dummy.append(1)
+    bit.insert(0, 2)
+    dummy.insert(0, 2)
+    assert bit.pop(10) == dummy.pop(10)
+    assert isinstance(bit._st, array)
+    assert bit.original_layout() == dummy.storage
+    # read-only buffers have to be copied.
+    expected = BIT(lst)[-1] + 10 + 7 - lst[50]
+    with pytest.raises(TypeError):
+        BIT.from_buffer(bytes(buffer))
+    assert BIT.from_buffer(bytes(buffer), copy=True)[-1] == expected
+
+
+def test_byte_order():
+    lst = gl(20)
+    data = bytearray(BIT(lst, add, sub, typecode='q').to_bytes())
+    # the same tree as written on a host of the other byte order.
+    foreign = array('q', data[HEADER.size:])
+    foreign.byteswap()
+    order = b'>' if NATIVE == b'<' else b'<'
+    data[HEADER.size:] = foreign.tobytes()
+    data[7:8] = order
+    assert swapped(data)
+    loaded = BIT.from_buffer(data)
+    assert loaded.original_layout() == lst and loaded.typecode == 'q'
+
+
+def test_pickle_fallback(tmp_path):
+    kept = BIT(gl(10), add, sub, keep_values=True)
+    restored = pickle.loads(pickle.dumps(kept))
+    assert restored._values == kept._values and restored._st == kept._st
+    big = BIT([2 ** 70, 1], add, sub)
+    assert pickle.loads(pickle.dumps(big))._st == big._st
+    custom = BIT(gl(10), add, int.__sub__)
+    assert pickle.loads(pickle.dumps(custom)).inverse is int.__sub__
+    # mixed ints and floats don't pack without loss.
+    mixed = BIT([2 ** 60 + 1, 0.5, 3])
+    restored = pickle.loads(pickle.dumps(mixed))
+    assert restored._st == mixed._st
+    assert [type(v) for v in restored._st] == [int, float, int]
+
+
+def test_pickle_state():
+    # binop and the default inverse travel in the header only.
+    state = BIT(range(10), add, sub).__reduce__()[2]
+    assert 'binop' not in state and 'inverse' not in state
+    restored = pickle.loads(pickle.dumps(BIT(range(10), add, sub)))
+    assert restored.binop is add and restored.inverse is sub
+    # a missing inverse isn't replaced by the default one.
+    restored = pickle.loads(pickle.dumps(BIT(range(10), add)))
+    assert restored.inverse is None and restored._st == BIT(range(10))._st
+    floats = BIT([0.5, 1.5, 2.0])
+    assert pickle.loads(pickle.dumps(floats))._st == floats._st
+
+
+def test_pickle_attributes(tmp_path):
+    restored = pickle.loads(pickle.dumps(BIT(range(10), ADD, promote=True)))
+    assert restored.monoid.name == 'add' and restored._promote
+    assert restored.inverse is ADD.inverse
+    fast = pickle.loads(pickle.dumps(XorBIT(range(10), typecode='i')))
+    assert type(fast) is XorBIT and fast.typecode == 'i'
+    assert list(fast) == list(XorBIT(range(10)))
+    path = str(tmp_path / 'tree.bit')
+    with MappedBIT(path, range(10), inverse_binop=sub) as mapped:
+        with pickle.loads(pickle.dumps(mapped)) as restored:
+            assert type(restored) is MappedBIT
+            restored.update(0, 5)
+        assert mapped.original_layout() == [5, *range(1, 10)]
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        BIT([1, 2], lambda a, b: a + b).to_bytes()
+    with pytest.raises(TypeError):
+        BIT(['a', 'b']).to_bytes()
+    with pytest.raises(OverflowError):
+        BIT([2 ** 70]).to_bytes()
+    data = BIT(range(10)).to_bytes()
+    with pytest.raises(ValueError):
+        BIT.from_buffer(data[:-1])
+    with pytest.raises(ValueError):
+        BIT.from_buffer(b'XXXX' + data[4:])
@@ -0,0 +1,152 @@
+import multiprocessing
+import os
+import pytest
+import subprocess
+import sys
+from operator import add, sub, xor, mul
+from random import Random, randint
+from support import DummyPS, intensities, rand_int_list as gl
+
+if sys.version_info < (3, 8):
+    pytest.skip("SharedBIT requires Python 3.8.", allow_module_level=True)
+from bit import BIT, SharedBIT  # noqa: E402
+
+INTENSITY = 'quick'
+
+
+@pytest.fixture
+def tree():
+    trees = []
+
+    def make(*args, **kwargs):
+        trees.append(SharedBIT(None, *args, **kwargs))
+        return trees[-1]
+    yield make
+    for b in trees:
+        b.unlink()
+
+
+def worker(name, slot, seed, count):
+    """ Apply count random updates from slot, return them. """
+    rng, updates = Random(seed), []
+    with SharedBIT.attach(name, slot) as b:
+        for _ in range(count):
+            index, value = rng.randrange(len(b)), rng.randint(-100, 100)
+            b.update(index, value)
+            updates.append((index, value))
+    return updates
+
+
+@pytest.mark.parametrize('bf, ibf', [(add, sub), (xor, xor)])
+def test_slots(tree, bf, ibf):
+    for length in intensities[INTENSITY] | {1, 2}:
+        lst = gl(length)
+        b, dummy = tree(lst, bf, ibf, slots=3), DummyPS(lst, bf, ibf)
+        others = [SharedBIT.attach(b.name, slot) for slot in (1, 2)]
+        assert repr(b) == repr(BIT(lst, bf))
+        for value in gl(30):
+            writer = [b, *others][randint(0, 2)]
+            index = randint(-length, length - 1)
+            if randint(0, 1):
+                writer.update(index, value)
+                dummy.update(index, value)
+            else:
+                writer[index] = value
+                dummy[index] = value
+            reader = [b, *others][randint(0, 2)]
+            i = randint(0, length - 1)
+            j = randint(i, length - 1)
+            assert reader[i] == dummy[i]
+            assert reader.range_sum(i, j) == dummy.range_sum(i, j)
+            assert reader.value_at(j) == dummy.storage[j]
+        for reader in [b, *others]:
+            assert reader.original_layout() == dummy.storage
+            assert list(reader) == [dummy[i] for i in range(length)]
+            reader.close()
+
+
+def test_processes(tree):
+    lst = gl(100)
+    b = tree(lst, add, sub, slots=5)
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(4) as pool:
+        jobs = [(b.name, slot, slot, 200) for slot in range(1, 5)]
+        results = pool.starmap(worker, jobs)
+    for updates in results:
+        for index, value in updates:
+            lst[index] += value
+    assert b.original_layout() == lst
+    assert b[-1] == sum(lst)
+    b.close()
+
+
+def test_independent_process(tree):
+    # an unrelated process attaching and exiting leaves the segment be.
+    b = tree(range(10), add, sub, slots=3)
+    code = ("from bit import SharedBIT\n"
+            "with SharedBIT.attach({0!r}, 1) as b:\n"
+            "    b.update(3, 10)\n").format(b.name)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    result = subprocess.run([sys.executable, '-c', code], env=env,
+                            stderr=subprocess.PIPE, check=True)
+    assert b'leaked' not in result.stderr
+    with SharedBIT.attach(b.name, 2) as other:
+        other.update(4, 1)
+        assert other[9] == 56
+    b.close()
+
+
+def test_release(tree):
+    b = tree(range(10), add, sub, slots=3)
+    crashed = SharedBIT.attach(b.name, 1)
+    # a process dying mid update leaves its slot claimed and odd.
+    crashed._seqs[1] += 1
+    crashed._trees[1][7] = 5
+    with pytest.raises(ValueError):
+        SharedBIT.attach(b.name, 1)
+    for slot in (0, 3):
+        with pytest.raises(ValueError):
+            b.release(slot)
+    b.release(1)
+    with SharedBIT.attach(b.name, 1) as other:
+        other.update(1, 1)
+        assert other[9] == 51
+    # detach the crashed process without giving its slot back again.
+    crashed._slot = None
+    crashed.close()
+    b.close()
+    b.close()
+
+
+def test_errors(tree):
+    with pytest.raises(ValueError):
+        tree(range(10), mul)
+    with pytest.raises(ValueError):
+        tree(range(10), slots=0)
+    b = tree(range(10), slots=2)
+    with pytest.raises(ValueError):
+        SharedBIT.attach(b.name, 2)
+    # a slot has a single writer, until it is given back.
+    other = SharedBIT.attach(b.name, 1)
+    for slot in (0, 1):
+        with pytest.raises(ValueError):
+            SharedBIT.attach(b.name, slot)
+    other.close()
+    SharedBIT.attach(b.name, 1).close()
+    reader = SharedBIT.attach(b.name)
+    assert reader.slot is None and reader.inverse is sub
+    with pytest.raises(TypeError):
+        reader.update(0, 1)
+    with pytest.raises(IndexError):
+        b[10]
+    # nodes that don't fit leave the tree unchanged.
+    with pytest.raises(OverflowError):
+        b.update(0, 2 ** 63)
+    assert b.original_layout() == list(range(10))
+    assert not b._seqs[0] & 1
+    reader.close()
+    b.close()
+
+    with tree([], typecode='b') as empty:
+        assert len(empty) == 0 and list(empty) == []
@@ -0,0 +1,85 @@
+import pytest
+from operator import add, sub, xor
+from random import randint
+from support import rand_int_list as gl
+from bit import BIT, CompressedBIT, SparseBIT
+from bit.monoid import ADD, MAX
+
+UNIVERSE = 2 ** 40
+
+
+def test_sparse_matches_dense():
+    for universe in (1, 2, 37, 1000):
+        b, d = SparseBIT(universe, add, sub), BIT([0] * universe, add, sub)
+        for value in gl(50, -100, 100):
+            index = randint(-universe, universe - 1)
+            if randint(0, 1):
+                b.update(index, value)
+                d.update(index, value)
+            else:
+                b[index] = value
+                d[index] = value
+            assert b.value_at(index) == d.value_at(index)
+        for frozen in (False, True):
+            assert [b[i] for i in range(universe)] == list(d)
+            if universe > 1:
+                assert b[0:universe - 1] == d.range_sum(0, universe - 1)
+            b.freeze()
+        assert b.frozen
+        with pytest.raises(TypeError):
+            b.update(0, 1)
+
+
+def test_sparse_huge():
+    b = SparseBIT(UNIVERSE, ADD)
+    keys = [randint(0, UNIVERSE - 1) for _ in range(200)]
+    for key in keys:
+        b.update(key, 1)
+    assert len(b._nodes) <= len(keys) * UNIVERSE.bit_length()
+    for _ in range(50):
+        i = randint(0, UNIVERSE - 1)
+        j = randint(i, UNIVERSE - 1)
+        assert b[j] == sum(k <= j for k in keys)
+        assert b.range_sum(i, j) == sum(i < k <= j for k in keys)
+        assert b.value_at(i) == keys.count(i)
+
+
+def test_sparse_identity():
+    assert SparseBIT(10, xor)[5] == 0
+    assert SparseBIT(10, MAX)[5] == MAX.identity
+    b = SparseBIT(10, max)
+    with pytest.raises(TypeError):
+        b[5]
+    b.update(3, 7)
+    assert b[9] == 7
+    with pytest.raises(ValueError):
+        SparseBIT(-1)
+    with pytest.raises(IndexError):
+        SparseBIT(10)[10]
+
+
+def test_compressed():
+    pairs = [(randint(0, UNIVERSE), v) for v in gl(300, -100, 100)]
+    b = CompressedBIT(pairs, ADD)
+    values = {}
+    for key, value in pairs:
+        values[key] = values.get(key, 0) + value
+    assert b.keys == sorted(values) and len(b) == len(values)
+    for key, value in pairs[:50]:
+        assert key in b
+        assert b.value_at(key) == values[key]
+        b.update(key, 3)
+        values[key] += 3
+    b[pairs[0][0]] = 0
+    values[pairs[0][0]] = 0
+    for _ in range(50):
+        lo = randint(-1, UNIVERSE)
+        hi = randint(lo, UNIVERSE + 1)
+        assert b[hi] == sum(v for k, v in values.items() if k <= hi)
+        assert b.range_sum(lo, hi) == sum(v for k, v in values.items()
+                                          if lo < k <= hi)
+    with pytest.raises(KeyError):
+        b.update(UNIVERSE + 1, 1)
+    assert UNIVERSE + 1 not in b
+    with pytest.raises(TypeError):
+        CompressedBIT({5: 1}, max)[4]
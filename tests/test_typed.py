@@ -0,0 +1,90 @@
+import pytest
+from array import array
+from operator import add, sub
+from random import randint, random
+from support import DummyPS, intensities, rand_int_list as gl
+from bit import BIT
+
+INTENSITY = 'quick'
+# fits in a signed 64 bit int on its own, but not along with 2 ** 60.
+BIG = 2 ** 63 - 1 - 2 ** 60
+LST = [2 ** 60] * 7
+
+
+def rand_float_list(length):
+    return [random() * 1000 for _ in range(length)]
+
+
+@pytest.mark.parametrize('typecode, gen', [('q', gl),
+                                           ('d', rand_float_list)])
+@pytest.mark.parametrize('keep_values', [False, True])
+def test_typed(typecode, gen, keep_values):
+    for length in intensities[INTENSITY]:
+        lst = gen(length)
+        bit = BIT(lst, add, sub, keep_values, typecode)
+        dummy = DummyPS(lst, add, sub)
+        assert bit.typecode == typecode
+        assert bit._st == BIT.bit_layout(lst, add, typecode)
+        for value in gen(20):
+            index = randint(-length, length - 1)
+            bit.update(index, value)
+            dummy.update(index, value)
+            index = randint(-length, length - 1)
+            bit[index] = value
+            dummy[index] = value
+            index = randint(-len(dummy), len(dummy))
+            bit.insert(index, value)
+            dummy.insert(index, value)
+            index = randint(-len(dummy), len(dummy) - 1)
+            assert bit.pop(index) == pytest.approx(dummy.pop(index))
+            bit.append(value)
+            dummy.append(value)
+        values = gen(length)
+        bit.update_many(range(length), values)
+        for index, value in enumerate(values):
+            dummy.update(index, value)
+        assert isinstance(bit._st, array) and bit.typecode == typecode
+        assert bit.original_layout() == pytest.approx(dummy.storage)
+        assert list(bit) == pytest.approx(
+            [dummy[i] for i in range(len(dummy))]
+        )
+
+
+@pytest.mark.parametrize('keep_values', [False, True])
+def test_overflow(keep_values):
+    bit = BIT(LST, add, sub, keep_values, 'q')
+    before = bit._st[:]
+    for op in (lambda: bit.update(3, BIG), lambda: bit.__setitem__(0, BIG),
+               lambda: bit.append(BIG), lambda: bit.insert(0, BIG),
+               lambda: bit.update_many([0, 1], [BIG, 1]),
+               lambda: bit.extend([BIG])):
+        with pytest.raises(OverflowError):
+            op()
+        assert bit._st == before and bit.original_layout() == LST
+
+    with pytest.raises(OverflowError):
+        BIT([BIG] * 4, typecode='q')
+    assert BIT([BIG] * 4, typecode='q', promote=True).typecode is None
+
+
+@pytest.mark.parametrize('keep_values', [False, True])
+def test_promote(keep_values):
+    ops = [
+        lambda b: b.update(3, BIG), lambda b: b.__setitem__(0, BIG),
+        lambda b: b.append(BIG), lambda b: b.insert(0, BIG),
+        lambda b: b.insert(5, BIG),
+        lambda b: b.update_many([0, 1], [BIG, 1]),
+    ]
+    for op in ops:
+        bit = BIT(LST, add, sub, keep_values, 'q', promote=True)
+        expected = BIT(LST, add, sub)
+        op(bit)
+        op(expected)
+        assert bit.typecode is None and bit._st == expected._st
+        assert bit.original_layout() == expected.original_layout()
+    # popping can overflow too, once nodes covering it change.
+    half = 2 ** 62
+    bit = BIT([half, -2 * half, half, half], add, sub, keep_values, 'q',
+              promote=True)
+    assert bit.pop(1) == -2 * half and bit.typecode is None
+    assert bit.original_layout() == [half] * 3